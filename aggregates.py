@@ -0,0 +1,513 @@
+import numpy as np
+import pandas as pd
+from dataset import normalizeColumnName, resolveColumnName, dailyTotals, datasetSerials
+from heavyHitters import SpaceSaving, capacityFor, TOP_K
+from profiler import profiled
+
+# Mergeable accumulators: each one can be fed chunk by chunk and two partial
+# results can be merged, so a CSV can be scanned once with bounded memory.
+
+
+def weightedQuantile(values, counts, q):
+    # Quantile of values repeated counts times (values sorted ascending), with
+    # linear interpolation between order statistics like np.percentile
+    if len(values) == 0:
+        return np.nan
+    cumulative = np.cumsum(counts)
+    if cumulative[-1] == 0:
+        return np.nan
+    rank = q * (cumulative[-1] - 1)
+    lower = values[np.searchsorted(cumulative, np.floor(rank), side="right")]
+    upper = values[np.searchsorted(cumulative, np.ceil(rank), side="right")]
+    return lower + (upper - lower) * (rank - np.floor(rank))
+
+
+def weightedBoxStats(values, counts, mean, whis=1.5):
+    # dataset.boxStats for values repeated counts times, for Axes.bxp
+    q1, med, q3 = (weightedQuantile(values, counts, q) for q in (0.25, 0.5, 0.75))
+    iqr = q3 - q1
+    present = counts > 0
+    values, counts = values[present], counts[present]
+    inside = values[(values >= q1 - whis * iqr) & (values <= q3 + whis * iqr)]
+    whislo = inside.min() if len(inside) else q1
+    whishi = inside.max() if len(inside) else q3
+    outside = (values < whislo) | (values > whishi)
+    return {
+        "med": med, "q1": q1, "q3": q3, "whislo": whislo, "whishi": whishi,
+        "mean": mean, "fliers": np.repeat(values[outside], counts[outside]),
+    }
+
+
+class CategoryCounts:
+    def __init__(self):
+        self.counts = {}
+
+    def update(self, values):
+        for value, count in pd.Series(values).value_counts().items():
+            self.counts[value] = self.counts.get(value, 0) + int(count)
+
+    def merge(self, other):
+        for value, count in other.counts.items():
+            self.counts[value] = self.counts.get(value, 0) + count
+
+    def series(self):
+        result = pd.Series(self.counts, dtype="int64", name="count")
+        return result.sort_values(ascending=False, kind="stable")
+
+
+class FixedHistogram:
+    # Fixed-bin counts over [lo, hi]; values outside go to under/over
+    def __init__(self, lo, hi, bins):
+        self.lo = lo
+        self.hi = hi
+        self.edges = np.linspace(lo, hi, bins + 1)
+        self.counts = np.zeros(bins, dtype=np.int64)
+        self.under = 0
+        self.over = 0
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        self.under += int((values < self.lo).sum())
+        self.over += int((values > self.hi).sum())
+        self.counts += np.histogram(values, bins=self.edges)[0]
+
+    def merge(self, other):
+        self.counts += other.counts
+        self.under += other.under
+        self.over += other.over
+
+    def rebin(self, bins):
+        # Exact when the fine bin count is a multiple of bins
+        edges = np.linspace(self.lo, self.hi, bins + 1)
+        if len(self.counts) % bins == 0:
+            return self.counts.reshape(bins, -1).sum(axis=1), edges
+        centers = (self.edges[:-1] + self.edges[1:]) / 2
+        counts = np.histogram(centers, bins=edges, weights=self.counts)[0]
+        return counts.astype(np.int64), edges
+
+
+class Moments:
+    # Count, mean, sum of squared deviations, min and max (Chan et al. merge)
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+        mean = values.mean()
+        self._combine(len(values), mean, ((values - mean) ** 2).sum(), values.min(), values.max())
+
+    def merge(self, other):
+        if other.n:
+            self._combine(other.n, other.mean, other.m2, other.min, other.max)
+
+    def _combine(self, n, mean, m2, lo, hi):
+        total = self.n + n
+        delta = mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += m2 + delta * delta * self.n * n / total
+        self.n = total
+        self.min = min(self.min, lo)
+        self.max = max(self.max, hi)
+
+    @property
+    def sum(self):
+        return self.mean * self.n
+
+    def std(self, ddof=1):
+        return np.sqrt(self.m2 / (self.n - ddof)) if self.n > ddof else np.nan
+
+
+class CoMoments:
+    # Running means, squared deviations and co-deviation of paired values
+    def __init__(self):
+        self.n = 0
+        self.meanX = 0.0
+        self.meanY = 0.0
+        self.m2X = 0.0
+        self.m2Y = 0.0
+        self.cXY = 0.0
+
+    def update(self, x, y):
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        valid = ~(np.isnan(x) | np.isnan(y))
+        x, y = x[valid], y[valid]
+        if len(x) == 0:
+            return
+        meanX, meanY = x.mean(), y.mean()
+        dx, dy = x - meanX, y - meanY
+        self._combine(len(x), meanX, meanY, (dx * dx).sum(), (dy * dy).sum(), (dx * dy).sum())
+
+    def merge(self, other):
+        if other.n:
+            self._combine(other.n, other.meanX, other.meanY, other.m2X, other.m2Y, other.cXY)
+
+    def _combine(self, n, meanX, meanY, m2X, m2Y, cXY):
+        total = self.n + n
+        dx = meanX - self.meanX
+        dy = meanY - self.meanY
+        weight = self.n * n / total
+        self.meanX += dx * n / total
+        self.meanY += dy * n / total
+        self.m2X += m2X + dx * dx * weight
+        self.m2Y += m2Y + dy * dy * weight
+        self.cXY += cXY + dx * dy * weight
+        self.n = total
+
+    def corr(self):
+        denom = np.sqrt(self.m2X * self.m2Y)
+        return self.cXY / denom if denom > 0 else np.nan
+
+
+class QuantileSketch:
+    # Log-bucketed quantile sketch (DDSketch-style): every quantile is returned
+    # within relativeAccuracy of a true value, and the bucket count only grows
+    # with the log of the value range.
+    def __init__(self, relativeAccuracy=0.005):
+        self.relativeAccuracy = relativeAccuracy
+        self.gamma = (1 + relativeAccuracy) / (1 - relativeAccuracy)
+        self.logGamma = np.log(self.gamma)
+        self.positive = {}
+        self.negative = {}
+        self.zeros = 0
+        self.count = 0
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        self.count += len(values)
+        tiny = 1e-12
+        self.zeros += int((np.abs(values) <= tiny).sum())
+        self._add(self.positive, values[values > tiny])
+        self._add(self.negative, -values[values < -tiny])
+
+    def _add(self, buckets, magnitudes):
+        if len(magnitudes) == 0:
+            return
+        keys, counts = np.unique(np.ceil(np.log(magnitudes) / self.logGamma).astype(np.int64), return_counts=True)
+        for key, count in zip(keys.tolist(), counts.tolist()):
+            buckets[key] = buckets.get(key, 0) + count
+
+    def merge(self, other):
+        for mine, theirs in ((self.positive, other.positive), (self.negative, other.negative)):
+            for key, count in theirs.items():
+                mine[key] = mine.get(key, 0) + count
+        self.zeros += other.zeros
+        self.count += other.count
+
+    def _bucketValues(self, keys):
+        return 2 * self.gamma ** np.asarray(keys, dtype=float) / (self.gamma + 1)
+
+    def buckets(self):
+        # (representative values ascending, counts)
+        negKeys = sorted(self.negative, reverse=True)
+        posKeys = sorted(self.positive)
+        values = np.concatenate([-self._bucketValues(negKeys), [0.0], self._bucketValues(posKeys)])
+        counts = np.array([self.negative[k] for k in negKeys] + [self.zeros] + [self.positive[k] for k in posKeys])
+        keep = counts > 0
+        return values[keep], counts[keep]
+
+    def quantile(self, q):
+        if self.count == 0:
+            return np.nan
+        values, counts = self.buckets()
+        idx = np.searchsorted(np.cumsum(counts), q * (self.count - 1), side="right")
+        return values[min(idx, len(values) - 1)]
+
+    def histogram(self, edges):
+        values, counts = self.buckets()
+        values = np.clip(values, edges[0], edges[-1])
+        return np.histogram(values, bins=edges, weights=counts)[0].astype(np.int64)
+
+
+class BoundedValueCounts:
+    # Exact value -> count table for low-cardinality numeric columns (scores,
+    # small counters). Gives up once maxDistinct values have been seen, after
+    # which callers fall back to the sketch.
+    def __init__(self, maxDistinct=4096):
+        self.maxDistinct = maxDistinct
+        self.counts = {}
+        self.overflowed = False
+
+    def update(self, values):
+        if self.overflowed:
+            return
+        keys, counts = np.unique(values, return_counts=True)
+        for key, count in zip(keys.tolist(), counts.tolist()):
+            self.counts[key] = self.counts.get(key, 0) + count
+        self._checkSize()
+
+    def merge(self, other):
+        if other.overflowed:
+            self.overflowed = True
+        if self.overflowed:
+            self.counts = {}
+            return
+        for key, count in other.counts.items():
+            self.counts[key] = self.counts.get(key, 0) + count
+        self._checkSize()
+
+    def _checkSize(self):
+        if len(self.counts) > self.maxDistinct:
+            self.overflowed = True
+            self.counts = {}
+
+    def arrays(self):
+        keys = sorted(self.counts)
+        return np.array(keys, dtype=float), np.array([self.counts[k] for k in keys], dtype=np.int64)
+
+    def quantile(self, q):
+        return weightedQuantile(*self.arrays(), q)
+
+    def histogram(self, edges):
+        values, counts = self.arrays()
+        return np.histogram(values, bins=edges, weights=counts)[0].astype(np.int64)
+
+
+class NumericSummary:
+    # Everything the tabs ask about one numeric column
+    def __init__(self, fillValue=None, valueRange=None, fineBins=500):
+        self.fillValue = fillValue
+        self.valueRange = valueRange
+        self.validCount = 0
+        self.moments = Moments()
+        self.exact = BoundedValueCounts()
+        self.sketch = QuantileSketch()
+        self.fixed = FixedHistogram(valueRange[0], valueRange[1], fineBins) if valueRange else None
+
+    def prepare(self, values):
+        values = np.asarray(values, dtype=float)
+        if self.fillValue is not None:
+            values = np.where(np.isnan(values), self.fillValue, values)
+        if self.valueRange is not None:
+            values = values[(values >= self.valueRange[0]) & (values <= self.valueRange[1])]
+        return values
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float)
+        self.validCount += int((~np.isnan(values)).sum())
+        values = self.prepare(values)
+        self.moments.update(values)
+        self.exact.update(values[~np.isnan(values)])
+        self.sketch.update(values)
+        if self.fixed is not None:
+            self.fixed.update(values)
+
+    def quantiles(self):
+        # Exact while the column has few distinct values, sketched otherwise
+        return self.sketch if self.exact.overflowed else self.exact
+
+    def merge(self, other):
+        self.validCount += other.validCount
+        self.moments.merge(other.moments)
+        self.exact.merge(other.exact)
+        self.sketch.merge(other.sketch)
+        if self.fixed is not None:
+            self.fixed.merge(other.fixed)
+
+
+class DailyBuckets:
+    # Per-day entry count and duration sum/count, keyed by day number
+    def __init__(self):
+        self.buckets = {}
+
+    def update(self, dates, durations):
+        dates = pd.Series(dates)
+        valid = dates.notna().to_numpy()
+        if not valid.any():
+            return
+        days = dates[valid].to_numpy().astype("datetime64[D]").astype(np.int64)
+        durations = np.asarray(durations, dtype=float)[valid]
+        for key, count, total, n in zip(*(a.tolist() for a in dailyTotals(days, durations))):
+            self._add(key, count, total, n)
+
+    def _add(self, key, count, total, n):
+        bucket = self.buckets.setdefault(key, [0, 0.0, 0])
+        bucket[0] += count
+        bucket[1] += total
+        bucket[2] += int(n)
+
+    def merge(self, other):
+        for key, (count, total, n) in other.buckets.items():
+            self._add(key, count, total, n)
+
+    def totals(self):
+        keys = sorted(self.buckets)
+        table = np.array([self.buckets[k] for k in keys], dtype=float).reshape(-1, 3)
+        return np.array(keys, dtype=np.int64), table[:, 0].astype(np.int64), table[:, 1], table[:, 2].astype(np.int64)
+
+
+# What the tabs need, mirroring their default columns in main.TAB_SPECS
+DEFAULT_SPEC = {
+    "categories": ["langue", "service", "device"],
+    "daily": [("date", "duree_minutes")],
+    "numeric": {
+        "duree_minutes": {},
+        "qualite_score": {},
+        "note_practicien": {"valueRange": (0, 5)},
+        "interactions_patient": {"fillValue": 0},
+        "interactions_praticien": {"fillValue": 0},
+    },
+    "pairs": [("interactions_patient", "interactions_praticien", 0)],
+}
+
+
+class SessionAggregates:
+    # Streamed stand-in for Dataset: answers the same summary queries
+    # (valueCounts, count, describe, histogram, corr, boxStats, dailyTotals) from
+    # accumulators instead of rows. Column names are resolved against the
+    # CSV header the same way Dataset.resolveColumn does.
+    hasRows = False
+    isEstimate = False
+
+    def __init__(self, columns, spec=None):
+        spec = spec or DEFAULT_SPEC
+        self.columns = list(columns)
+        self.normalizedColumns = {col: normalizeColumnName(col) for col in self.columns}
+        self.serial = next(datasetSerials)
+        self.rows = 0
+        self.counts = {c: CategoryCounts() for c in spec["categories"] if c in self.columns}
+        # Every other column keeps a bounded heavy-hitters summary for the
+        # top values tab
+        self.sketches = {c: SpaceSaving(capacityFor(TOP_K)) for c in self.columns if c not in self.counts}
+        self.daily = {
+            (d, v): DailyBuckets() for d, v in spec["daily"] if d in self.columns
+        }
+        self.numeric = {}
+        for target, options in spec["numeric"].items():
+            column = self.resolveColumn(target)
+            if column is not None:
+                self.numeric[column] = NumericSummary(**options)
+        self.pairs = {
+            (x, y, fill): CoMoments() for x, y, fill in spec["pairs"]
+            if x in self.columns and y in self.columns
+        }
+
+    def __len__(self):
+        return self.rows
+
+    @property
+    def viewKey(self):
+        # Merged deltas (live tail) change the answers, and the row count
+        return ("aggregates", self.serial, self.rows)
+
+    def resolveColumn(self, target):
+        return resolveColumnName(target, self.normalizedColumns)
+
+    @profiled
+    def update(self, chunk):
+        self.rows += len(chunk)
+        for column, counter in self.counts.items():
+            counter.update(chunk[column].dropna())
+        for column, sketch in self.sketches.items():
+            sketch.update(chunk[column])
+        for (dateColumn, durationColumn), buckets in self.daily.items():
+            dates = pd.to_datetime(chunk[dateColumn], errors="coerce")
+            durations = self._numeric(chunk, durationColumn)
+            buckets.update(dates, durations)
+        for column, summary in self.numeric.items():
+            summary.update(self._numeric(chunk, column))
+        for (x, y, fill), moments in self.pairs.items():
+            xs, ys = self._numeric(chunk, x), self._numeric(chunk, y)
+            if fill is not None:
+                xs, ys = np.nan_to_num(xs, nan=fill), np.nan_to_num(ys, nan=fill)
+            moments.update(xs, ys)
+
+    def _numeric(self, chunk, column):
+        if column not in chunk.columns:
+            return np.full(len(chunk), np.nan)
+        values = pd.to_numeric(chunk[column], errors="coerce")
+        return values.to_numpy(dtype="float64", na_value=np.nan)
+
+    def merge(self, other):
+        self.rows += other.rows
+        for key, acc in self.counts.items():
+            acc.merge(other.counts[key])
+        for key, acc in self.sketches.items():
+            acc.merge(other.sketches[key])
+        for key, acc in self.daily.items():
+            acc.merge(other.daily[key])
+        for key, acc in self.numeric.items():
+            acc.merge(other.numeric[key])
+        for key, acc in self.pairs.items():
+            acc.merge(other.pairs[key])
+
+    def _summary(self, column, fillValue=None, valueRange=None):
+        summary = self.numeric.get(column)
+        if summary is None:
+            raise KeyError(f"Column '{column}' was not aggregated")
+        if summary.fillValue != fillValue or summary.valueRange != (tuple(valueRange) if valueRange else None):
+            raise ValueError(f"Column '{column}' was aggregated with different options")
+        return summary
+
+    def valueCounts(self, column):
+        return self.counts[column].series()
+
+    def hasCodes(self, column):
+        return column in self.counts
+
+    def topValues(self, column, k):
+        if column in self.counts:
+            counts = self.counts[column].series()
+            return counts.head(k), int(counts.sum()), 0
+        # Sketches keep capacityFor(TOP_K) counters: larger k only lists more
+        # of them
+        sketch = self.sketches[column]
+        top, maxError = sketch.top(k)
+        return top, sketch.total, maxError
+
+    def count(self, column):
+        return self.numeric[column].validCount
+
+    def describe(self, column, fillValue=None, valueRange=None):
+        summary = self._summary(column, fillValue, valueRange)
+        moments = summary.moments
+        if moments.n == 0:
+            return {"count": 0}
+        return {
+            "count": moments.n,
+            "sum": moments.sum,
+            "mean": moments.mean,
+            "median": summary.quantiles().quantile(0.5),
+            "std": moments.std(),
+            "min": moments.min,
+            "max": moments.max,
+        }
+
+    def histogram(self, column, bins, valueRange=None, fillValue=None):
+        summary = self._summary(column, fillValue, valueRange)
+        if summary.fixed is not None:
+            return summary.fixed.rebin(bins)
+        moments = summary.moments
+        edges = np.linspace(moments.min, moments.max, bins + 1) if moments.n else np.linspace(0, 1, bins + 1)
+        return summary.quantiles().histogram(edges), edges
+
+    def corr(self, columnX, columnY, fillValue=None):
+        return self.pairs[(columnX, columnY, fillValue)].corr()
+
+    def boxStats(self, column, fillValue=None, whis=1.5):
+        summary = self._summary(column, fillValue)
+        moments = summary.moments
+        if not summary.exact.overflowed:
+            return weightedBoxStats(*summary.exact.arrays(), moments.mean, whis)
+        sketch = summary.sketch
+        q1, med, q3 = (sketch.quantile(q) for q in (0.25, 0.5, 0.75))
+        iqr = q3 - q1
+        # Whiskers stop at the data extremes; individual fliers are not kept
+        return {
+            "med": med, "q1": q1, "q3": q3,
+            "whislo": max(q1 - whis * iqr, moments.min),
+            "whishi": min(q3 + whis * iqr, moments.max),
+            "mean": moments.mean, "fliers": [],
+        }
+
+    def dailyTotals(self, dateColumn, durationColumn):
+        return self.daily[(dateColumn, durationColumn)].totals()
@@ -0,0 +1,51 @@
+import queue
+import threading
+
+# Worker-thread jobs of the UI (CSV loads, the live tail, table exports).
+# The worker posts tuples to a queue that the Tk side drains from
+# root.after callbacks: ("progress", ...) while it runs, then ("done",
+# result), ("cancelled",) or ("error", exception).
+
+
+class BackgroundJob:
+    # Subclasses implement run(); cancel() only sets cancelEvent, which
+    # run() checks between steps
+    def __init__(self):
+        self.messages = queue.Queue()
+        self.cancelEvent = threading.Event()
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def cancel(self):
+        self.cancelEvent.set()
+
+    def drain(self):
+        items = []
+        while True:
+            try:
+                items.append(self.messages.get_nowait())
+            except queue.Empty:
+                return items
+
+    def _run(self):
+        try:
+            result = self.run()
+        except Exception as e:
+            self.messages.put(("error", e))
+            return
+        if result is None:
+            self.messages.put(("cancelled",))
+        else:
+            self.messages.put(("done", result))
+            self.finished(result)
+
+    def run(self):
+        # The job itself, on the worker thread; None when cancelled
+        raise NotImplementedError
+
+    def finished(self, result):
+        # Follow-up work on the worker thread once "done" is posted
+        pass
@@ -0,0 +1,226 @@
+import argparse
+import html
+import json
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import matplotlib
+matplotlib.use("Agg")
+from charts import TopValuesChart, DateCurveChart, QualiteScoreChart, InteractionChart, GradeChart
+from csvCache import CsvCache
+from csvLoader import CsvLoader, findCsvFiles
+from dataset import Dataset
+
+# Headless reports: the same charts as the app's tabs, rendered with Agg and
+# saved as images plus a JSON/HTML summary per CSV. Files and tabs are fanned
+# out across a process pool.
+#
+#   python batchReport.py exports/ -o reports --format png svg --workers 8
+
+# (tab title, chart class, keyword arguments), as in main.TAB_SPECS. The
+# service table has no figure; its report entry is the per-service row count.
+REPORT_SPECS = [
+    ("Top Values", TopValuesChart, {"column": "langue"}),
+    ("Entries Over Time", DateCurveChart, {"dateColumn": "date", "durationColumn": "duree_minutes"}),
+    ("Service Table", None, {"filterColumn": "service"}),
+    ("Qualite Score Histogram", QualiteScoreChart, {"column": "qualite_score", "bins": 10}),
+    ("Interactions Compare", InteractionChart, {"patientColumn": "interactions_patient", "professionalColumn": "interactions_praticien"}),
+    ("Practitioner Grades", GradeChart, {"column": "note_practicien", "bins": 10}),
+]
+
+# The last dataset loaded by this worker process, reused by its next job
+_loaded = {}
+
+
+def slugify(text):
+    return "".join(c if c.isalnum() else "-" for c in text.lower()).strip("-")
+
+
+def reportDirName(filePath):
+    return slugify(os.path.splitext(os.path.basename(filePath))[0]) or "report"
+
+
+def jsonSafe(value):
+    # NaN/inf are not valid JSON
+    if isinstance(value, dict):
+        return {str(k): jsonSafe(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [jsonSafe(v) for v in value]
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+def openCache(cacheDir):
+    try:
+        return CsvCache(cacheDir)
+    except OSError:
+        return None
+
+
+def loadDataset(filePath, cacheDir):
+    if filePath not in _loaded:
+        _loaded.clear()
+        df = CsvLoader(filePath, cache=openCache(cacheDir)).load()
+        _loaded[filePath] = Dataset(df)
+    return _loaded[filePath]
+
+
+def prepareFile(filePath, cacheDir):
+    # Parses the file once into the columnar cache, so the per-tab jobs map it
+    return len(loadDataset(filePath, cacheDir))
+
+
+def renderTab(filePath, specIndex, outDir, formats, dpi, cacheDir):
+    title, chartClass, kwargs = REPORT_SPECS[specIndex]
+    startTime = time.perf_counter()
+    dataset = loadDataset(filePath, cacheDir)
+    result = {"title": title, "images": [], "stats": "", "summary": {}}
+    if chartClass is None:
+        column = kwargs["filterColumn"]
+        if column in dataset.columns:
+            counts = dataset.valueCounts(column)
+            result["summary"] = {"column": column, "rows": len(dataset), "counts": {str(k): int(v) for k, v in counts.items()}}
+    else:
+        chart = chartClass(dataset, **kwargs)
+        chart.refresh()
+        result["stats"] = chart.statsText
+        result["summary"] = chart.summary
+        for name, figure in chart.figures.items():
+            for fmt in formats:
+                fileName = f"{slugify(title)}-{name}.{fmt}"
+                figure.savefig(os.path.join(outDir, fileName), format=fmt, dpi=dpi, bbox_inches="tight")
+                result["images"].append(fileName)
+    result["seconds"] = time.perf_counter() - startTime
+    return result
+
+
+def renderFile(filePath, outDir, formats, dpi, cacheDir):
+    # Every tab of one file in a single job, used when there is no cache to
+    # share the parsed file between jobs
+    return [renderTab(filePath, i, outDir, formats, dpi, cacheDir) for i in range(len(REPORT_SPECS))]
+
+
+def writeFileReport(outDir, filePath, tabs):
+    report = {"source": filePath, "tabs": tabs}
+    with open(os.path.join(outDir, "report.json"), "w", encoding="utf-8") as fh:
+        json.dump(jsonSafe(report), fh, indent=2, allow_nan=False)
+
+    parts = [f"<h1>{html.escape(os.path.basename(filePath))}</h1>", f"<p>{html.escape(filePath)}</p>"]
+    for tab in tabs:
+        parts.append(f"<h2>{html.escape(tab['title'])}</h2>")
+        if tab["stats"]:
+            parts.append(f"<pre>{html.escape(tab['stats'])}</pre>")
+        # One image per figure: the first requested format
+        shown = {}
+        for image in tab["images"]:
+            shown.setdefault(image.rsplit(".", 1)[0], image)
+        parts.extend(f'<img src="{html.escape(image)}" alt="">' for image in shown.values())
+        if tab["chart"] is None and tab["summary"]:
+            rows = "".join(f"<tr><td>{html.escape(k)}</td><td>{v}</td></tr>" for k, v in tab["summary"]["counts"].items())
+            parts.append(f"<table><tr><th>{html.escape(tab['summary']['column'])}</th><th>Rows</th></tr>{rows}</table>")
+    writeHtml(os.path.join(outDir, "report.html"), os.path.basename(filePath), parts)
+
+
+def writeHtml(path, title, parts):
+    with open(path, "w", encoding="utf-8") as fh:
+        fh.write(f"<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\"><title>{html.escape(title)}</title></head><body>\n")
+        fh.write("\n".join(parts))
+        fh.write("\n</body></html>\n")
+
+
+def runBatch(files, outDir, formats=("png",), dpi=100, workers=None, cacheDir=None):
+    os.makedirs(outDir, exist_ok=True)
+    reportDirs = {}
+    for filePath in files:
+        # Files with the same name in different directories get a suffix
+        name = base = reportDirName(filePath)
+        suffix = 1
+        while name in reportDirs.values():
+            suffix += 1
+            name = f"{base}-{suffix}"
+        reportDirs[filePath] = name
+        os.makedirs(os.path.join(outDir, name), exist_ok=True)
+
+    useCache = openCache(cacheDir) is not None
+    results = {filePath: [None] * len(REPORT_SPECS) for filePath in files}
+    errors = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        if useCache:
+            # Parse each file once, then render its tabs as separate jobs
+            prepared = {pool.submit(prepareFile, f, cacheDir): f for f in files}
+            jobs = {}
+            for future in as_completed(prepared):
+                filePath = prepared[future]
+                try:
+                    future.result()
+                except Exception as e:
+                    errors[filePath] = str(e)
+                    continue
+                for i in range(len(REPORT_SPECS)):
+                    job = pool.submit(renderTab, filePath, i, os.path.join(outDir, reportDirs[filePath]), formats, dpi, cacheDir)
+                    jobs[job] = (filePath, i)
+            for future in as_completed(jobs):
+                filePath, i = jobs[future]
+                try:
+                    results[filePath][i] = future.result()
+                except Exception as e:
+                    errors.setdefault(filePath, f"{REPORT_SPECS[i][0]}: {e}")
+        else:
+            jobs = {pool.submit(renderFile, f, os.path.join(outDir, reportDirs[f]), formats, dpi, None): f for f in files}
+            for future in as_completed(jobs):
+                filePath = jobs[future]
+                try:
+                    results[filePath] = future.result()
+                except Exception as e:
+                    errors[filePath] = str(e)
+
+    index = []
+    for filePath in files:
+        entry = {"source": filePath, "report": f"{reportDirs[filePath]}/report.html"}
+        if filePath in errors:
+            entry["error"] = errors[filePath]
+        else:
+            tabs = results[filePath]
+            for tab, (_, chartClass, _) in zip(tabs, REPORT_SPECS):
+                tab["chart"] = None if chartClass is None else chartClass.__name__
+            writeFileReport(os.path.join(outDir, reportDirs[filePath]), filePath, tabs)
+        index.append(entry)
+
+    with open(os.path.join(outDir, "summary.json"), "w", encoding="utf-8") as fh:
+        json.dump(jsonSafe(index), fh, indent=2, allow_nan=False)
+    rows = []
+    for entry in index:
+        link = f'<a href="{html.escape(entry["report"])}">{html.escape(os.path.basename(entry["source"]))}</a>'
+        status = html.escape(entry.get("error", "ok"))
+        rows.append(f"<tr><td>{link}</td><td>{status}</td></tr>")
+    writeHtml(os.path.join(outDir, "index.html"), "CSV reports", ["<h1>CSV reports</h1>", f"<table>{''.join(rows)}</table>"])
+    return index
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render the CSV analysis tabs to image files and JSON/HTML summaries, without a display.")
+    parser.add_argument("inputs", nargs="+", help="CSV files, directories or glob patterns")
+    parser.add_argument("-o", "--output", default="reports", help="output directory (default: reports)")
+    parser.add_argument("--format", nargs="+", choices=["png", "svg"], default=["png"], help="image formats (default: png)")
+    parser.add_argument("--dpi", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: number of CPUs)")
+    parser.add_argument("--cache-dir", default=None, help="parsed-CSV cache directory (default: CSV_ANALYZER_CACHE_DIR or ~/.cache/csv-analysis-app)")
+    args = parser.parse_args(argv)
+
+    files = findCsvFiles(args.inputs)
+    if not files:
+        parser.error("no CSV files found")
+    startTime = time.perf_counter()
+    index = runBatch(files, args.output, args.format, args.dpi, args.workers, args.cache_dir)
+    failed = [entry for entry in index if "error" in entry]
+    for entry in failed:
+        print(f"{entry['source']}: {entry['error']}", file=sys.stderr)
+    print(f"{len(index) - len(failed)}/{len(index)} reports written to {args.output} in {time.perf_counter() - startTime:.1f}s")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,245 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+import matplotlib
+matplotlib.use("Agg")
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+import numpy as np
+import pandas as pd
+from batchReport import REPORT_SPECS
+from csvCache import CsvCache
+from csvLoader import CsvLoader
+from dataset import Dataset
+from scheduler import scheduler
+from syntheticData import writeSessionsCsv
+from tableIndex import TableIndex
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Scaling benchmarks on synthetic exports (syntheticData.py). Each size runs
+# in a fresh process so peak RSS is per size. Results are JSON with flat
+# metric names; --baseline compares them against a stored run.
+#
+#   python benchmark.py --rows 1000 100000 1000000 --output bench.json
+#   python benchmark.py --save-baseline bench_baseline.json
+#   python benchmark.py --baseline bench_baseline.json   # exit 1 on regression
+#
+# Charts are timed headless (compute = queries and artist updates, draw = Agg
+# render). The service table is timed through its TableIndex; with --tk the
+# real Tk analyzers are also built in a hidden window.
+
+DEFAULT_ROWS = [1_000, 10_000, 100_000]
+DEFAULT_BASELINE = "bench_baseline.json"
+
+
+def timed(fn, repeat=1):
+    # (best wall time in seconds, last result)
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def peakRssMB():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / (1024 ** 2 if sys.platform == "darwin" else 1024)
+
+
+def dataFile(dataDir, rows, seed):
+    path = os.path.join(dataDir, f"sessions-{rows}-{seed}.csv")
+    if not os.path.exists(path):
+        writeSessionsCsv(path + ".tmp", rows, seed)
+        os.replace(path + ".tmp", path)
+    return path
+
+
+def benchCharts(dataset, metrics, repeat):
+    for title, chartClass, kwargs in REPORT_SPECS:
+        if chartClass is None:
+            continue
+        chart = chartClass(dataset, **kwargs)
+        canvases = [FigureCanvasAgg(figure) for figure in chart.figures.values()]
+        metrics[f"tab.{title}.compute"], _ = timed(chart.refresh, repeat)
+
+        def draw():
+            for canvas in canvases:
+                canvas.draw()
+        metrics[f"tab.{title}.draw"], _ = timed(draw, repeat)
+
+
+def benchServiceTable(dataset, metrics, repeat):
+    metrics["tab.Service Table.compute"], index = timed(lambda: TableIndex(dataset, "service"))
+    codes = range(len(index.categories))
+    metrics["serviceTable.filter"], _ = timed(lambda: [index.positions(code) for code in codes], repeat)
+    metrics["serviceTable.filter"] /= max(len(codes), 1)
+    # First sort of a column builds its permutation; later ones reuse it
+    metrics["serviceTable.sort.cold"], _ = timed(lambda: index.positions(None, "duree_minutes"))
+    metrics["serviceTable.sort.warm"], _ = timed(lambda: index.positions(None, "duree_minutes", descending=True), repeat)
+    metrics["serviceTable.filterSort"], _ = timed(lambda: index.positions(0, "qualite_score"), 1)
+
+
+def benchTk(dataset, metrics, repeat):
+    # The real analyzers, including widget creation, in a withdrawn window
+    import importlib
+    import tkinter as tk
+    from main import TAB_SPECS
+    try:
+        root = tk.Tk()
+    except tk.TclError:
+        return False
+    root.withdraw()
+    # Analyzer work runs on the scheduler; flush() waits for the results so
+    # each timing covers the compute as well as the widgets
+    scheduler.attach(root)
+    try:
+        for title, moduleName, className, kwargs in TAB_SPECS:
+            analyzerClass = getattr(importlib.import_module(moduleName), className)
+            frame = tk.Frame(root)
+
+            def build():
+                analyzer = analyzerClass(frame, dataset=dataset, **kwargs)
+                scheduler.flush()
+                root.update()
+                return analyzer
+            metrics[f"tk.{title}.build"], analyzer = timed(build)
+            if className == "ServiceTableAnalyzer":
+                def filterAll():
+                    for i in range(1, len(analyzer.dropdown["values"])):
+                        analyzer.dropdown.current(i)
+                        analyzer.updateTable()
+                        scheduler.flush()
+                        root.update()
+                metrics["tk.serviceTable.filter"], _ = timed(filterAll, repeat)
+                metrics["tk.serviceTable.filter"] /= max(len(analyzer.dropdown["values"]) - 1, 1)
+
+                def sort():
+                    analyzer.sortBy("duree_minutes")
+                    scheduler.flush()
+                    root.update()
+                metrics["tk.serviceTable.sort"], _ = timed(sort, repeat)
+            frame.destroy()
+    finally:
+        scheduler.detach()
+        root.destroy()
+    return True
+
+
+def runSize(rows, seed, dataDir, repeat, useTk):
+    metrics = {}
+    path = dataFile(dataDir, rows, seed)
+    metrics["load.csv"], df = timed(lambda: CsvLoader(path).load())
+    with tempfile.TemporaryDirectory() as cacheDir:
+        cache = CsvCache(cacheDir)
+        metrics["load.cacheStore"], _ = timed(lambda: cache.store(path, df))
+        metrics["load.cached"], _ = timed(lambda: cache.load(path), repeat)
+        # One-time costs (font cache, first Agg render) are not measured
+        benchCharts(Dataset(df.head(100)), {}, 1)
+        dataset = Dataset(df)
+        benchCharts(dataset, metrics, repeat)
+        benchServiceTable(dataset, metrics, repeat)
+        if useTk and not benchTk(Dataset(df), metrics, repeat):
+            print("No display: skipped the Tk benchmarks", file=sys.stderr)
+    metrics["peakRssMB"] = peakRssMB()
+    return {"rows": len(df), "fileMB": os.path.getsize(path) / 1e6, "metrics": metrics}
+
+
+def environment():
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "matplotlib": matplotlib.__version__,
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def compare(current, baseline, tolerance, minSeconds):
+    # Metrics slower (or larger) than baseline * (1 + tolerance); timings that
+    # differ by less than minSeconds are treated as noise
+    regressions = []
+    for size, result in current["results"].items():
+        previous = baseline.get("results", {}).get(size)
+        if previous is None:
+            continue
+        for name, value in result["metrics"].items():
+            old = previous["metrics"].get(name)
+            if value is None or old is None or old <= 0:
+                continue
+            if name != "peakRssMB" and value - old < minSeconds:
+                continue
+            if value > old * (1 + tolerance):
+                regressions.append((size, name, old, value))
+    return regressions
+
+
+def formatValue(name, value):
+    if value is None:
+        return "-"
+    return f"{value:.1f} MB" if name == "peakRssMB" else f"{value * 1000:.2f} ms"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark loading, tab rendering and table filter/sort on synthetic data.")
+    parser.add_argument("--rows", type=int, nargs="+", default=DEFAULT_ROWS, help="dataset sizes (default: 10^3 10^4 10^5)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5, help="repetitions per timing, best is kept (default: 5)")
+    parser.add_argument("--data-dir", default=None, help="keep generated CSVs here for reuse (default: temporary)")
+    parser.add_argument("--output", default=None, help="write results JSON here (default: stdout)")
+    parser.add_argument("--baseline", default=None, help=f"compare against this results file (default: {DEFAULT_BASELINE} if present)")
+    parser.add_argument("--save-baseline", default=None, help="also write the results as a new baseline file")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="allowed slowdown ratio before failing (default: 0.5)")
+    parser.add_argument("--min-seconds", type=float, default=0.005, help="ignore timing differences below this (default: 0.005)")
+    parser.add_argument("--tk", action="store_true", help="also time the Tk analyzers (needs a display)")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmpDir:
+        dataDir = args.data_dir or tmpDir
+        os.makedirs(dataDir, exist_ok=True)
+        results = {}
+        for rows in args.rows:
+            with ProcessPoolExecutor(max_workers=1) as pool:
+                results[str(rows)] = pool.submit(runSize, rows, args.seed, dataDir, args.repeat, args.tk).result()
+            print(f"{rows:>10,} rows done", file=sys.stderr)
+    report = {"environment": environment(), "seed": args.seed, "results": results}
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            fh.write(text + "\n")
+    else:
+        print(text)
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as fh:
+            fh.write(text + "\n")
+
+    baselinePath = args.baseline or (DEFAULT_BASELINE if os.path.exists(DEFAULT_BASELINE) and not args.save_baseline else None)
+    if baselinePath is None:
+        return 0
+    with open(baselinePath, encoding="utf-8") as fh:
+        baseline = json.load(fh)
+    regressions = compare(report, baseline, args.tolerance, args.min_seconds)
+    for size, name, old, new in regressions:
+        print(f"REGRESSION {size} rows {name}: {formatValue(name, old)} -> {formatValue(name, new)} ({new / old:.2f}x)", file=sys.stderr)
+    if not regressions:
+        print(f"No regressions against {baselinePath}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,19 @@
+import tkinter as tk
+from charts import MIN_BINS, MAX_BINS
+
+class BinsControl:
+    # "Bins:" spinbox of the Tk histogram tabs, mixed into subclasses of
+    # charts.HistogramChart
+    def createBinsControl(self, parent):
+        tk.Label(parent, text="Bins:").pack(side="left")
+        self.binsVar = tk.IntVar(value=self.bins)
+        self.binsSpinbox = tk.Spinbox(parent, from_=MIN_BINS, to=MAX_BINS, width=4, textvariable=self.binsVar, command=self.onBinsChanged)
+        self.binsSpinbox.pack(side="left")
+        self.binsSpinbox.bind("<Return>", self.onBinsChanged)
+
+    def onBinsChanged(self, event=None):
+        try:
+            bins = int(self.binsVar.get())
+        except (tk.TclError, ValueError):
+            return
+        self.setBins(bins)
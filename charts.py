@@ -0,0 +1,575 @@
+import matplotlib
+import matplotlib.dates as mdates
+from matplotlib.figure import Figure
+import numpy as np
+import pandas as pd
+from histogramArtists import HistogramBars
+from decimation import DecimatedLine
+from timePyramid import TimePyramid, PyramidLine
+from profiler import profiled
+from progressive import ProgressiveRefresh
+from heavyHitters import TOP_K
+
+# Figures, artists and summary stats of each tab, without any Tk widgets.
+# The Tk analyzers subclass these and override the display hooks; batch
+# reports use them directly and save the figures.
+
+
+OTHER_LABEL = "Other"
+# Bin counts offered by the histogram tabs
+MIN_BINS = 2
+MAX_BINS = 50
+
+
+def plainStats(stats):
+    # describe() result as plain floats for the JSON/HTML summaries
+    return {key: float(value) for key, value in stats.items()}
+
+
+def withInterval(value, intervals, key, fmt=".2f"):
+    # "4.21", or "4.21 ±0.03" / "4.20 [4.10, 4.30]" when a sampled estimate
+    # has a half-width / (low, high) interval for key
+    interval = intervals.get(key)
+    text = f"{value:{fmt}}"
+    if isinstance(interval, tuple):
+        text += f" [{interval[0]:{fmt}}, {interval[1]:{fmt}}]"
+    elif interval is not None:
+        text += f" ±{interval:{fmt}}"
+    return text
+
+
+def withNote(text, result):
+    return f"{text}\n{result['note']}" if result.get("note") else text
+
+
+class Chart:
+    # Tk analyzers of the summary tabs set this: refresh then draws sampled
+    # estimates first, refined to the exact result in the background
+    progressive = False
+
+    def __init__(self, dataset):
+        self.dataset = dataset
+        self.figures = {}
+        self.summary = {}
+        self.statsText = ""
+        # viewCache key of the result last plotted (None: not cacheable)
+        self.shownKey = None
+        self.refresher = ProgressiveRefresh(self) if self.progressive else None
+
+    def setDataset(self, dataset):
+        self.dataset = dataset
+        self.refresh()
+
+    def refresh(self):
+        if self.refresher is not None:
+            self.refresher.start(self.dataset)
+        else:
+            self.plot(self.compute(self.dataset))
+
+    # refresh is split into compute, which only reads the dataset and the
+    # chart's settings and may run on a worker thread (scheduler.Scheduler,
+    # progressive.ProgressiveRefresh), and plot, which updates the artists
+    # from its result on the Tk thread. Artists are created once, in
+    # createArtists; plot only updates them in place.
+
+    def compute(self, dataset):
+        raise NotImplementedError
+
+    def plot(self, result):
+        raise NotImplementedError
+
+    def settings(self):
+        # Chart parameters that change compute's result
+        return ()
+
+    def cacheKey(self, dataset):
+        if dataset.viewKey is None:
+            return None
+        return (type(self).__name__, self.settings(), dataset.viewKey)
+
+    def plotView(self, key, result):
+        # plot() of a result whose view is key (see cacheKey)
+        self.shownKey = key
+        self.plot(result)
+
+    # Display hooks, overridden by the Tk analyzers
+
+    def showStats(self, text):
+        self.statsText = text
+
+    def showError(self, error):
+        # Failed background compute (scheduler.Scheduler onError)
+        self.showStats(f"Error: {error}")
+
+    def redraw(self):
+        pass
+
+
+class TopValuesChart(Chart):
+    # The k most frequent values plus an "Other" slice for the rest, so any
+    # column (session ids, free text) costs k rows and k + 1 wedges
+    def __init__(self, dataset, column, k=TOP_K):
+        super().__init__(dataset)
+        self.column = column
+        self.k = k
+        self.figure = Figure(figsize=(6, 4), dpi=100)
+        self.ax = self.figure.add_subplot(111)
+        self.figures = {"pie": self.figure}
+
+    def settings(self):
+        return (self.column, self.k)
+
+    def showTable(self, topDf):
+        pass
+
+    @profiled
+    def compute(self, dataset):
+        if self.column not in dataset.columns:
+            return None
+        return dataset.topValues(self.column, self.k)
+
+    @profiled
+    def plot(self, result):
+        if result is None:
+            return
+        top, totalAll, maxError = result
+        other = max(int(totalAll - top.sum()), 0)
+        labels = [str(value) for value in top.index] + ([OTHER_LABEL] if other else [])
+        counts = [int(count) for count in top] + ([other] if other else [])
+        topDf = pd.DataFrame({self.column: labels, "Count": counts})
+
+        # Update Top 3 display (percentage based on total to match pie chart)
+        top3Text = ""
+        for i, (value, count) in enumerate(top.head(3).items(), 1):
+            percentage = (count / totalAll) * 100
+            top3Text += f"{i}. {value}: {count} ({percentage:.1f}%)\n"
+        if maxError:
+            top3Text += f"Estimated counts: each at most {maxError:,} too high\n"
+        if not len(top) and totalAll:
+            top3Text += "No value is frequent enough to stand out from the estimate error\n"
+        self.showStats(top3Text)
+        self.showTable(topDf)
+        self.summary = {
+            "column": self.column,
+            "total": int(totalAll),
+            "counts": dict(zip(labels, counts)),
+            "maxError": int(maxError),
+        }
+
+        # Create pie chart
+        self.ax.clear()
+        colors = matplotlib.colormaps["Set3"](np.arange(len(counts)) % 12)
+        if other > 0:
+            # White and hatched: unlike any Set3 colour (which has a grey)
+            colors[-1] = matplotlib.colors.to_rgba("white")
+
+        # Only show percentage for slices above 5% to avoid overlap
+        def autopct_format(pct):
+            return f'{pct:.1f}%' if pct > 5 else ''
+
+        wedges, texts, autotexts = self.ax.pie(counts, autopct=autopct_format,
+                    startangle=90, colors=colors)
+        if other > 0:
+            wedges[-1].set_hatch("//")
+            wedges[-1].set_edgecolor("grey")
+        self.ax.legend(wedges, labels, title=self.column,
+                      loc="center left", bbox_to_anchor=(1, 0, 0.5, 1))
+        self.ax.set_title(f"Distribution of {self.column}")
+        self.figure.tight_layout()
+        self.redraw()
+
+
+class DateCurveChart(Chart):
+    def __init__(self, dataset, dateColumn="date", durationColumn="duree_minutes", resolution="auto"):
+        super().__init__(dataset)
+        self.dateColumn = dateColumn
+        self.durationColumn = durationColumn
+        self.resolution = resolution
+        self.pyramid = None
+        self.figure = Figure(figsize=(6,4), dpi=100)
+        self.ax = self.figure.add_subplot(111)
+        self.figures = {"entries": self.figure}
+        self.createArtists()
+
+    def settings(self):
+        return (self.dateColumn, self.durationColumn)
+
+    def createArtists(self):
+        # One line whose level (day/week/month/quarter) and window follow the
+        # zoom; AutoDateLocator keeps the tick count bounded over any span
+        self.curve = PyramidLine(self.ax, onLevelChange=self.onLevelChange, marker='o', linestyle='-')
+        self.curve.resolution = self.resolution
+        self.ax.xaxis.set_major_locator(mdates.AutoDateLocator(maxticks=10))
+        self.ax.xaxis.set_major_formatter(mdates.DateFormatter("%Y-%m-%d"))
+        self.ax.set_ylabel("Count")
+        self.ax.tick_params(axis='x', rotation=45)
+
+    @profiled
+    def compute(self, dataset):
+        # Per-day totals come from the dataset (or cube / streamed aggregates)
+        # in one pass; the pyramid sums them into weeks, months and quarters
+        pyramid = TimePyramid(*dataset.dailyTotals(self.dateColumn, self.durationColumn))
+        return pyramid, dataset.describe(self.durationColumn)
+
+    def plot(self, result):
+        self.pyramid, durationStats = result
+        if durationStats["count"] > 0:
+            avgMinutes = durationStats["mean"]
+            hours = int(avgMinutes // 60)
+            minutes = int(avgMinutes % 60)
+            self.showStats(f"Average session time: {hours}h {minutes}min")
+        else:
+            self.showStats("Average session time: N/A")
+        weeks = self.pyramid.level("week")
+        self.summary = {
+            "duration": plainStats(durationStats),
+            "weeks": [
+                {"week": week, "count": count, "avgDuration": avg}
+                for week, count, avg in zip(weeks.dates.strftime("%Y-%m-%d"), weeks.counts.tolist(), weeks.avgDurations.tolist())
+            ],
+        }
+        self.plotCurve()
+
+    @profiled
+    def plotCurve(self):
+        self.curve.setPyramid(self.pyramid)
+        span = self.pyramid.span()
+        if span is None:
+            self.ax.set_title("No valid dates")
+        else:
+            pad = max((span[1] - span[0]) * 0.02, 1)
+            self.ax.set_xlim(span[0] - pad, span[1] + pad)
+        self.curve.refresh()
+        self.figure.tight_layout()
+        self.redraw()
+
+    def setResolution(self, resolution):
+        # "auto" or one of timePyramid.RESOLUTIONS; only the line is updated
+        self.resolution = resolution
+        self.curve.setResolution(resolution)
+        self.redraw()
+
+    def onLevelChange(self, level):
+        self.ax.set_title(f"Number of entries per {level.resolution}")
+        self.ax.set_xlabel(f"{level.resolution.capitalize()} start date")
+
+
+class HistogramChart(Chart):
+    # Histogram of one column with a user-set number of bins
+    figsize = (6,4)
+
+    def __init__(self, dataset, column, bins):
+        super().__init__(dataset)
+        self.column = column
+        self.bins = bins
+        self.figure = Figure(figsize=self.figsize, dpi=100)
+        self.ax = self.figure.add_subplot(111)
+        self.figures = {"histogram": self.figure}
+        self.createArtists()
+
+    def settings(self):
+        return (self.column, self.bins)
+
+    def setBins(self, bins):
+        # Clamped to MIN_BINS..MAX_BINS; refreshes only on a change
+        bins = max(MIN_BINS, min(MAX_BINS, bins))
+        if bins != self.bins:
+            self.bins = bins
+            self.refresh()
+
+
+class QualiteScoreChart(HistogramChart):
+    def __init__(self, dataset, column="qualite_score", bins=10):
+        super().__init__(dataset, column, bins)
+
+    def createArtists(self):
+        self.bars = HistogramBars(self.ax, maxBins=MAX_BINS, cmap="coolwarm")
+        self.meanLine = self.ax.axvline(0, color="red", linewidth=2, visible=False)
+        self.medianLine = self.ax.axvline(0, color="green", linewidth=2, visible=False)
+        self.messageText = self.ax.text(0.5, 0.5, "", ha="center", va="center", fontsize=12, transform=self.ax.transAxes)
+        self.ax.set_title(f"{self.column} Distribution")
+        self.ax.set_xlabel("Score")
+        self.ax.set_ylabel("Count")
+
+    @profiled
+    def compute(self, dataset):
+        stats = dataset.describe(self.column)
+        result = {"stats": stats, "note": dataset.note() if dataset.isEstimate else ""}
+        if stats["count"] == 0:
+            return result
+        result["histogram"] = dataset.histogram(self.column, self.bins)
+        result["intervals"] = dataset.intervals(self.column) if dataset.isEstimate else {}
+        return result
+
+    @profiled
+    def plot(self, result):
+        stats = result["stats"]
+        self.summary = {"column": self.column, "stats": plainStats(stats)}
+
+        if stats["count"] == 0:
+            self.bars.setVisible(False)
+            self.meanLine.set_visible(False)
+            self.medianLine.set_visible(False)
+            self.messageText.set_text("No valid data")
+            self.showStats("")
+            self.redraw()
+            return
+
+        minVal = stats["min"]
+        maxVal = stats["max"]
+        padding = (maxVal - minVal) * 0.1
+        if padding == 0:
+            padding = 0.05
+
+        counts, binEdges = result["histogram"]
+        self.bars.update(counts, binEdges)
+        self.messageText.set_text("")
+        self.summary["histogram"] = {"counts": counts.tolist(), "edges": binEdges.tolist()}
+
+        meanVal = stats["mean"]
+        medianVal = stats["median"]
+
+        self.meanLine.set_xdata([meanVal, meanVal])
+        self.medianLine.set_xdata([medianVal, medianVal])
+        self.meanLine.set_visible(True)
+        self.medianLine.set_visible(True)
+
+        intervals = result["intervals"]
+        self.showStats(withNote(
+            f"Mean: {withInterval(meanVal, intervals, 'mean', '.3f')}    "
+            f"Median: {withInterval(medianVal, intervals, 'median', '.3f')}",
+            result,
+        ))
+
+        self.ax.set_xlim(minVal - padding, maxVal + padding)
+        self.ax.set_ylim(0, max(self.bars.maxHeight(), 1) * 1.05)
+
+        self.redraw()
+
+
+class InteractionChart(Chart):
+    def __init__(self, dataset, patientColumn, professionalColumn):
+        super().__init__(dataset)
+        self.patientColumn = patientColumn
+        self.professionalColumn = professionalColumn
+
+        self.topFigure = Figure(figsize=(6,3), dpi=100)
+        self.topAx = self.topFigure.add_subplot(111)
+        self.leftFigure = Figure(figsize=(4,3), dpi=100)
+        self.leftAx = self.leftFigure.add_subplot(111)
+        self.rightFigure = Figure(figsize=(4,3), dpi=100)
+        self.rightAx = self.rightFigure.add_subplot(111)
+        self.figures = {"sessions": self.topFigure, "histogram": self.leftFigure, "boxplot": self.rightFigure}
+
+        self.createArtists()
+
+    def settings(self):
+        return (self.patientColumn, self.professionalColumn)
+
+    def createArtists(self):
+        # Millions of sessions are reduced to a min/max envelope per pixel
+        self.patientLine = DecimatedLine(self.topAx, label="Patient", color="blue")
+        self.professionalLine = DecimatedLine(self.topAx, label="Professional", color="red")
+        self.topMessage = self.topAx.text(0.5, 0.5, "", ha="center", va="center", fontsize=12, transform=self.topAx.transAxes)
+        self.topLegend = self.topAx.legend()
+        self.topAx.set_title("Interactions by Session")
+        self.topAx.set_xlabel("Session")
+        self.topAx.set_ylabel("Count")
+
+        alpha = 0.6
+        self.patientBars = HistogramBars(self.leftAx, maxBins=15, color="blue", alpha=alpha, edgecolor=None, label="Patient")
+        self.professionalBars = HistogramBars(self.leftAx, maxBins=15, color="red", alpha=alpha, edgecolor=None, label="Professional")
+        self.leftAx.set_title("Distribution Comparison")
+        self.leftAx.set_xlabel("Count")
+        self.leftAx.set_ylabel("Frequency")
+        self.leftAx.legend()
+
+        self.boxArtists = []
+        self.rightAx.set_title("Boxplot Comparison")
+        self.rightAx.set_ylabel("Count")
+
+    @profiled
+    def compute(self, dataset):
+        # Histograms and boxes come from precomputed bins/quartiles so they
+        # work the same for loaded rows and streamed aggregates. The
+        # per-session series is only taken from the full rows, not samples.
+        result = {
+            "stats": [dataset.describe(col, fillValue=0) for col in self.columns()],
+            "corr": dataset.corr(self.patientColumn, self.professionalColumn, fillValue=0),
+            "histograms": [dataset.histogram(col, 15, fillValue=0) for col in self.columns()],
+            "boxes": [dataset.boxStats(col, fillValue=0) for col in self.columns()],
+            "hasRows": dataset.hasRows,
+            "intervals": [{}, {}],
+            "corrInterval": None,
+            "note": "",
+        }
+        if dataset.isEstimate:
+            result["intervals"] = [dataset.intervals(col, fillValue=0) for col in self.columns()]
+            result["corrInterval"] = dataset.corrInterval(self.patientColumn, self.professionalColumn, fillValue=0)
+            result["note"] = dataset.note()
+        elif dataset.hasRows:
+            result["series"] = [dataset.values(col, fillValue=0).to_numpy() for col in self.columns()]
+        return result
+
+    def columns(self):
+        return [self.patientColumn, self.professionalColumn]
+
+    @profiled
+    def plot(self, result):
+        statsP, statsR = result["stats"]
+        intervalsP, intervalsR = result["intervals"]
+        corr = result["corr"]
+
+        totalP = statsP.get("sum", 0)
+        totalR = statsR.get("sum", 0)
+        meanP = statsP.get("mean", float("nan"))
+        meanR = statsR.get("mean", float("nan"))
+        medianP = statsP.get("median", float("nan"))
+        medianR = statsR.get("median", float("nan"))
+
+        self.showStats(withNote(
+            f"Patient total: {withInterval(totalP, intervalsP, 'sum', '.0f')}   "
+            f"Professional total: {withInterval(totalR, intervalsR, 'sum', '.0f')}   "
+            f"Mean: {withInterval(meanP, intervalsP, 'mean')}/{withInterval(meanR, intervalsR, 'mean')}   "
+            f"Median: {withInterval(medianP, intervalsP, 'median')}/{withInterval(medianR, intervalsR, 'median')}   "
+            f"Correlation: {withInterval(corr, {'corr': result['corrInterval']}, 'corr')}",
+            result,
+        ))
+        self.summary = {"patient": plainStats(statsP), "professional": plainStats(statsR), "correlation": float(corr)}
+
+        if "series" in result:
+            p, r = result["series"]
+            self.patientLine.setData(np.arange(len(p)), p)
+            self.professionalLine.setData(np.arange(len(r)), r)
+            self.topMessage.set_text("")
+            self.topLegend.set_visible(True)
+            if len(p) > 0:
+                low = min(p.min(), r.min())
+                high = max(p.max(), r.max())
+                margin = (high - low) * 0.05 or 0.5
+                self.topAx.set_ylim(low - margin, high + margin)
+                # Triggers the decimation for the full range
+                self.topAx.set_xlim(0, max(len(p) - 1, 1))
+        else:
+            self.patientLine.setData([], [])
+            self.professionalLine.setData([], [])
+            self.topMessage.set_text("Loading sessions..." if result["hasRows"] else "Per-session view needs the rows loaded")
+            self.topLegend.set_visible(False)
+
+        (countsP, edgesP), (countsR, edgesR) = result["histograms"]
+        self.patientBars.update(countsP, edgesP)
+        self.professionalBars.update(countsR, edgesR)
+        self.leftAx.set_xlim(min(edgesP[0], edgesR[0]), max(edgesP[-1], edgesR[-1]))
+        self.leftAx.set_ylim(0, max(self.patientBars.maxHeight(), self.professionalBars.maxHeight(), 1) * 1.05)
+
+        # Box artists are cheap (a few lines each), so only they are rebuilt
+        for artist in self.boxArtists:
+            artist.remove()
+        boxP, boxR = result["boxes"]
+        boxes = [dict(boxP, label="Patient"), dict(boxR, label="Professional")]
+        drawn = self.rightAx.bxp(boxes)
+        self.boxArtists = [artist for artists in drawn.values() for artist in artists]
+        self.rightAx.relim()
+        self.rightAx.autoscale_view()
+        self.redraw()
+
+
+class GradeChart(HistogramChart):
+    figsize = (8,5)
+
+    def __init__(self, dataset, column="note_practicien", bins=10):
+        super().__init__(dataset, column, bins)
+
+    def createArtists(self):
+        self.bars = HistogramBars(self.ax, maxBins=MAX_BINS, cmap="RdYlGn")
+        self.meanLine = self.ax.axvline(0, color="blue", linewidth=2, linestyle="--", label="Mean")
+        self.medianLine = self.ax.axvline(0, color="purple", linewidth=2, linestyle=":", label="Median")
+        self.messageText = self.ax.text(0.5, 0.5, "", ha="center", va="center", fontsize=12, transform=self.ax.transAxes)
+
+        self.ax.set_title("Practitioner Grade Distribution (0-5)", fontsize=14, fontweight="bold")
+        self.ax.set_xlabel("Grade", fontsize=12)
+        self.ax.set_ylabel("Count", fontsize=12)
+        self.ax.set_xlim(0, 5)
+        self.legend = self.ax.legend(loc="upper left")
+        self.ax.grid(axis="y", alpha=0.3)
+
+    def showMessage(self, text):
+        self.bars.setVisible(False)
+        self.meanLine.set_visible(False)
+        self.medianLine.set_visible(False)
+        self.legend.set_visible(False)
+        self.messageText.set_text(text)
+        self.redraw()
+
+    @profiled
+    def compute(self, dataset):
+        # Resolve column robustly (trim/case/accent-insensitive)
+        resolved_col = dataset.resolveColumn(self.column)
+        result = {"column": resolved_col, "note": dataset.note() if dataset.isEstimate else ""}
+        if not resolved_col:
+            result["available"] = list(dataset.columns)
+            return result
+        if dataset.count(resolved_col) == 0:
+            return result
+        result["stats"] = dataset.describe(resolved_col, valueRange=(0, 5))
+        if result["stats"]["count"] == 0:
+            return result
+        result["histogram"] = dataset.histogram(resolved_col, self.bins, valueRange=(0, 5))
+        result["intervals"] = dataset.intervals(resolved_col, valueRange=(0, 5)) if dataset.isEstimate else {}
+        return result
+
+    @profiled
+    def plot(self, result):
+        resolved_col = result["column"]
+        self.summary = {"column": resolved_col or self.column}
+        if not resolved_col:
+            # Artists are hidden, not cleared, so the next plot can reuse them
+            available = ", ".join(map(str, result["available"]))
+            self.showMessage(f"Missing column: {self.column}\nAvailable columns shown below")
+            self.showStats(f"Column '{self.column}' not found. Available: {available}")
+            return
+
+        if "stats" not in result:
+            self.showMessage("No valid data")
+            return
+
+        stats = result["stats"]
+        self.summary["stats"] = plainStats(stats)
+
+        if stats["count"] == 0:
+            self.showMessage("No data in 0-5 range")
+            return
+
+        meanVal = stats["mean"]
+        medianVal = stats["median"]
+        stdVal = stats["std"]
+        minVal = stats["min"]
+        maxVal = stats["max"]
+        totalCount = stats["count"]
+        intervals = result["intervals"]
+
+        counts, binEdges = result["histogram"]
+        self.bars.update(counts, binEdges)
+        self.messageText.set_text("")
+        self.summary["histogram"] = {"counts": counts.tolist(), "edges": binEdges.tolist()}
+
+        self.meanLine.set_xdata([meanVal, meanVal])
+        self.medianLine.set_xdata([medianVal, medianVal])
+        self.meanLine.set_visible(True)
+        self.medianLine.set_visible(True)
+        meanText, medianText = self.legend.get_texts()
+        meanText.set_text(f"Mean: {meanVal:.2f}")
+        medianText.set_text(f"Median: {medianVal:.2f}")
+        self.legend.set_visible(True)
+        self.ax.set_ylim(0, max(self.bars.maxHeight(), 1) * 1.05)
+
+        statsText = (
+            f"Total Grades: {withInterval(totalCount, intervals, 'count', '.0f')}  |  "
+            f"Mean: {withInterval(meanVal, intervals, 'mean')}  |  "
+            f"Median: {withInterval(medianVal, intervals, 'median')}  |  "
+            f"Std Dev: {withInterval(stdVal, intervals, 'std')}  |  "
+            f"Range: [{minVal:.2f} - {maxVal:.2f}]"
+        )
+        self.showStats(withNote(statsText, result))
+
+        self.redraw()
@@ -0,0 +1,336 @@
+import re
+import sys
+import numpy as np
+import pandas as pd
+from pandas.api.extensions import ExtensionArray, ExtensionDtype, no_default, register_extension_dtype, take
+from pandas.api.types import is_bool_dtype, is_float_dtype, is_integer_dtype, is_object_dtype, is_string_dtype
+
+# Compaction of a loaded frame: integers go to the smallest type holding
+# their range, floats to float32 when that is exact, repetitive strings to
+# categoricals and ids such as S0001 to one integer per row (PatternedIdArray)
+# that still displays, sorts and searches as the original strings.
+
+ID_PATTERN = r"^(\D*)(\d{1,18})$"
+# Strings with at most this many distinct values per non-missing value
+# become categoricals
+CATEGORY_MAX_RATIO = 0.5
+# Rows checked against ID_PATTERN before scanning the whole column
+SAMPLE_ROWS = 1000
+
+
+@register_extension_dtype
+class PatternedIdDtype(ExtensionDtype):
+    # <prefix><number> ids sharing one prefix, zero-padded to width digits
+    # (0 = not padded)
+    _metadata = ("prefix", "width")
+    type = str
+    kind = "O"
+    na_value = np.nan
+
+    def __init__(self, prefix="", width=0):
+        self.prefix = prefix
+        self.width = width
+
+    @property
+    def name(self):
+        return f"patterned_id[{self.prefix}:{self.width}]"
+
+    @classmethod
+    def construct_array_type(cls):
+        return PatternedIdArray
+
+    @classmethod
+    def construct_from_string(cls, string):
+        match = re.fullmatch(r"patterned_id\[(\D*):(\d+)\]", string) if isinstance(string, str) else None
+        if match is None:
+            raise TypeError(f"Cannot construct a 'PatternedIdDtype' from '{string}'")
+        return cls(match.group(1), int(match.group(2)))
+
+
+class PatternedIdArray(ExtensionArray):
+    # The id numbers in the smallest integer type, -1 for missing values.
+    # Rows are formatted back to strings only when displayed or converted.
+    def __init__(self, numbers, dtype):
+        self.numbers = np.asarray(numbers)
+        self._dtype = dtype
+
+    @classmethod
+    def _from_sequence(cls, scalars, *, dtype=None, copy=False):
+        if isinstance(scalars, cls):
+            return scalars.copy() if copy else scalars
+        result = encodeIds(pd.Series(np.asarray(scalars, dtype=object)), dtype)
+        if result is None:
+            raise ValueError(f"Values do not match {dtype.name if dtype is not None else ID_PATTERN}")
+        return result
+
+    @classmethod
+    def _from_factorized(cls, values, original):
+        return cls(values.astype(original.numbers.dtype), original.dtype)
+
+    @classmethod
+    def _concat_same_type(cls, to_concat):
+        return cls(np.concatenate([a.numbers for a in to_concat]), to_concat[0].dtype)
+
+    @property
+    def dtype(self):
+        return self._dtype
+
+    @property
+    def nbytes(self):
+        return self.numbers.nbytes
+
+    def __len__(self):
+        return len(self.numbers)
+
+    def __getitem__(self, item):
+        if pd.api.types.is_integer(item):
+            number = self.numbers[item]
+            return self._dtype.na_value if number < 0 else self.format(number)
+        item = pd.api.indexers.check_array_indexer(self, item)
+        return type(self)(self.numbers[item], self._dtype)
+
+    def __setitem__(self, key, value):
+        key = pd.api.indexers.check_array_indexer(self, key)
+        numbers = self.encode([value] if pd.api.types.is_scalar(value) else value)
+        # Memory-mapped cache columns are read-only
+        if not self.numbers.flags.writeable:
+            self.numbers = self.numbers.copy()
+        self.numbers[key] = numbers[0] if pd.api.types.is_scalar(value) else numbers
+
+    def __iter__(self):
+        return iter(self.strings())
+
+    def __eq__(self, other):
+        if isinstance(other, (pd.Series, pd.Index, pd.DataFrame)):
+            return NotImplemented
+        if isinstance(other, PatternedIdArray):
+            other = other.strings()
+        return self.strings() == other
+
+    def __array__(self, dtype=None, copy=None):
+        strings = self.strings()
+        return strings if dtype is None else strings.astype(dtype)
+
+    def encode(self, values):
+        encoded = encodeIds(pd.Series(np.asarray(values, dtype=object)), self._dtype)
+        if encoded is None:
+            raise ValueError(f"Values do not match {self._dtype.name}")
+        return encoded.numbers
+
+    def format(self, number):
+        return f"{self._dtype.prefix}{number:0{self._dtype.width}d}"
+
+    def strings(self):
+        # Object array of the formatted ids, NaN where missing
+        valid = self.numbers >= 0
+        result = np.full(len(self.numbers), np.nan, dtype=object)
+        result[valid] = self.formatted(self.numbers[valid])
+        return result
+
+    def formatted(self, numbers, prefix=None):
+        # Fixed-width numpy str array of the given (valid) numbers
+        digits = numbers.astype(str)
+        if self._dtype.width and len(digits):
+            digits = np.char.zfill(digits, self._dtype.width)
+        return np.char.add(self._dtype.prefix if prefix is None else prefix, digits)
+
+    def isna(self):
+        return self.numbers < 0
+
+    def take(self, indices, allow_fill=False, fill_value=None):
+        fill = -1
+        if allow_fill and fill_value is not None and not pd.isna(fill_value):
+            fill = self.encode([fill_value])[0]
+        return type(self)(take(self.numbers, indices, allow_fill=allow_fill, fill_value=fill), self._dtype)
+
+    def copy(self):
+        return type(self)(self.numbers.copy(), self._dtype)
+
+    def astype(self, dtype, copy=True):
+        dtype = pd.api.types.pandas_dtype(dtype)
+        if dtype == self._dtype:
+            return self.copy() if copy else self
+        if isinstance(dtype, ExtensionDtype):
+            return dtype.construct_array_type()._from_sequence(self.strings(), dtype=dtype, copy=False)
+        return self.strings().astype(dtype)
+
+    def _values_for_factorize(self):
+        return self.numbers.astype(np.int64), -1
+
+    def _values_for_argsort(self):
+        # Zero-padded ids sort like their strings by number; unpadded ones
+        # ("S9" > "S10") by their strings
+        return self.numbers if self._dtype.width else self.strings()
+
+    # Series.str methods, run on the formatted ids. As in an object column,
+    # missing ids give na, or NaN in an object result when na is not given.
+
+    def _str_startswith(self, pat, na=no_default):
+        pats = (pat,) if isinstance(pat, str) else tuple(pat)
+        return self._strResult(lambda ids: np.logical_or.reduce([np.char.startswith(ids, p) for p in pats]), na)
+
+    def _str_endswith(self, pat, na=no_default):
+        pats = (pat,) if isinstance(pat, str) else tuple(pat)
+        return self._strResult(lambda ids: np.logical_or.reduce([np.char.endswith(ids, p) for p in pats]), na)
+
+    def _str_contains(self, pat, case=True, flags=0, na=no_default, regex=True):
+        if regex:
+            pattern = re.compile(pat, flags if case else flags | re.IGNORECASE)
+            return self._strResult(lambda ids: self._regexMatches(ids, pattern.search), na)
+        if case:
+            return self._strResult(lambda ids: np.char.find(ids, pat) >= 0, na)
+        return self._strResult(lambda ids: np.char.find(np.char.lower(ids), pat.lower()) >= 0, na)
+
+    def _str_match(self, pat, case=True, flags=0, na=no_default):
+        pattern = re.compile(pat, flags if case else flags | re.IGNORECASE)
+        return self._strResult(lambda ids: self._regexMatches(ids, pattern.match), na)
+
+    def _str_fullmatch(self, pat, case=True, flags=0, na=no_default):
+        pattern = re.compile(pat, flags if case else flags | re.IGNORECASE)
+        return self._strResult(lambda ids: self._regexMatches(ids, pattern.fullmatch), na)
+
+    def _str_lower(self):
+        return self._strResult(lambda ids: np.char.lower(ids).astype(object))
+
+    def _str_upper(self):
+        return self._strResult(lambda ids: np.char.upper(ids).astype(object))
+
+    def _str_len(self):
+        lengths = self._strResult(np.char.str_len)
+        return lengths.astype(np.float64) if lengths.dtype == object else lengths.astype(np.int64)
+
+    @staticmethod
+    def _regexMatches(ids, method):
+        return np.fromiter((method(x) is not None for x in ids), dtype=bool, count=len(ids))
+
+    def _strResult(self, compute, na=no_default):
+        # compute: formatted valid ids -> their results
+        valid = self.numbers >= 0
+        values = np.asarray(compute(self.formatted(self.numbers[valid])))
+        if valid.all():
+            return values
+        result = np.full(len(valid), np.nan if na is no_default else na, dtype=object if na is no_default else values.dtype)
+        result[valid] = values
+        return result
+
+
+def encodeIds(values, dtype=None):
+    # PatternedIdArray for a Series of strings, or None when the values do
+    # not share one prefix and one number format: a fixed digit count
+    # (zero-padded) or varying counts without leading zeros
+    present = values.notna().to_numpy()
+    parts = values[present].astype(object).str.extract(ID_PATTERN)
+    if parts[1].isna().any():
+        return None
+    prefixes = parts[0].unique()
+    digits = parts[1]
+    lengths = digits.str.len()
+    if dtype is None:
+        if len(prefixes) > 1:
+            return None
+        fixed = len(lengths) > 0 and lengths.min() == lengths.max()
+        dtype = PatternedIdDtype(prefixes[0] if len(prefixes) else "", int(lengths.min()) if fixed else 0)
+    elif len(prefixes) > 1 or (len(prefixes) and prefixes[0] != dtype.prefix):
+        return None
+    if dtype.width:
+        if (lengths != dtype.width).any():
+            return None
+    elif (digits.str.startswith("0") & (lengths > 1)).any():
+        return None
+    numbers = np.full(len(values), -1, dtype=np.int64)
+    numbers[present] = digits.astype(np.int64).to_numpy()
+    return PatternedIdArray(numbers.astype(smallestInteger(-1, numbers.max(initial=0)) or np.int64), dtype)
+
+
+def smallestInteger(lo, hi):
+    # Smallest signed numpy integer type holding [lo, hi], or None
+    for bits in (8, 16, 32):
+        info = np.iinfo(f"int{bits}")
+        if info.min <= lo and hi <= info.max:
+            return np.dtype(f"int{bits}")
+    return None
+
+
+def compactColumn(series):
+    dtype = series.dtype
+    if isinstance(dtype, (pd.CategoricalDtype, PatternedIdDtype)) or is_bool_dtype(dtype):
+        return series
+    nullable = isinstance(dtype, ExtensionDtype)
+    if is_integer_dtype(dtype):
+        values = series.dropna()
+        target = smallestInteger(values.min(), values.max()) if len(values) else None
+        if target is None or target.itemsize >= dtype.itemsize:
+            return series
+        return series.astype(f"Int{target.itemsize * 8}" if nullable else target)
+    if is_float_dtype(dtype):
+        if dtype.itemsize <= 4:
+            return series
+        values = series.to_numpy(dtype="float64", na_value=np.nan)
+        # Only exact conversions: 0.89 as float32 would change the stats
+        if not np.array_equal(values.astype(np.float32).astype(np.float64), values, equal_nan=True):
+            return series
+        return series.astype("Float32" if nullable else np.float32)
+    if is_object_dtype(dtype) or is_string_dtype(dtype):
+        sample = series.dropna().head(SAMPLE_ROWS)
+        if len(sample) and sample.astype(str).str.fullmatch(ID_PATTERN).all():
+            ids = encodeIds(series)
+            if ids is not None:
+                return pd.Series(ids, index=series.index, name=series.name)
+        count = series.count()
+        if count and series.nunique() <= CATEGORY_MAX_RATIO * count:
+            return series.astype("category")
+    return series
+
+
+def compactFrame(df):
+    # (compacted frame, per-column memory report)
+    columns = {}
+    report = []
+    for col in df.columns:
+        before = df[col]
+        after = compactColumn(before)
+        columns[col] = after
+        report.append({
+            "column": str(col),
+            "dtypeBefore": str(before.dtype),
+            "dtypeAfter": str(after.dtype),
+            "bytesBefore": int(before.memory_usage(index=False, deep=True)),
+            "bytesAfter": int(after.memory_usage(index=False, deep=True)),
+        })
+    return pd.DataFrame(columns, index=df.index), report
+
+
+def mergeReports(reports, df):
+    # Per-file reports of a multi-file load, measured again on the combined frame
+    merged = {}
+    for report in reports:
+        for entry in report or []:
+            total = merged.setdefault(entry["column"], dict(entry, bytesBefore=0))
+            total["bytesBefore"] += entry["bytesBefore"]
+    for col in df.columns:
+        entry = merged.setdefault(str(col), {"column": str(col), "dtypeBefore": "", "bytesBefore": 0})
+        entry["dtypeAfter"] = str(df[col].dtype)
+        entry["bytesAfter"] = int(df[col].memory_usage(index=False, deep=True))
+    return [merged[str(col)] for col in df.columns]
+
+
+def formatReport(report):
+    lines = [f"{'column':<24} {'before':>22} {'after':>22} {'MB before':>10} {'MB after':>10}"]
+    for entry in report:
+        lines.append(
+            f"{entry['column']:<24} {entry['dtypeBefore']:>22} {entry['dtypeAfter']:>22} "
+            f"{entry['bytesBefore'] / 1e6:>10.2f} {entry['bytesAfter'] / 1e6:>10.2f}"
+        )
+    before = sum(e["bytesBefore"] for e in report)
+    after = sum(e["bytesAfter"] for e in report)
+    lines.append(f"{'total':<24} {'':>22} {'':>22} {before / 1e6:>10.2f} {after / 1e6:>10.2f}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    from csvLoader import CsvLoader
+    for path in sys.argv[1:]:
+        loader = CsvLoader(path)
+        loader.load()
+        print(path)
+        print(formatReport(loader.memoryReport))
@@ -1,22 +1,37 @@
 import tkinter as tk
 from tkinter import ttk
-import pandas as pd
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from matplotlib.figure import Figure
-import matplotlib.dates as mdates
-import matplotlib.pyplot as plt
-import numpy as np
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
+from charts import TopValuesChart, DateCurveChart
+from timePyramid import RESOLUTIONS
+from heavyHitters import TOP_K
+from scheduler import scheduler
+from viewCache import drawCached
 
 
 
-class CSVAnalyzer:
-    def __init__(self, parent, df, column):
-        self.df = df
-        self.column = column
+class CSVAnalyzer(TopValuesChart):
+    def __init__(self, parent, dataset, column, k=TOP_K):
+        super().__init__(dataset, column, k)
         self.parent = parent
         self.frame = tk.Frame(parent)
         self.frame.pack(expand=True, fill="both")
 
+        # Any column can be chosen; its top k values are shown with the rest
+        # grouped as "Other"
+        controls = tk.Frame(self.frame)
+        controls.pack(fill="x", padx=10, pady=5)
+        tk.Label(controls, text="Column:").pack(side="left")
+        self.columnVar = tk.StringVar(value=column)
+        self.columnBox = ttk.Combobox(controls, textvariable=self.columnVar, state="readonly", width=25,
+                                      values=list(map(str, dataset.columns)))
+        self.columnBox.pack(side="left", padx=5)
+        self.columnBox.bind("<<ComboboxSelected>>", self.onColumnChanged)
+        tk.Label(controls, text="Top:").pack(side="left", padx=(15, 2))
+        self.kVar = tk.IntVar(value=k)
+        self.kSpinbox = tk.Spinbox(controls, from_=1, to=50, width=4, textvariable=self.kVar, command=self.onKChanged)
+        self.kSpinbox.pack(side="left")
+        self.kSpinbox.bind("<Return>", self.onKChanged)
+
         # Top 3 display at the top
         self.top3Frame = tk.Frame(self.frame)
         self.top3Frame.pack(pady=10, fill="x")
@@ -39,30 +54,34 @@ class CSVAnalyzer:
         scrollY.pack(side="right", fill="y")
 
         # Pie chart at the bottom
-        self.figure = Figure(figsize=(6, 4), dpi=100)
-        self.ax = self.figure.add_subplot(111)
         self.canvas = FigureCanvasTkAgg(self.figure, master=self.frame)
         self.canvas.get_tk_widget().pack(expand=True, fill="both")
 
-        self.analyze()
+        self.refresh()
 
-    def analyze(self):
-        if self.column not in self.df.columns:
-            return
+    def refresh(self):
+        scheduler.refreshChart(self)
 
-        # Get all values instead of just top 10
-        valueCounts = self.df[self.column].value_counts()
-        topDf = valueCounts.reset_index()
-        topDf.columns = [self.column, "Count"]
+    def onColumnChanged(self, event=None):
+        column = self.columnVar.get()
+        if column != self.column:
+            self.column = column
+            self.refresh()
 
-        # Update Top 3 display (percentage based on total to match pie chart)
-        top3Text = ""
-        totalAll = valueCounts.sum()
-        for i, (value, count) in enumerate(valueCounts.head(3).items(), 1):
-            percentage = (count / totalAll) * 100
-            top3Text += f"{i}. {value}: {count} ({percentage:.1f}%)\n"
-        self.top3Display.config(text=top3Text)
+    def onKChanged(self, event=None):
+        try:
+            k = int(self.kVar.get())
+        except (tk.TclError, ValueError):
+            return
+        k = max(1, min(50, k))
+        if k != self.k:
+            self.k = k
+            self.refresh()
 
+    def showStats(self, text):
+        self.top3Display.config(text=text)
+
+    def showTable(self, topDf):
         # Update table
         self.tree["columns"] = list(topDf.columns)
         self.tree["show"] = "headings"
@@ -73,77 +92,49 @@ class CSVAnalyzer:
         for item in self.tree.get_children():
             self.tree.delete(item)
 
-        for _, row in topDf.iterrows():
+        for row in topDf.itertuples(index=False):
             self.tree.insert("", "end", values=list(row))
 
-        # Create pie chart
-        self.ax.clear()
-        colors = plt.cm.Set3(range(len(valueCounts)))
-        
-        # Only show percentage for slices above 5% to avoid overlap
-        def autopct_format(pct):
-            return f'{pct:.1f}%' if pct > 5 else ''
-        
-        wedges, texts, autotexts = self.ax.pie(valueCounts.values, autopct=autopct_format, 
-                    startangle=90, colors=colors)
-        self.ax.legend(wedges, valueCounts.index, title=self.column, 
-                      loc="center left", bbox_to_anchor=(1, 0, 0.5, 1))
-        self.ax.set_title(f"Distribution of {self.column}")
-        self.figure.tight_layout()
-        self.canvas.draw()
-
-class DateCurveAnalyzer:
-    def __init__(self, parent, df, dateColumn="date", durationColumn="duree_minutes"):
-        self.df = df
-        self.dateColumn = dateColumn
-        self.durationColumn = durationColumn
+    def redraw(self):
+        drawCached(self.canvas, self.shownKey)
+
+class DateCurveAnalyzer(DateCurveChart):
+    def __init__(self, parent, dataset, dateColumn="date", durationColumn="duree_minutes"):
+        super().__init__(dataset, dateColumn, durationColumn)
         self.parent = parent
         self.frame = tk.Frame(parent)
         self.frame.pack(expand=True, fill="both")
 
-        self.avgLabel = tk.Label(self.frame, text="", anchor="e", font=("Arial", 10))
-        self.avgLabel.pack(fill="x", padx=10, pady=5)
+        controls = tk.Frame(self.frame)
+        controls.pack(fill="x", padx=10, pady=5)
+        tk.Label(controls, text="Resolution:").pack(side="left")
+        self.resolutionVar = tk.StringVar(value="Auto")
+        self.resolutionBox = ttk.Combobox(controls, textvariable=self.resolutionVar, state="readonly", width=10,
+                                          values=["Auto"] + [r.capitalize() for r in RESOLUTIONS])
+        self.resolutionBox.pack(side="left", padx=5)
+        self.resolutionBox.bind("<<ComboboxSelected>>", lambda event: self.setResolution(self.resolutionVar.get().lower()))
+        self.avgLabel = tk.Label(controls, text="", anchor="e", font=("Arial", 10))
+        self.avgLabel.pack(side="right")
 
-        self.figure = Figure(figsize=(6,4), dpi=100)
-        self.ax = self.figure.add_subplot(111)
         self.canvas = FigureCanvasTkAgg(self.figure, master=self.frame)
         self.canvas.get_tk_widget().pack(expand=True, fill="both")
+        # Zoom/pan re-picks the resolution and window from the pyramid
+        self.toolbar = NavigationToolbar2Tk(self.canvas, self.frame, pack_toolbar=False)
+        self.toolbar.update()
+        self.toolbar.pack(fill="x")
+
+        self.refresh()
 
-        self.prepareData()
-        self.plotCurve()
-
-    def prepareData(self):
-        dfCopy = self.df.copy()
-        dfCopy[self.dateColumn] = pd.to_datetime(dfCopy[self.dateColumn], errors='coerce')
-        dfCopy = dfCopy.dropna(subset=[self.dateColumn])
-        dfCopy[self.durationColumn] = pd.to_numeric(dfCopy[self.durationColumn], errors='coerce')
-
-        dfCopy['weekStart'] = dfCopy[self.dateColumn] - pd.to_timedelta(dfCopy[self.dateColumn].dt.weekday, unit='d')
-        groupedCount = dfCopy.groupby('weekStart').size()
-        groupedAvgDuration = dfCopy.groupby('weekStart')[self.durationColumn].mean()
-
-        self.dates = pd.to_datetime(list(groupedCount.index))
-        self.values = np.array(list(groupedCount.values))
-        self.avgDurations = {d: groupedAvgDuration[d] for d in groupedAvgDuration.index}
-        self.datesNum = mdates.date2num(self.dates)
-
-        durations = dfCopy[self.durationColumn].dropna()
-        if len(durations) > 0:
-            avgMinutes = durations.mean()
-            hours = int(avgMinutes // 60)
-            minutes = int(avgMinutes % 60)
-            self.avgLabel.config(text=f"Average session time: {hours}h {minutes}min")
-        else:
-            self.avgLabel.config(text="Average session time: N/A")
+    def refresh(self):
+        scheduler.refreshChart(self)
 
     def plotCurve(self):
-        self.ax.clear()
-        self.ax.plot(self.datesNum, self.values, marker='o', linestyle='-')
-        self.ax.xaxis.set_major_locator(mdates.WeekdayLocator(byweekday=mdates.MO))
-        self.ax.xaxis.set_major_formatter(mdates.DateFormatter("%Y-%m-%d"))
-        self.ax.set_title("Number of entries per week")
-        self.ax.set_xlabel("Week start date")
-        self.ax.set_ylabel("Count")
-        self.ax.tick_params(axis='x', rotation=45)
-        self.figure.tight_layout()
-        self.canvas.draw()
+        super().plotCurve()
+        # New data resets the toolbar's home view
+        self.toolbar.update()
+
+    def showStats(self, text):
+        self.avgLabel.config(text=text)
+
+    def redraw(self):
+        self.canvas.draw_idle()
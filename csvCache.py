@@ -0,0 +1,191 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+import uuid
+import numpy as np
+import pandas as pd
+from compaction import PatternedIdArray, PatternedIdDtype
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "csv-analysis-app")
+DEFAULT_MAX_BYTES = 4 * 1024 ** 3
+FINGERPRINT_BYTES = 1024 ** 2
+# Bumped when stored frames change shape (2: compacted dtypes, patterned ids)
+CACHE_FORMAT = 2
+
+
+def fileFingerprint(filePath, size):
+    # Hash of the head and tail of the file. Hashing a multi-GB export in full
+    # would cost as much as parsing it; combined with size and mtime this
+    # catches edits and appends.
+    digest = hashlib.blake2b(digest_size=16)
+    with open(filePath, "rb") as fh:
+        digest.update(fh.read(FINGERPRINT_BYTES))
+        if size > 2 * FINGERPRINT_BYTES:
+            fh.seek(-FINGERPRINT_BYTES, os.SEEK_END)
+            digest.update(fh.read(FINGERPRINT_BYTES))
+    return digest.hexdigest()
+
+
+class CsvCache:
+    # On-disk columnar copy of parsed CSVs: one .npy file per column (plus
+    # codes/masks), memory-mapped on load instead of re-parsing the text.
+    def __init__(self, cacheDir=None, maxBytes=None):
+        self.cacheDir = cacheDir or os.environ.get("CSV_ANALYZER_CACHE_DIR", DEFAULT_CACHE_DIR)
+        self.maxBytes = maxBytes if maxBytes is not None else DEFAULT_MAX_BYTES
+        os.makedirs(self.cacheDir, exist_ok=True)
+        self._removeLeftovers()
+
+    def cacheKey(self, filePath):
+        filePath = os.path.abspath(filePath)
+        stat = os.stat(filePath)
+        fingerprint = fileFingerprint(filePath, stat.st_size)
+        raw = f"{filePath}|{stat.st_size}|{stat.st_mtime_ns}|{fingerprint}"
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def load(self, filePath):
+        # Returns the cached DataFrame, or None on a miss
+        return self.loadEntry(filePath)[0]
+
+    def loadEntry(self, filePath):
+        # (DataFrame, entry metadata), or (None, None) on a miss
+        key = self.cacheKey(filePath)
+        entryDir = os.path.join(self.cacheDir, key)
+        metaPath = os.path.join(entryDir, "meta.json")
+        if not os.path.exists(metaPath):
+            self.invalidate(filePath, keep=None)
+            return None, None
+        try:
+            with open(metaPath, encoding="utf-8") as fh:
+                meta = json.load(fh)
+            if meta.get("format") != CACHE_FORMAT:
+                raise ValueError("old cache format")
+            columns = {c["name"]: self._loadColumn(entryDir, c) for c in meta["columns"]}
+        except (OSError, ValueError, KeyError):
+            shutil.rmtree(entryDir, ignore_errors=True)
+            return None, None
+        # Entry mtime records the last use for LRU eviction
+        os.utime(metaPath)
+        return pd.DataFrame(columns, copy=False), meta
+
+    def store(self, filePath, df, extra=None):
+        # extra: JSON-able fields kept in the entry metadata
+        key = self.cacheKey(filePath)
+        tmpDir = os.path.join(self.cacheDir, f"tmp-{uuid.uuid4().hex}")
+        os.makedirs(tmpDir)
+        try:
+            columns = [self._storeColumn(tmpDir, i, df[col]) for i, col in enumerate(df.columns)]
+            meta = dict(extra or {})
+            meta.update({
+                "format": CACHE_FORMAT,
+                "source": os.path.abspath(filePath),
+                "rows": len(df),
+                "created": time.time(),
+                "columns": columns,
+            })
+            with open(os.path.join(tmpDir, "meta.json"), "w", encoding="utf-8") as fh:
+                json.dump(meta, fh)
+            entryDir = os.path.join(self.cacheDir, key)
+            shutil.rmtree(entryDir, ignore_errors=True)
+            os.rename(tmpDir, entryDir)
+        except Exception:
+            shutil.rmtree(tmpDir, ignore_errors=True)
+            raise
+        self.invalidate(filePath, keep=key)
+        self.evict()
+
+    def invalidate(self, filePath, keep=None):
+        # Drop entries built from an older version of this file
+        source = os.path.abspath(filePath)
+        for key, meta in self._entries():
+            if key != keep and meta.get("source") == source:
+                shutil.rmtree(os.path.join(self.cacheDir, key), ignore_errors=True)
+
+    def evict(self):
+        # Remove least recently used entries until the cache fits its budget
+        entries = []
+        for key, _ in self._entries():
+            entryDir = os.path.join(self.cacheDir, key)
+            lastUsed = os.path.getmtime(os.path.join(entryDir, "meta.json"))
+            entries.append((lastUsed, key, self._dirSize(entryDir)))
+        total = sum(size for _, _, size in entries)
+        for _, key, size in sorted(entries):
+            if total <= self.maxBytes:
+                break
+            shutil.rmtree(os.path.join(self.cacheDir, key), ignore_errors=True)
+            total -= size
+
+    def _entries(self):
+        for key in os.listdir(self.cacheDir):
+            metaPath = os.path.join(self.cacheDir, key, "meta.json")
+            if key.startswith("tmp-") or not os.path.exists(metaPath):
+                continue
+            try:
+                with open(metaPath, encoding="utf-8") as fh:
+                    yield key, json.load(fh)
+            except (OSError, ValueError):
+                continue
+
+    def _removeLeftovers(self):
+        for name in os.listdir(self.cacheDir):
+            if name.startswith("tmp-"):
+                shutil.rmtree(os.path.join(self.cacheDir, name), ignore_errors=True)
+
+    def _dirSize(self, path):
+        return sum(entry.stat().st_size for entry in os.scandir(path) if entry.is_file())
+
+    def _storeColumn(self, entryDir, i, series):
+        info = {"name": series.name, "file": f"col{i}"}
+        base = os.path.join(entryDir, info["file"])
+        dtype = series.dtype
+        if isinstance(dtype, pd.CategoricalDtype):
+            info["kind"] = "category"
+            np.save(base + ".npy", series.cat.codes.to_numpy())
+            np.save(base + ".categories.npy", self._plainArray(series.cat.categories.to_series()))
+        elif isinstance(dtype, PatternedIdDtype):
+            info["kind"] = "patterned"
+            info["dtype"] = dtype.name
+            np.save(base + ".npy", series.array.numbers)
+        elif pd.api.types.is_datetime64_any_dtype(dtype) and not isinstance(dtype, pd.DatetimeTZDtype):
+            info["kind"] = "datetime"
+            info["dtype"] = str(dtype)
+            np.save(base + ".npy", series.to_numpy().view("int64"))
+        elif isinstance(dtype, pd.api.extensions.ExtensionDtype) and pd.api.types.is_numeric_dtype(dtype):
+            # Nullable Int64/Float64/boolean: values plus missing mask
+            info["kind"] = "masked"
+            info["dtype"] = str(dtype)
+            np.save(base + ".npy", series.to_numpy(dtype=dtype.numpy_dtype, na_value=0))
+            np.save(base + ".mask.npy", series.isna().to_numpy())
+        elif isinstance(dtype, np.dtype) and dtype.kind in "biuf":
+            info["kind"] = "numeric"
+            np.save(base + ".npy", series.to_numpy())
+        else:
+            # Strings and anything else: fixed-width unicode, which can be mapped
+            info["kind"] = "string"
+            np.save(base + ".npy", self._plainArray(series))
+            np.save(base + ".mask.npy", series.isna().to_numpy())
+        return info
+
+    def _plainArray(self, series):
+        return series.fillna("").astype(str).to_numpy(dtype="U")
+
+    def _loadColumn(self, entryDir, info):
+        base = os.path.join(entryDir, info["file"])
+        values = np.load(base + ".npy", mmap_mode="r")
+        kind = info["kind"]
+        if kind == "numeric":
+            return values
+        if kind == "datetime":
+            return values.view(info["dtype"])
+        if kind == "patterned":
+            return PatternedIdArray(values, PatternedIdDtype.construct_from_string(info["dtype"]))
+        if kind == "category":
+            categories = np.load(base + ".categories.npy")
+            return pd.Categorical.from_codes(values, categories)
+        mask = np.load(base + ".mask.npy", mmap_mode="r")
+        if kind == "masked":
+            array = pd.array(np.asarray(values), dtype=info["dtype"])
+            array[np.asarray(mask)] = pd.NA
+            return array
+        return pd.Series(values, dtype=str).where(~np.asarray(mask))
@@ -0,0 +1,267 @@
+import glob
+import multiprocessing
+import os
+import time
+import numpy as np
+import pandas as pd
+from pandas.api.types import infer_dtype, is_object_dtype, union_categoricals
+from aggregates import SessionAggregates
+from backgroundJob import BackgroundJob
+from csvCache import CsvCache
+from compaction import compactColumn, compactFrame, mergeReports
+from profiler import phase, profiled
+
+# Explicit schema for the known session export columns, so the parser
+# does not have to infer types. Columns missing from a file are ignored.
+KNOWN_DTYPES = {
+    "session_id": str,
+    "service": "category",
+    "langue": "category",
+    "device": "category",
+    "duree_minutes": "Int64",
+    "interactions_patient": "Int64",
+    "interactions_praticien": "Int64",
+    "interactions_totales": "Int64",
+    "note_praticien": "float64",
+    "qualite_score": "float64",
+    "segments_non_reconnus": "Int64",
+}
+KNOWN_DATES = ["date"]
+# Added by MultiCsvLoader: the file each row came from
+SOURCE_COLUMN = "source_file"
+
+
+def findCsvFiles(paths):
+    # Files, directories (their *.csv) and glob patterns, in order, deduplicated
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(glob.glob(os.path.join(path, "*.csv"))))
+        elif glob.has_magic(path):
+            files.extend(sorted(glob.glob(path)))
+        else:
+            files.append(path)
+    return list(dict.fromkeys(os.path.abspath(f) for f in files))
+
+
+def readHeader(filePath):
+    return list(pd.read_csv(filePath, nrows=0).columns)
+
+
+def buildSchema(columns, usecols=None):
+    columns = [c for c in columns if usecols is None or c in usecols]
+    dtype = {c: t for c, t in KNOWN_DTYPES.items() if c in columns}
+    parseDates = [c for c in KNOWN_DATES if c in columns]
+    return {"dtype": dtype, "usecols": usecols, "parse_dates": parseDates}
+
+
+def concatChunks(chunks):
+    if not chunks:
+        return pd.DataFrame()
+    if len(chunks) == 1:
+        return chunks[0]
+    # Plain concat turns categoricals with differing categories into object
+    # columns, so unify them explicitly first
+    columns = {}
+    for col in chunks[0].columns:
+        parts = [chunk[col] for chunk in chunks]
+        if all(isinstance(p.dtype, pd.CategoricalDtype) for p in parts):
+            columns[col] = pd.Series(union_categoricals(parts))
+        else:
+            columns[col] = pd.concat(parts, ignore_index=True)
+    return pd.DataFrame(columns)
+
+
+def sourceNames(filePaths):
+    # Base names, or full paths where two files share a base name
+    names = [os.path.basename(p) for p in filePaths]
+    if len(set(names)) < len(names):
+        return list(filePaths)
+    return names
+
+
+def concatFiles(frames, filePaths):
+    # One frame per file -> one frame with a categorical source column. The
+    # source codes are the file positions, so no strings are built per row.
+    columns = list(dict.fromkeys(col for frame in frames for col in frame.columns))
+    frames = [frame if list(frame.columns) == columns else frame.reindex(columns=columns) for frame in frames]
+    df = concatChunks(frames)
+    # Files compact on their own: a column encoded differently per file (ids
+    # of different widths, categorical in one file only) comes out of concat
+    # as objects. Those are encoded again, keeping whichever form is smaller.
+    for col in df.columns:
+        if is_object_dtype(df[col].dtype) and infer_dtype(df[col], skipna=True) == "string":
+            strings = df[col].astype("str")
+            compacted = compactColumn(strings)
+            smaller = compacted.memory_usage(index=False, deep=True) < strings.memory_usage(index=False, deep=True)
+            df[col] = compacted if smaller else strings
+    if SOURCE_COLUMN not in df.columns:
+        lengths = [len(frame) for frame in frames]
+        codes = np.repeat(np.arange(len(frames), dtype=np.int32), lengths)
+        df[SOURCE_COLUMN] = pd.Categorical.from_codes(codes, categories=sourceNames(filePaths))
+    return df
+
+
+def loadCsvFile(filePath, cacheDir=None, streaming=False):
+    # Process pool job: one file through the regular loader and its cache;
+    # returns (frame or aggregates, memory report)
+    cache = None
+    if cacheDir is not None:
+        try:
+            cache = CsvCache(cacheDir)
+        except OSError:
+            pass
+    loader = CsvLoader(filePath, cache=cache, streaming=streaming)
+    return loader.load(), loader.memoryReport
+
+
+class CsvLoader(BackgroundJob):
+    # Reads a CSV in chunks on a worker thread (backgroundJob.BackgroundJob).
+    # With streaming=True each chunk is folded into SessionAggregates and
+    # dropped, so files larger than memory can be summarized in one pass.
+    def __init__(self, filePath, chunkSize=200_000, usecols=None, cache=None, streaming=False):
+        super().__init__()
+        self.filePath = filePath
+        self.chunkSize = chunkSize
+        self.usecols = usecols
+        self.cache = cache
+        self.streaming = streaming
+        self.totalBytes = os.path.getsize(filePath)
+        # Per-column memory before/after compaction (compaction.compactFrame)
+        self.memoryReport = None
+
+    def run(self):
+        df, self.fromCache = self._loadOrRead()
+        return df
+
+    def finished(self, df):
+        # Stored once the UI has the frame, so it does not wait for the write
+        if not self.fromCache:
+            self._storeCached(df)
+
+    def load(self):
+        # Synchronous version of start() for callers without a UI (batch
+        # reports); returns the frame, or None when cancelled
+        df, cached = self._loadOrRead()
+        if df is not None and not cached:
+            self._storeCached(df)
+        return df
+
+    @profiled(name="CsvLoader.load")
+    def _loadOrRead(self):
+        with phase("CsvLoader.cacheLoad"):
+            df = self._loadCached()
+        if df is not None:
+            self.messages.put(("progress", len(df), self.totalBytes, self.totalBytes, 0.0))
+            return df, True
+        schema = buildSchema(readHeader(self.filePath), self.usecols)
+        try:
+            df = self._read(schema)
+        except (ValueError, TypeError):
+            # The file does not match the known schema: let pandas infer
+            schema["dtype"] = None
+            df = self._read(schema)
+        if df is not None and not self.streaming:
+            with phase("CsvLoader.compact"):
+                df, self.memoryReport = compactFrame(df)
+        return df, False
+
+    def _loadCached(self):
+        # The columnar cache only holds full-column loads
+        if self.cache is None or self.usecols is not None or self.streaming:
+            return None
+        try:
+            df, meta = self.cache.loadEntry(self.filePath)
+        except OSError:
+            return None
+        if meta is not None:
+            self.memoryReport = meta.get("memoryReport")
+        return df
+
+    def _storeCached(self, df):
+        if self.cache is None or self.usecols is not None or self.streaming:
+            return
+        try:
+            with phase("CsvLoader.cacheStore"):
+                self.cache.store(self.filePath, df, {"memoryReport": self.memoryReport})
+        except OSError:
+            pass
+
+    def _read(self, schema):
+        startTime = time.perf_counter()
+        chunks = []
+        aggregates = None
+        rows = 0
+        with phase("CsvLoader.parse"), open(self.filePath, "rb") as fh:
+            reader = pd.read_csv(fh, chunksize=self.chunkSize, **schema)
+            for chunk in reader:
+                if self.cancelEvent.is_set():
+                    return None
+                if self.streaming:
+                    if aggregates is None:
+                        aggregates = SessionAggregates(chunk.columns)
+                    aggregates.update(chunk)
+                else:
+                    chunks.append(chunk)
+                rows += len(chunk)
+                elapsed = time.perf_counter() - startTime
+                self.messages.put(("progress", rows, fh.tell(), self.totalBytes, elapsed))
+        if self.streaming:
+            return aggregates if aggregates is not None else SessionAggregates(readHeader(self.filePath))
+        with phase("CsvLoader.concat"):
+            return concatChunks(chunks)
+
+
+class MultiCsvLoader(BackgroundJob):
+    # Several CSVs (one export per site and month) parsed in parallel, one
+    # process per file, and assembled into one frame. Same queue protocol as
+    # CsvLoader; progress advances as whole files finish. Categoricals are
+    # merged with union_categoricals, which only unions the category lists
+    # and remaps the integer codes.
+    def __init__(self, filePaths, cache=None, streaming=False, workers=None):
+        super().__init__()
+        self.filePaths = list(filePaths)
+        self.cache = cache
+        self.streaming = streaming
+        self.workers = max(1, min(workers or os.cpu_count() or 1, len(self.filePaths)))
+        self.sizes = [os.path.getsize(p) for p in self.filePaths]
+        self.totalBytes = sum(self.sizes)
+        self.memoryReport = None
+
+    def run(self):
+        return self.load()
+
+    @profiled(name="MultiCsvLoader.load")
+    def load(self):
+        startTime = time.perf_counter()
+        cacheDir = self.cache.cacheDir if self.cache is not None else None
+        results = [None] * len(self.filePaths)
+        reports = [None] * len(self.filePaths)
+        rows = 0
+        bytesDone = 0
+        # spawn: the caller may be a threaded Tk process, which fork would copy.
+        # A multiprocessing pool rather than concurrent.futures: cancelling
+        # terminates the workers instead of waiting for the files they parse.
+        context = multiprocessing.get_context("spawn")
+        pool = context.Pool(self.workers)
+        try:
+            pending = {i: pool.apply_async(loadCsvFile, (path, cacheDir, self.streaming)) for i, path in enumerate(self.filePaths)}
+            while pending:
+                if self.cancelEvent.wait(0.2):
+                    return None
+                for i in [i for i, result in pending.items() if result.ready()]:
+                    results[i], reports[i] = pending.pop(i).get()
+                    rows += len(results[i])
+                    bytesDone += self.sizes[i]
+                    self.messages.put(("progress", rows, bytesDone, self.totalBytes, time.perf_counter() - startTime))
+        finally:
+            pool.terminate()
+        if self.streaming:
+            aggregates = results[0]
+            for other in results[1:]:
+                aggregates.merge(other)
+            return aggregates
+        with phase("MultiCsvLoader.concat"):
+            df = concatFiles(results, self.filePaths)
+        self.memoryReport = mergeReports(reports, df)
+        return df
@@ -0,0 +1,93 @@
+import io
+import os
+import time
+import pandas as pd
+from aggregates import SessionAggregates
+from backgroundJob import BackgroundJob
+from csvLoader import buildSchema
+
+
+class CsvTail(BackgroundJob):
+    # Follows a CSV that is being appended to. A worker thread remembers the
+    # byte offset it has parsed up to and only reads complete lines past it;
+    # each batch of new rows is folded into a fresh SessionAggregates delta
+    # that the Tk side merges into its running aggregates. A file that
+    # shrinks (truncated or rotated) is read again from the start, after a
+    # ("reset", columns) message with its header.
+    def __init__(self, filePath, pollInterval=1.0, blockBytes=64 * 1024 ** 2):
+        super().__init__()
+        self.filePath = filePath
+        self.pollInterval = pollInterval
+        self.blockBytes = blockBytes
+        self.totalBytes = os.path.getsize(filePath)
+        self.columns = None
+        self.offset = 0
+        self.rows = 0
+
+    def run(self):
+        # Polls until cancelled
+        startTime = time.perf_counter()
+        caughtUp = False
+        resetting = False
+        while not self.cancelEvent.is_set():
+            size = os.path.getsize(self.filePath)
+            if size < self.offset:
+                self.columns = None
+                self.offset = 0
+                self.rows = 0
+                resetting = True
+            if self.columns is None:
+                if not self._readHeader():
+                    self.cancelEvent.wait(self.pollInterval)
+                    continue
+                # The new file's header may differ from the old one's
+                if resetting:
+                    resetting = False
+                    self.messages.put(("reset", self.columns))
+            delta = self._readBlock(size)
+            if delta is not None:
+                self.messages.put(("delta", delta))
+                self.messages.put(("progress", self.rows, self.offset, size, time.perf_counter() - startTime))
+                continue
+            # Nothing complete past the offset: everything has been read
+            if not caughtUp:
+                caughtUp = True
+                self.messages.put(("caughtUp",))
+            self.cancelEvent.wait(self.pollInterval)
+        return None
+
+    def _readHeader(self):
+        with open(self.filePath, "rb") as fh:
+            line = fh.readline()
+        if not line.endswith(b"\n"):
+            return False
+        self.columns = list(pd.read_csv(io.BytesIO(line), nrows=0).columns)
+        self.schema = buildSchema(self.columns)
+        self.offset = len(line)
+        return True
+
+    def _readBlock(self, size):
+        # Parses the complete lines in the next block, or returns None
+        if size <= self.offset:
+            return None
+        with open(self.filePath, "rb") as fh:
+            fh.seek(self.offset)
+            data = fh.read(min(size - self.offset, self.blockBytes))
+        end = data.rfind(b"\n") + 1
+        if end == 0:
+            # A line longer than the block, or an incomplete last line
+            if len(data) < self.blockBytes:
+                return None
+            self.blockBytes *= 2
+            return self._readBlock(size)
+        data = data[:end]
+        try:
+            chunk = pd.read_csv(io.BytesIO(data), header=None, names=self.columns, **self.schema)
+        except (ValueError, TypeError):
+            # The rows do not match the known schema: let pandas infer
+            chunk = pd.read_csv(io.BytesIO(data), header=None, names=self.columns, parse_dates=self.schema["parse_dates"])
+        delta = SessionAggregates(self.columns)
+        delta.update(chunk)
+        self.offset += end
+        self.rows += len(chunk)
+        return delta
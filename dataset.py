@@ -0,0 +1,223 @@
+import itertools
+import unicodedata
+import numpy as np
+import pandas as pd
+from profiler import phase, profiled
+from heavyHitters import sketchTopValues
+
+
+# Serial numbers telling loaded datasets apart in view cache keys
+datasetSerials = itertools.count(1)
+
+
+def normalizeColumnName(s) -> str:
+    if not isinstance(s, str):
+        s = str(s)
+    s = s.strip()
+    # Remove accents
+    s = ''.join(
+        c for c in unicodedata.normalize('NFKD', s)
+        if not unicodedata.combining(c)
+    )
+    s = s.lower()
+    # Collapse separators
+    for ch in [" ", "-", ":", ";", ",", "."]:
+        s = s.replace(ch, "_")
+    while "__" in s:
+        s = s.replace("__", "_")
+    s = s.strip("_")
+    return s
+
+
+def resolveColumnName(target, normalizedColumns):
+    # normalizedColumns: {column: normalizeColumnName(column)}
+    targetNorm = normalizeColumnName(target)
+    # Exact normalized match
+    for col, norm in normalizedColumns.items():
+        if norm == targetNorm:
+            return col
+    # Fuzzy contains heuristics for common variants
+    for col, norm in normalizedColumns.items():
+        if all(h in norm for h in ["note", "praticien"]):
+            return col
+    # Case-insensitive startswith/contains
+    for col, norm in normalizedColumns.items():
+        if targetNorm in norm:
+            return col
+    return None
+
+
+def dailyTotals(days, durations):
+    # Per-day entries and duration sum/count of one row pass. days: int64 day
+    # numbers, NaT already removed; durations: float with NaN for missing.
+    durations = np.asarray(durations, dtype=float)
+    hasDuration = ~np.isnan(durations)
+    keys, inverse = np.unique(days, return_inverse=True)
+    inverse = inverse.ravel()
+    counts = np.bincount(inverse, minlength=len(keys))
+    sums = np.bincount(inverse, weights=np.where(hasDuration, durations, 0.0), minlength=len(keys))
+    durationCounts = np.bincount(inverse, weights=hasDuration, minlength=len(keys))
+    return keys, counts, sums, durationCounts.astype(np.int64)
+
+
+def boxStats(values, whis=1.5):
+    # Same statistics as matplotlib.cbook.boxplot_stats, for Axes.bxp
+    values = np.asarray(values, dtype=float)
+    if len(values) == 0:
+        return {"med": np.nan, "q1": np.nan, "q3": np.nan, "whislo": np.nan, "whishi": np.nan, "mean": np.nan, "fliers": []}
+    q1, med, q3 = np.percentile(values, [25, 50, 75])
+    iqr = q3 - q1
+    inside = values[(values >= q1 - whis * iqr) & (values <= q3 + whis * iqr)]
+    whislo = inside.min() if len(inside) else q1
+    whishi = inside.max() if len(inside) else q3
+    return {
+        "med": med, "q1": q1, "q3": q3, "whislo": whislo, "whishi": whishi,
+        "mean": values.mean(), "fliers": values[(values < whislo) | (values > whishi)],
+    }
+
+
+class Dataset:
+    # Typed view of the loaded frame shared by every analyzer. Each column is
+    # coerced/parsed/encoded at most once and the result is kept, so tabs do
+    # not repeat full-column passes or copy the frame.
+    hasRows = True
+    # Sampled stand-ins (progressive.SampledDataset) return estimates
+    isEstimate = False
+    # Boolean row filter over df, set by filtered views (filterCube.CubeView)
+    rowMask = None
+
+    def __init__(self, df):
+        self.df = df
+        # Identifies the rows this view answers for (viewCache keys); None
+        # for views whose results must not be reused
+        self.viewKey = ("rows", next(datasetSerials))
+        self.columns = list(df.columns)
+        self.normalizedColumns = {col: normalizeColumnName(col) for col in self.columns}
+        self.resolvedColumns = {}
+        self.numericColumns = {}
+        self.dateColumns = {}
+        self.codeColumns = {}
+
+    def __len__(self):
+        return len(self.df)
+
+    def resolveColumn(self, target):
+        # Robust lookup (trim/case/accent-insensitive)
+        if target not in self.resolvedColumns:
+            self.resolvedColumns[target] = resolveColumnName(target, self.normalizedColumns)
+        return self.resolvedColumns[target]
+
+    def numeric(self, column):
+        # float64 Series aligned with df, invalid values coerced to NaN
+        if column not in self.numericColumns:
+            with phase("Dataset.numeric"):
+                values = pd.to_numeric(self.df[column], errors="coerce")
+                values = values.to_numpy(dtype="float64", na_value=np.nan)
+                self.numericColumns[column] = pd.Series(values, index=self.df.index, name=column)
+        return self.numericColumns[column]
+
+    def dates(self, column):
+        if column not in self.dateColumns:
+            values = self.df[column]
+            if not pd.api.types.is_datetime64_any_dtype(values):
+                with phase("Dataset.dates"):
+                    values = pd.to_datetime(values, errors="coerce")
+            self.dateColumns[column] = values
+        return self.dateColumns[column]
+
+    def codes(self, column):
+        # (int codes aligned with df, sorted categories); missing values are -1
+        if column not in self.codeColumns:
+            values = self.df[column]
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                categories = values.cat.categories
+                codes = values.cat.codes.to_numpy()
+                if not categories.is_monotonic_increasing:
+                    order = categories.argsort()
+                    remap = np.empty(len(order), dtype=codes.dtype)
+                    remap[order] = np.arange(len(order), dtype=codes.dtype)
+                    codes = np.where(codes >= 0, remap[codes], -1)
+                    categories = categories[order]
+            else:
+                codes, categories = pd.factorize(values, sort=True)
+            self.codeColumns[column] = (codes, pd.Index(categories))
+        return self.codeColumns[column]
+
+    def valueCounts(self, column):
+        # Same result as df[column].value_counts(), computed from the codes
+        codes, categories = self.codes(column)
+        counts = np.bincount(codes[codes >= 0], minlength=len(categories))
+        result = pd.Series(counts, index=categories, name="count")
+        result = result[result > 0]
+        return result.sort_values(ascending=False, kind="stable")
+
+    def hasCodes(self, column):
+        # True when valueCounts is cheap: categorical or already encoded
+        return column in self.codeColumns or isinstance(self.df[column].dtype, pd.CategoricalDtype)
+
+    @profiled
+    def topValues(self, column, k):
+        # (k most frequent values with their counts, non-missing values,
+        # largest overcount). Columns without codes go through a Space-Saving
+        # sketch, so high-cardinality columns cost a bounded summary instead
+        # of one counter per distinct value.
+        if self.hasCodes(column):
+            counts = self.valueCounts(column)
+            return counts.head(k), int(counts.sum()), 0
+        values = self.df[column]
+        if self.rowMask is not None:
+            values = values[self.rowMask]
+        return sketchTopValues(values, k)
+
+    # Summary queries shared with SessionAggregates, so tabs can render from
+    # either the loaded rows or streamed aggregates
+
+    def values(self, column, fillValue=None, valueRange=None):
+        data = self.numeric(column)
+        data = data.dropna() if fillValue is None else data.fillna(fillValue)
+        if valueRange is not None:
+            data = data[(data >= valueRange[0]) & (data <= valueRange[1])]
+        return data
+
+    def count(self, column):
+        # Number of valid (non-missing, numeric) values
+        return int(self.numeric(column).notna().sum())
+
+    def describe(self, column, fillValue=None, valueRange=None):
+        data = self.values(column, fillValue, valueRange)
+        if data.empty:
+            return {"count": 0}
+        return {
+            "count": len(data),
+            "sum": data.sum(),
+            "mean": data.mean(),
+            "median": data.median(),
+            "std": data.std(),
+            "min": data.min(),
+            "max": data.max(),
+        }
+
+    def histogram(self, column, bins, valueRange=None, fillValue=None):
+        # Bins span valueRange, or the data's own min/max when it is None
+        data = self.values(column, fillValue, valueRange)
+        if valueRange is None and not data.empty:
+            valueRange = (data.min(), data.max())
+        return np.histogram(data, bins=bins, range=valueRange)
+
+    def corr(self, columnX, columnY, fillValue=None):
+        x = self.numeric(columnX)
+        y = self.numeric(columnY)
+        if fillValue is not None:
+            x, y = x.fillna(fillValue), y.fillna(fillValue)
+        return x.corr(y)
+
+    def boxStats(self, column, fillValue=None):
+        return boxStats(self.values(column, fillValue).to_numpy())
+
+    @profiled
+    def dailyTotals(self, dateColumn, durationColumn):
+        # (day numbers, entries, duration sum, duration count) of each day with
+        # entries; timePyramid.TimePyramid builds the coarser levels from them
+        days = self.dates(dateColumn).to_numpy().astype("datetime64[D]").astype(np.int64)
+        valid = days != np.iinfo(np.int64).min
+        return dailyTotals(days[valid], self.numeric(durationColumn).to_numpy()[valid])
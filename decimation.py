@@ -0,0 +1,57 @@
+import numpy as np
+
+
+def minMaxDecimate(x, y, xmin, xmax, buckets):
+    # Per-bucket min/max envelope of the points whose x lies in [xmin, xmax].
+    # x must be sorted. Returns the exact points when there are no more than
+    # two per bucket, so deep zoom shows the real data.
+    start = max(int(np.searchsorted(x, xmin, side="left")) - 1, 0)
+    end = min(int(np.searchsorted(x, xmax, side="right")) + 1, len(x))
+    count = end - start
+    buckets = max(int(buckets), 1)
+    if count <= 2 * buckets:
+        return x[start:end], y[start:end]
+
+    size = -(-count // buckets)
+    window = y[start:end]
+    padded = np.pad(window, (0, size * buckets - count), mode="edge").reshape(buckets, size)
+    lowIdx = padded.argmin(axis=1)
+    highIdx = padded.argmax(axis=1)
+    # Keep each bucket's min and max in their original order
+    first = np.minimum(lowIdx, highIdx)
+    second = np.maximum(lowIdx, highIdx)
+    offsets = np.arange(buckets) * size
+    idx = np.stack([offsets + first, offsets + second], axis=1).ravel()
+    idx = np.minimum(idx, count - 1) + start
+    return x[idx], y[idx]
+
+
+class DecimatedLine:
+    # Line2D that only holds about two points per horizontal pixel of the
+    # visible x range, recomputed on zoom/pan (xlim_changed) and resize.
+    def __init__(self, ax, **lineKwargs):
+        self.ax = ax
+        self.x = np.empty(0)
+        self.y = np.empty(0)
+        self.line, = ax.plot([], [], **lineKwargs)
+        ax.callbacks.connect("xlim_changed", lambda axes: self.refresh())
+        ax.figure.canvas.mpl_connect("resize_event", lambda event: self.refresh())
+
+    def setData(self, x, y):
+        self.x = np.asarray(x, dtype=float)
+        self.y = np.asarray(y, dtype=float)
+        self.refresh()
+
+    def refresh(self):
+        if len(self.x) == 0:
+            self.line.set_data([], [])
+            return
+        xmin, xmax = self.ax.get_xlim()
+        pixels = self.ax.get_window_extent().width
+        self.line.set_data(*minMaxDecimate(self.x, self.y, xmin, xmax, pixels))
+
+    def dataLimits(self):
+        # Limits of the full (undecimated) data, for autoscaling
+        if len(self.x) == 0:
+            return None
+        return self.x[0], self.x[-1], np.nanmin(self.y), np.nanmax(self.y)
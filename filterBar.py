@@ -0,0 +1,77 @@
+import tkinter as tk
+from tkinter import ttk
+import pandas as pd
+
+class FilterBar:
+    # Global filters shown above the tabs: one dropdown per dimension and a
+    # start/end date. onChange(codes, dateRange) receives the category code of
+    # each dimension (None = All) and (start, end) dates (None = open).
+    def __init__(self, parent, categories, onChange):
+        self.onChange = onChange
+        self.frame = tk.Frame(parent)
+        self.frame.pack(fill="x", padx=10, pady=5)
+
+        self.dropdowns = {}
+        for dim, values in categories.items():
+            tk.Label(self.frame, text=f"{dim.replace('_', ' ').capitalize()}:").pack(side="left")
+            dropdown = ttk.Combobox(self.frame, values=["All"] + [str(v) for v in values], state="readonly", width=14)
+            dropdown.current(0)
+            dropdown.pack(side="left", padx=(2, 10))
+            dropdown.bind("<<ComboboxSelected>>", self.apply)
+            self.dropdowns[dim] = dropdown
+
+        tk.Label(self.frame, text="From:").pack(side="left")
+        self.startVar = tk.StringVar()
+        self.startEntry = tk.Entry(self.frame, textvariable=self.startVar, width=11)
+        self.startEntry.pack(side="left", padx=(2, 5))
+        tk.Label(self.frame, text="To:").pack(side="left")
+        self.endVar = tk.StringVar()
+        self.endEntry = tk.Entry(self.frame, textvariable=self.endVar, width=11)
+        self.endEntry.pack(side="left", padx=(2, 10))
+        for entry in (self.startEntry, self.endEntry):
+            entry.bind("<Return>", self.apply)
+            entry.bind("<FocusOut>", self.apply)
+
+        self.resetButton = tk.Button(self.frame, text="Reset", command=self.reset)
+        self.resetButton.pack(side="left")
+        self.statusLabel = tk.Label(self.frame, text="", font=("Arial", 10))
+        self.statusLabel.pack(side="right")
+        self.lastFilters = None
+
+    def parseDate(self, var):
+        text = var.get().strip()
+        if not text:
+            return None
+        date = pd.to_datetime(text, errors="coerce")
+        if pd.isna(date):
+            raise ValueError(f"Invalid date: {text}")
+        return date.date()
+
+    def apply(self, event=None):
+        try:
+            dateRange = (self.parseDate(self.startVar), self.parseDate(self.endVar))
+        except ValueError as e:
+            self.setStatus(str(e))
+            return
+        # Dropdown entry i (after "All") is category code i - 1
+        codes = {dim: (d.current() - 1 if d.current() > 0 else None) for dim, d in self.dropdowns.items()}
+        filters = (codes, dateRange)
+        if filters != self.lastFilters:
+            self.lastFilters = filters
+            self.onChange(codes, dateRange)
+
+    def reset(self):
+        for dropdown in self.dropdowns.values():
+            dropdown.current(0)
+        self.startVar.set("")
+        self.endVar.set("")
+        self.apply()
+
+    def setEnabled(self, enabled):
+        for dropdown in self.dropdowns.values():
+            dropdown.config(state="readonly" if enabled else "disabled")
+        for widget in (self.startEntry, self.endEntry, self.resetButton):
+            widget.config(state="normal" if enabled else "disabled")
+
+    def setStatus(self, text):
+        self.statusLabel.config(text=text)
@@ -0,0 +1,300 @@
+import numpy as np
+import pandas as pd
+from aggregates import DEFAULT_SPEC, weightedQuantile, weightedBoxStats
+from dataset import Dataset
+
+# source_file only exists in multi-file loads (csvLoader.MultiCsvLoader)
+DIMENSIONS = ["service", "langue", "device", "source_file"]
+NAT_DAY = np.iinfo(np.int64).min
+
+
+def cellMeans(rowCells, values, cells):
+    # Mean of each cell's values (0 for empty cells); groupby's compensated
+    # sums stay exact where bincount's running sums drift
+    means = np.zeros(cells)
+    grouped = pd.Series(values).groupby(rowCells).mean()
+    means[grouped.index] = grouped.to_numpy()
+    return means
+
+
+def combinedM2(n, means, m2, mean):
+    # Sum of squared deviations from mean over groups of n values with the
+    # given means and m2s (Chan et al., all groups at once)
+    deviations = means - mean
+    return m2.sum() + (n * deviations * deviations).sum()
+
+
+class CubeMeasure:
+    # Per-cell sums for one numeric column, plus a sparse per-cell histogram
+    # (cell, bin, count). Bins are the exact distinct values when there are
+    # few of them, otherwise fine equal-width bins over the column's range.
+    def __init__(self, rowCells, cells, raw, fillValue=None, valueRange=None, maxExactValues=4096, fineBins=1000):
+        self.fillValue = fillValue
+        self.valueRange = valueRange
+        self.valid = np.bincount(rowCells[~np.isnan(raw)], minlength=cells)
+
+        values = raw if fillValue is None else np.where(np.isnan(raw), fillValue, raw)
+        use = ~np.isnan(values)
+        if valueRange is not None:
+            use &= (values >= valueRange[0]) & (values <= valueRange[1])
+        values, valueCells = values[use], rowCells[use]
+
+        self.n = np.bincount(valueCells, minlength=cells)
+        self.sum = np.bincount(valueCells, weights=values, minlength=cells)
+        # Per-cell mean and sum of squared deviations, combined across the
+        # selected cells like Moments.merge (no sum-of-squares cancellation)
+        self.mean = cellMeans(valueCells, values, cells)
+        self.m2 = np.bincount(valueCells, weights=(values - self.mean[valueCells]) ** 2, minlength=cells)
+        grouped = pd.Series(values).groupby(valueCells)
+        lows, highs = grouped.min(), grouped.max()
+        self.min = np.full(cells, np.inf)
+        self.max = np.full(cells, -np.inf)
+        self.min[lows.index] = lows.to_numpy()
+        self.max[highs.index] = highs.to_numpy()
+
+        distinct = np.unique(values)
+        self.exact = len(distinct) <= maxExactValues
+        if self.exact:
+            self.binValues = distinct
+            bins = np.searchsorted(distinct, values)
+        else:
+            lo, hi = distinct[0], distinct[-1]
+            edges = np.linspace(lo, hi, fineBins + 1)
+            self.binValues = (edges[:-1] + edges[1:]) / 2
+            bins = np.clip(((values - lo) / (hi - lo) * fineBins).astype(np.int64), 0, fineBins - 1)
+        binCount = max(len(self.binValues), 1)
+        keys, counts = np.unique(valueCells.astype(np.int64) * binCount + bins, return_counts=True)
+        self.entryCells = keys // binCount
+        self.entryBins = keys % binCount
+        self.entryCounts = counts
+
+    def histogramFor(self, cellMask):
+        # (bin values, counts) summed over the selected cells
+        selected = cellMask[self.entryCells]
+        counts = np.bincount(self.entryBins[selected], weights=self.entryCounts[selected], minlength=len(self.binValues))
+        return self.binValues, counts.astype(np.int64)
+
+
+class FilterCube:
+    # Pre-aggregated cube over service/langue/device/day built once from the
+    # loaded dataset. select() returns a view answering the tabs' summary
+    # queries by summing cube cells instead of rescanning rows.
+    def __init__(self, dataset, dimensions=DIMENSIONS, dateColumn="date", spec=None):
+        spec = spec or DEFAULT_SPEC
+        self.dataset = dataset
+        self.dimensions = [d for d in dimensions if d in dataset.columns]
+        self.dateColumn = dateColumn if dateColumn in dataset.columns else None
+
+        # Combine the dimension codes (and day) into one key per row
+        keys = np.zeros(len(dataset), dtype=np.int64)
+        self.categories = {}
+        for dim in self.dimensions:
+            codes, categories = dataset.codes(dim)
+            self.categories[dim] = categories
+            keys = keys * (len(categories) + 1) + (codes.astype(np.int64) + 1)
+        days = None
+        if self.dateColumn is not None:
+            days = dataset.dates(self.dateColumn).to_numpy().astype("datetime64[D]").astype(np.int64)
+            validDays = days != NAT_DAY
+            firstDay = days[validDays].min() if validDays.any() else 0
+            dayIndex = np.where(validDays, days - firstDay + 1, 0)
+            keys = keys * (int(dayIndex.max()) + 1 if len(dayIndex) else 1) + dayIndex
+        cellKeys, self.rowCells = np.unique(keys, return_inverse=True)
+        self.rowCells = self.rowCells.ravel()
+        cells = len(cellKeys)
+
+        # Dimension values of each cell, taken from any row in the cell
+        sample = np.zeros(cells, dtype=np.int64)
+        sample[self.rowCells] = np.arange(len(self.rowCells))
+        self.cellCodes = {dim: dataset.codes(dim)[0][sample] for dim in self.dimensions}
+        self.cellDays = days[sample] if days is not None else np.full(cells, NAT_DAY)
+        self.counts = np.bincount(self.rowCells, minlength=cells)
+
+        validDays = self.cellDays != NAT_DAY
+        self.dayKeys, dayIndex = np.unique(self.cellDays[validDays], return_inverse=True)
+        self.cellDayIndex = np.full(cells, -1)
+        self.cellDayIndex[validDays] = dayIndex.ravel()
+
+        self.measures = {}
+        for target, options in spec["numeric"].items():
+            column = dataset.resolveColumn(target)
+            if column is None:
+                continue
+            key = (column, options.get("fillValue"), options.get("valueRange"))
+            self.measures[key] = CubeMeasure(self.rowCells, cells, dataset.numeric(column).to_numpy(), **options)
+
+        self.pairs = {}
+        for x, y, fill in spec["pairs"]:
+            if x not in dataset.columns or y not in dataset.columns:
+                continue
+            xs, ys = dataset.numeric(x).to_numpy(), dataset.numeric(y).to_numpy()
+            if fill is not None:
+                xs, ys = np.nan_to_num(xs, nan=fill), np.nan_to_num(ys, nan=fill)
+            use = ~(np.isnan(xs) | np.isnan(ys))
+            c, xs, ys = self.rowCells[use], xs[use], ys[use]
+            # Per-cell means and (co-)deviations, as CoMoments keeps them
+            n = np.bincount(c, minlength=cells)
+            meanX, meanY = cellMeans(c, xs, cells), cellMeans(c, ys, cells)
+            dx, dy = xs - meanX[c], ys - meanY[c]
+            self.pairs[(x, y, fill)] = {
+                "n": n,
+                "meanX": meanX,
+                "meanY": meanY,
+                "m2X": np.bincount(c, weights=dx * dx, minlength=cells),
+                "m2Y": np.bincount(c, weights=dy * dy, minlength=cells),
+                "cXY": np.bincount(c, weights=dx * dy, minlength=cells),
+            }
+
+    def select(self, codes=None, dateRange=None):
+        # codes: {dimension: category code}; dateRange: (start, end) dates,
+        # either end may be None. Returns the base dataset when unfiltered.
+        codes = {d: c for d, c in (codes or {}).items() if c is not None and d in self.cellCodes}
+        if not codes and (dateRange is None or dateRange == (None, None)):
+            return self.dataset
+        cellMask = np.ones(len(self.counts), dtype=bool)
+        for dim, code in codes.items():
+            cellMask &= self.cellCodes[dim] == code
+        if dateRange is not None:
+            start, end = dateRange
+            cellMask &= self.cellDays != NAT_DAY
+            if start is not None:
+                cellMask &= self.cellDays >= np.datetime64(start, "D").astype(np.int64)
+            if end is not None:
+                cellMask &= self.cellDays <= np.datetime64(end, "D").astype(np.int64)
+        dates = tuple(None if d is None else str(np.datetime64(d, "D")) for d in dateRange or (None, None))
+        return CubeView(self, cellMask, (tuple(sorted(codes.items())), dates))
+
+
+class CubeView(Dataset):
+    # Filtered dataset. Summary queries covered by the cube are answered
+    # from cell sums; anything else falls back to Dataset's row computations
+    # on the masked columns (the row mask is only built when needed).
+    def __init__(self, cube, cellMask, selection=None):
+        super().__init__(cube.dataset.df)
+        self.cube = cube
+        self.base = cube.dataset
+        # Same filters on the same rows -> same view, whichever CubeView
+        self.viewKey = (self.base.viewKey, selection) if selection is not None else None
+        self.cellMask = cellMask
+        self._rowMask = None
+
+    @property
+    def rowMask(self):
+        if self._rowMask is None:
+            self._rowMask = self.cellMask[self.cube.rowCells]
+        return self._rowMask
+
+    def __len__(self):
+        return int(self.cube.counts[self.cellMask].sum())
+
+    def resolveColumn(self, target):
+        return self.base.resolveColumn(target)
+
+    def numeric(self, column):
+        if column not in self.numericColumns:
+            self.numericColumns[column] = self.base.numeric(column)[self.rowMask]
+        return self.numericColumns[column]
+
+    def dates(self, column):
+        if column not in self.dateColumns:
+            self.dateColumns[column] = self.base.dates(column)[self.rowMask]
+        return self.dateColumns[column]
+
+    def codes(self, column):
+        if column not in self.codeColumns:
+            codes, categories = self.base.codes(column)
+            self.codeColumns[column] = (codes[self.rowMask], categories)
+        return self.codeColumns[column]
+
+    def _measure(self, column, fillValue=None, valueRange=None):
+        return self.cube.measures.get((column, fillValue, tuple(valueRange) if valueRange else None))
+
+    def hasCodes(self, column):
+        return column in self.cube.cellCodes or self.base.hasCodes(column)
+
+    def valueCounts(self, column):
+        if column not in self.cube.cellCodes:
+            return super().valueCounts(column)
+        categories = self.cube.categories[column]
+        codes = self.cube.cellCodes[column][self.cellMask]
+        weights = self.cube.counts[self.cellMask]
+        present = codes >= 0
+        counts = np.bincount(codes[present], weights=weights[present], minlength=len(categories))
+        result = pd.Series(counts.astype(np.int64), index=categories, name="count")
+        return result[result > 0].sort_values(ascending=False, kind="stable")
+
+    def count(self, column):
+        for (measureColumn, _, _), measure in self.cube.measures.items():
+            if measureColumn == column:
+                return int(measure.valid[self.cellMask].sum())
+        return super().count(column)
+
+    def describe(self, column, fillValue=None, valueRange=None):
+        measure = self._measure(column, fillValue, valueRange)
+        if measure is None:
+            return super().describe(column, fillValue, valueRange)
+        mask = self.cellMask
+        n = int(measure.n[mask].sum())
+        if n == 0:
+            return {"count": 0}
+        total = measure.sum[mask].sum()
+        mean = (measure.n[mask] * measure.mean[mask]).sum() / n
+        m2 = combinedM2(measure.n[mask], measure.mean[mask], measure.m2[mask], mean)
+        variance = m2 / (n - 1) if n > 1 else np.nan
+        return {
+            "count": n,
+            "sum": total,
+            "mean": mean,
+            "median": weightedQuantile(*measure.histogramFor(mask), 0.5),
+            "std": np.sqrt(max(variance, 0.0)) if n > 1 else np.nan,
+            "min": measure.min[mask].min(),
+            "max": measure.max[mask].max(),
+        }
+
+    def histogram(self, column, bins, valueRange=None, fillValue=None):
+        measure = self._measure(column, fillValue, valueRange)
+        if measure is None:
+            return super().histogram(column, bins, valueRange, fillValue)
+        values, counts = measure.histogramFor(self.cellMask)
+        present = counts > 0
+        if valueRange is None:
+            # np.histogram's own default for empty data is (0, 1)
+            valueRange = (values[present].min(), values[present].max()) if present.any() else (0, 1)
+        counts, edges = np.histogram(values, bins=bins, range=valueRange, weights=counts)
+        return counts.astype(np.int64), edges
+
+    def corr(self, columnX, columnY, fillValue=None):
+        sums = self.cube.pairs.get((columnX, columnY, fillValue))
+        if sums is None:
+            return super().corr(columnX, columnY, fillValue)
+        n, meanX, meanY, m2X, m2Y, cXY = (sums[k][self.cellMask] for k in ("n", "meanX", "meanY", "m2X", "m2Y", "cXY"))
+        total = n.sum()
+        if total < 2:
+            return np.nan
+        grandX, grandY = (n * meanX).sum() / total, (n * meanY).sum() / total
+        sxx = combinedM2(n, meanX, m2X, grandX)
+        syy = combinedM2(n, meanY, m2Y, grandY)
+        sxy = cXY.sum() + (n * (meanX - grandX) * (meanY - grandY)).sum()
+        denom = np.sqrt(sxx * syy)
+        return sxy / denom if denom > 0 else np.nan
+
+    def boxStats(self, column, fillValue=None):
+        measure = self._measure(column, fillValue)
+        if measure is None or not measure.exact:
+            return super().boxStats(column, fillValue)
+        n = measure.n[self.cellMask].sum()
+        mean = measure.sum[self.cellMask].sum() / n if n else np.nan
+        return weightedBoxStats(*measure.histogramFor(self.cellMask), mean)
+
+    def dailyTotals(self, dateColumn, durationColumn):
+        measure = self._measure(durationColumn)
+        if dateColumn != self.cube.dateColumn or measure is None:
+            return super().dailyTotals(dateColumn, durationColumn)
+        cells = self.cellMask & (self.cube.cellDayIndex >= 0)
+        days = self.cube.cellDayIndex[cells]
+        size = len(self.cube.dayKeys)
+        counts = np.bincount(days, weights=self.cube.counts[cells], minlength=size)
+        sums = np.bincount(days, weights=measure.sum[cells], minlength=size)
+        n = np.bincount(days, weights=measure.n[cells], minlength=size)
+        present = counts > 0
+        return self.cube.dayKeys[present], counts[present].astype(np.int64), sums[present], n[present].astype(np.int64)
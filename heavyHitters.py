@@ -0,0 +1,78 @@
+import pandas as pd
+from compaction import PatternedIdArray
+
+# Most frequent values of a column whose distinct values may not fit the
+# tabs: session ids, free text. A Space-Saving summary keeps `capacity`
+# counters; chunks are counted exactly, cut to their top values and merged in
+# (the mergeable form of Space-Saving), so memory is bounded by the chunk and
+# the summary, not by the column's cardinality.
+
+# Values listed by the top values tab unless another count is chosen
+TOP_K = 10
+# Counters kept per requested top value: a larger summary keeps the reported
+# values' counts tighter
+CAPACITY_PER_VALUE = 20
+MIN_CAPACITY = 200
+CHUNK_ROWS = 500_000
+
+
+class SpaceSaving:
+    # counts[value] overestimates the value's true count by at most
+    # errors[value] (<= total / capacity); every value occurring more than
+    # total / capacity times is kept
+    def __init__(self, capacity=MIN_CAPACITY):
+        self.capacity = capacity
+        self.counts = pd.Series(dtype="int64")
+        self.errors = pd.Series(dtype="int64")
+        self.total = 0
+
+    def floor(self):
+        # Most a value missing from the summary can have occurred
+        return int(self.counts.iloc[-1]) if len(self.counts) >= self.capacity else 0
+
+    def update(self, values):
+        chunk = SpaceSaving(self.capacity)
+        counts = pd.Series(values).value_counts()
+        counts = counts[counts > 0]
+        chunk.total = int(counts.sum())
+        chunk.counts = counts.iloc[:self.capacity].astype("int64")
+        chunk.errors = pd.Series(0, index=chunk.counts.index, dtype="int64")
+        self.merge(chunk)
+
+    def merge(self, other):
+        # A value missing from one side may have up to that side's floor
+        floor, otherFloor = self.floor(), other.floor()
+        index = self.counts.index.union(other.counts.index, sort=False)
+        counts = self.counts.reindex(index, fill_value=floor) + other.counts.reindex(index, fill_value=otherFloor)
+        errors = self.errors.reindex(index, fill_value=floor) + other.errors.reindex(index, fill_value=otherFloor)
+        counts = counts.sort_values(ascending=False, kind="stable").iloc[:self.capacity]
+        self.counts = counts.rename("count")
+        self.errors = errors[counts.index]
+        self.total += other.total
+
+    def top(self, k):
+        # (k largest counts, the largest overestimate among them). Only
+        # values whose guaranteed count (count - error) beats anything missing
+        # from the summary are reported; the others (count 8, error 7) may
+        # not be frequent at all.
+        reliable = self.counts[self.counts - self.errors[self.counts.index] > self.floor()]
+        top = reliable.iloc[:k]
+        return top, int(self.errors[top.index].max()) if len(top) else 0
+
+
+def capacityFor(k):
+    return max(k * CAPACITY_PER_VALUE, MIN_CAPACITY)
+
+
+def sketchTopValues(values, k):
+    # Dataset.topValues over a Series of raw values, one chunk at a time
+    sketch = SpaceSaving(capacityFor(k))
+    # Patterned ids are counted by number and formatted at the end
+    ids = values.array if isinstance(values.array, PatternedIdArray) else None
+    raw = pd.Series(ids.numbers).where(ids.numbers >= 0) if ids is not None else values
+    for start in range(0, len(raw), CHUNK_ROWS):
+        sketch.update(raw.iloc[start:start + CHUNK_ROWS])
+    top, maxError = sketch.top(k)
+    if ids is not None:
+        top.index = [ids.format(int(number)) for number in top.index]
+    return top, sketch.total, maxError
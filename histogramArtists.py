@@ -0,0 +1,41 @@
+import matplotlib
+import numpy as np
+
+
+class HistogramBars:
+    # One bar container created up front with maxBins patches. Updates move
+    # and resize the existing patches (hiding the unused ones) instead of
+    # clearing the axes and calling ax.bar once per bin.
+    def __init__(self, ax, maxBins=50, cmap=None, color=None, alpha=1.0, edgecolor="black", label=None):
+        self.ax = ax
+        self.maxBins = maxBins
+        self.cmap = matplotlib.colormaps[cmap] if cmap else None
+        self.container = ax.bar(
+            np.zeros(maxBins), np.zeros(maxBins), width=0.0, align="edge",
+            color=color, alpha=alpha, edgecolor=edgecolor, label=label,
+        )
+        self.bins = 0
+
+    def update(self, counts, edges):
+        bins = len(counts)
+        if bins > self.maxBins:
+            raise ValueError(f"At most {self.maxBins} bins are supported, got {bins}")
+        recolor = self.cmap is not None and bins != self.bins
+        for i, patch in enumerate(self.container.patches):
+            if i < bins:
+                patch.set_x(edges[i])
+                patch.set_width(edges[i + 1] - edges[i])
+                patch.set_height(counts[i])
+                patch.set_visible(True)
+                if recolor:
+                    patch.set_facecolor(self.cmap(i / max(bins - 1, 1)))
+            else:
+                patch.set_visible(False)
+        self.bins = bins
+
+    def setVisible(self, visible):
+        for i, patch in enumerate(self.container.patches):
+            patch.set_visible(visible and i < self.bins)
+
+    def maxHeight(self):
+        return max((p.get_height() for p in self.container.patches[:self.bins]), default=0)
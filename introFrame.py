@@ -1,27 +1,153 @@
 import tkinter as tk
-from tkinter import filedialog, messagebox
-import pandas as pd
+from tkinter import ttk, filedialog, messagebox
+from csvLoader import CsvLoader, MultiCsvLoader, findCsvFiles
+from aggregates import SessionAggregates
+from csvCache import CsvCache
+from csvTail import CsvTail
 
 class IntroFrame:
-    def __init__(self, root, onCsvLoaded):
+    def __init__(self, root, onCsvLoaded, paths=None):
         self.root = root
         self.onCsvLoaded = onCsvLoaded
+        self.loader = None
+        self.liveAggregates = None
+        try:
+            self.cache = CsvCache()
+        except OSError:
+            self.cache = None
         self.frame = tk.Frame(root)
         self.frame.pack(expand=True, fill="both")
 
         tk.Label(self.frame, text="Welcome! Please select a CSV file to start.").pack(pady=20)
-        tk.Button(self.frame, text="Select CSV", command=self.loadCsv).pack(pady=10)
+        self.selectButton = tk.Button(self.frame, text="Select CSV", command=self.loadCsv)
+        self.selectButton.pack(pady=10)
+        # A directory of exports is parsed in parallel and loaded as one dataset
+        self.folderButton = tk.Button(self.frame, text="Select folder of CSVs", command=self.loadFolder)
+        self.folderButton.pack(pady=5)
+        # Larger-than-memory files: one streaming pass into aggregates, no rows kept
+        self.streamButton = tk.Button(self.frame, text="Summarize large CSV (streaming)", command=lambda: self.loadCsv(streaming=True))
+        self.streamButton.pack(pady=5)
+        # Appended-to files: aggregates kept up to date from the new lines only
+        self.watchButton = tk.Button(self.frame, text="Watch CSV (live tail)", command=lambda: self.loadCsv(watch=True))
+        self.watchButton.pack(pady=5)
+
+        self.progressFrame = tk.Frame(self.frame)
+        self.progressBar = ttk.Progressbar(self.progressFrame, length=400, mode="determinate", maximum=1.0)
+        self.progressBar.pack(pady=5)
+        self.progressLabel = tk.Label(self.progressFrame, text="", font=("Arial", 10))
+        self.progressLabel.pack()
+        self.cancelButton = tk.Button(self.progressFrame, text="Cancel", command=self.cancelLoad)
+        self.cancelButton.pack(pady=5)
+
+        # Files, directories or glob patterns given on the command line
+        if paths:
+            self.root.after(0, lambda: self.startLoad(findCsvFiles(paths)))
+
+    def loadCsv(self, streaming=False, watch=False):
+        if watch:
+            filePath = filedialog.askopenfilename(filetypes=[("CSV files", "*.csv")])
+            filePaths = [filePath] if filePath else []
+        else:
+            filePaths = list(filedialog.askopenfilenames(filetypes=[("CSV files", "*.csv")]))
+        if filePaths:
+            self.startLoad(filePaths, streaming, watch)
 
-    def loadCsv(self):
-        filePath = filedialog.askopenfilename(filetypes=[("CSV files", "*.csv")])
-        if not filePath:
+    def loadFolder(self):
+        directory = filedialog.askdirectory()
+        if not directory:
             return
+        filePaths = findCsvFiles([directory])
+        if not filePaths:
+            messagebox.showerror("Error", f"No CSV files in {directory}")
+            return
+        self.startLoad(filePaths)
 
+    def startLoad(self, filePaths, streaming=False, watch=False):
+        if not filePaths:
+            messagebox.showerror("Error", "No CSV files found")
+            return
         try:
-            df = pd.read_csv(filePath)
-        except Exception as e:
+            if watch:
+                self.loader = CsvTail(filePaths[0])
+            elif len(filePaths) > 1:
+                self.loader = MultiCsvLoader(filePaths, cache=self.cache, streaming=streaming)
+            else:
+                self.loader = CsvLoader(filePaths[0], cache=self.cache, streaming=streaming)
+        except OSError as e:
             messagebox.showerror("Error", f"Failed to load CSV:\n{e}")
             return
 
+        # Parsing runs on a worker thread; the UI only polls its progress
+        self.selectButton.config(state="disabled")
+        self.folderButton.config(state="disabled")
+        self.streamButton.config(state="disabled")
+        self.watchButton.config(state="disabled")
+        self.progressBar["value"] = 0
+        self.progressLabel.config(text="Starting...")
+        self.progressFrame.pack(pady=10)
+        self.loader.start()
+        self.root.after(100, self.pollLoader)
+
+    def cancelLoad(self):
+        if self.loader is not None:
+            self.loader.cancel()
+            self.progressLabel.config(text="Cancelling...")
+
+    def pollLoader(self):
+        loader = self.loader
+        if loader is None:
+            return
+        caughtUp = False
+        for message in loader.drain():
+            kind = message[0]
+            if kind == "progress":
+                _, rows, bytesRead, totalBytes, elapsed = message
+                self.showProgress(rows, bytesRead, totalBytes, elapsed)
+            elif kind == "done":
+                self.finishLoad(message[1])
+                return
+            elif kind == "delta":
+                if self.liveAggregates is None:
+                    self.liveAggregates = message[1]
+                else:
+                    self.liveAggregates.merge(message[1])
+            elif kind == "reset":
+                self.liveAggregates = None
+            elif kind == "caughtUp":
+                # The tail keeps running; the app takes over its messages
+                caughtUp = True
+            elif kind == "error":
+                self.resetLoad()
+                messagebox.showerror("Error", f"Failed to load CSV:\n{message[1]}")
+                return
+            elif kind == "cancelled":
+                self.resetLoad()
+                return
+        if caughtUp:
+            aggregates = self.liveAggregates if self.liveAggregates is not None else SessionAggregates(loader.columns)
+            self.finishLoad(aggregates, tail=loader)
+            return
+        self.root.after(100, self.pollLoader)
+
+    def showProgress(self, rows, bytesRead, totalBytes, elapsed):
+        mb = bytesRead / 1e6
+        rate = mb / elapsed if elapsed > 0 else 0
+        self.progressBar["value"] = bytesRead / totalBytes if totalBytes else 1.0
+        self.progressLabel.config(
+            text=f"{rows:,} rows   {mb:.1f} / {totalBytes / 1e6:.1f} MB   {rate:.1f} MB/s"
+        )
+
+    def resetLoad(self):
+        self.loader = None
+        self.liveAggregates = None
+        self.progressFrame.pack_forget()
+        self.selectButton.config(state="normal")
+        self.folderButton.config(state="normal")
+        self.streamButton.config(state="normal")
+        self.watchButton.config(state="normal")
+
+    def finishLoad(self, df, tail=None):
+        memoryReport = getattr(self.loader, "memoryReport", None)
+        self.loader = None
         self.frame.destroy()
-        self.onCsvLoaded(df)
+        self.root.after(0, lambda: self.onCsvLoaded(df, tail, memoryReport))
@@ -1,53 +1,191 @@
+import copy
+import importlib
+import sys
+import time
 import tkinter as tk
 from tkinter import ttk
 from introFrame import IntroFrame
-from csvAnalyzer import CSVAnalyzer, DateCurveAnalyzer
-from serviceTableAnalyzer import ServiceTableAnalyzer
-from qualiteScoreHistogram import QualiteScoreHistogram
-from interactionComparisonAnalyzer import InteractionComparisonAnalyzer
-from gradeAnalyzer import GradeAnalyzer
+from dataset import Dataset
+from aggregates import SessionAggregates
+from filterBar import FilterBar
+from filterCube import FilterCube, DIMENSIONS
+from profiler import phase, instrumentCanvases
+from scheduler import scheduler
+from viewCache import viewCache
+
+# (tab title, module, class, keyword arguments). Analyzer modules pull in
+# matplotlib/TkAgg, so they are only imported when their tab is first shown.
+TAB_SPECS = [
+    ("Top Values", "csvAnalyzer", "CSVAnalyzer", {"column": "langue"}),
+    ("Entries Over Time", "csvAnalyzer", "DateCurveAnalyzer", {"dateColumn": "date", "durationColumn": "duree_minutes"}),
+    ("Service Table", "serviceTableAnalyzer", "ServiceTableAnalyzer", {"filterColumn": "service"}),
+    ("Qualite Score Histogram", "qualiteScoreHistogram", "QualiteScoreHistogram", {"column": "qualite_score", "bins": 10}),
+    ("Interactions Compare", "interactionComparisonAnalyzer", "InteractionComparisonAnalyzer", {"patientColumn": "interactions_patient", "professionalColumn": "interactions_praticien"}),
+    ("Practitioner Grades", "gradeAnalyzer", "GradeAnalyzer", {"column": "note_practicien", "bins": 10}),
+]
+
+# Live tail: how often appended rows are merged, and at most how often the
+# visible tab re-renders from them
+LIVE_POLL_MS = 250
+LIVE_REFRESH_SECONDS = 2.0
 
 
 class CSVApp:
-    def __init__(self, root):
+    def __init__(self, root, paths=None):
         self.root = root
         self.root.title("CSV Analysis App")
         self.root.geometry("1200x800")
-        IntroFrame(root, self.createTabs)
+        self.dataset = None
+        self.baseDataset = None
+        self.cube = None
+        self.filterBar = None
+        self.notebook = None
+        self.tabs = {}
+        self.analyzers = {}
+        self.tail = None
+        self.liveDelta = None
+        self.lastLiveRefresh = 0.0
+        self.staleTabs = set()
+        self.debugTab = None
+        self.memoryReport = None
+        # Analyzer computations run on the scheduler's workers from here on
+        scheduler.attach(root)
+        # F12 shows/hides the profiling tab
+        self.root.bind("<F12>", self.toggleDebugTab)
+        IntroFrame(root, self.createTabs, paths)
+
+    def createTabs(self, data, tail=None, memoryReport=None):
+        # Typed columns are parsed once here and shared by every tab. Streamed
+        # aggregates answer the same queries without holding any rows.
+        self.dataset = data if isinstance(data, SessionAggregates) else Dataset(data)
+        self.baseDataset = self.dataset
+        self.memoryReport = memoryReport
+        # Cached views belong to the previous file
+        viewCache.clear()
+
+        # Cross-tab filters need the rows to build the cube from. The cube is
+        # a full pass over the rows: it is built on a worker right away and
+        # the filter bar is enabled once it is ready.
+        if self.dataset.hasRows:
+            categories = {dim: self.dataset.codes(dim)[1] for dim in DIMENSIONS if dim in self.dataset.columns}
+            self.filterBar = FilterBar(self.root, categories, self.applyFilters)
+            self.filterBar.setEnabled(False)
+            self.filterBar.setStatus("Preparing filters...")
+            baseDataset = self.baseDataset
+            scheduler.submit((self, "cube"), lambda: FilterCube(baseDataset), self.onCubeBuilt, self.onCubeError,
+                             name="FilterCube.build")
+
+        self.notebook = ttk.Notebook(self.root)
+        self.notebook.pack(expand=True, fill="both")
+
+        # Tabs start empty and are built the first time they are selected
+        for spec in TAB_SPECS:
+            tab = ttk.Frame(self.notebook)
+            self.notebook.add(tab, text=spec[0])
+            self.tabs[str(tab)] = (tab, spec)
+
+        self.notebook.bind("<<NotebookTabChanged>>", self.onTabChanged)
+        self.onTabChanged()
+
+        if tail is not None:
+            self.tail = tail
+            self.showLiveStatus()
+            self.root.after(LIVE_POLL_MS, self.pollTail)
 
-    def createTabs(self, df):
-        notebook = ttk.Notebook(self.root)
-        notebook.pack(expand=True, fill="both")
+    def pollTail(self):
+        # Appended rows arrive as aggregate deltas of just those rows. They are
+        # collected apart from self.dataset, which scheduler workers may be
+        # reading, until the next refresh swaps in a merged copy.
+        for message in self.tail.drain():
+            kind = message[0]
+            if kind == "delta":
+                if self.liveDelta is None:
+                    self.liveDelta = message[1]
+                else:
+                    self.liveDelta.merge(message[1])
+            elif kind == "reset":
+                # The file was truncated or rotated and is read again, maybe
+                # with another header: deltas queued before this belong to
+                # the old file, those after it are kept
+                self.dataset = SessionAggregates(message[1])
+                self.liveDelta = SessionAggregates(message[1])
+            elif kind == "error":
+                self.root.title(f"CSV Analysis App - live tail stopped: {message[1]}")
+                return
+        if self.liveDelta is not None and time.monotonic() - self.lastLiveRefresh >= LIVE_REFRESH_SECONDS:
+            self.refreshLive()
+        self.root.after(LIVE_POLL_MS, self.pollTail)
 
-        topValuesTab = ttk.Frame(notebook)
-        dateCurveTab = ttk.Frame(notebook)
-        serviceTab = ttk.Frame(notebook)
-        qualiteTab = ttk.Frame(notebook)
-        interactionTab = ttk.Frame(notebook)
-        gradesTab = ttk.Frame(notebook)
+    def refreshLive(self):
+        # Only the visible tab re-renders now; the others when next selected
+        if self.liveDelta is not None:
+            merged = copy.deepcopy(self.dataset)
+            merged.merge(self.liveDelta)
+            self.dataset = merged
+            self.liveDelta = None
+        self.lastLiveRefresh = time.monotonic()
+        self.staleTabs = set(self.analyzers)
+        self.refreshStaleTab(self.notebook.select())
+        self.showLiveStatus()
 
+    def refreshStaleTab(self, tabName):
+        if tabName in self.staleTabs:
+            self.staleTabs.discard(tabName)
+            self.analyzers[tabName].setDataset(self.dataset)
 
-        notebook.add(topValuesTab, text="Top Values")
-        notebook.add(dateCurveTab, text="Entries Over Time")
-        notebook.add(serviceTab, text="Service Table")
-        notebook.add(qualiteTab, text="Qualite Score Histogram")
-        notebook.add(interactionTab, text="Interactions Compare")
-        notebook.add(gradesTab, text="Practitioner Grades")
+    def showLiveStatus(self):
+        self.root.title(f"CSV Analysis App - live: {len(self.dataset):,} rows")
 
-        
+    def onCubeBuilt(self, cube):
+        self.cube = cube
+        self.filterBar.setEnabled(True)
+        self.filterBar.setStatus(f"{len(self.dataset):,} sessions")
 
+    def onCubeError(self, error):
+        self.filterBar.setStatus(f"Filters unavailable: {error}")
 
+    def applyFilters(self, codes, dateRange):
+        # A filter change only sums cube cells, and each built tab re-renders
+        # from the filtered view
+        if self.cube is None:
+            return
+        self.dataset = self.cube.select(codes, dateRange)
+        self.filterBar.setStatus(f"{len(self.dataset):,} sessions")
+        for analyzer in self.analyzers.values():
+            analyzer.setDataset(self.dataset)
 
-        CSVAnalyzer(topValuesTab, df=df, column="langue")
-        DateCurveAnalyzer(dateCurveTab, df=df, dateColumn="date", durationColumn="duree_minutes")
-        ServiceTableAnalyzer(serviceTab, df=df, filterColumn="service")
-        QualiteScoreHistogram(qualiteTab, df=df, column="qualite_score", bins=10)
-        InteractionComparisonAnalyzer(interactionTab, df=df, patientColumn="interactions_patient", professionalColumn="interactions_praticien")
-        GradeAnalyzer(gradesTab, df=df, column="note_practicien", bins=10)
+    def onTabChanged(self, event=None):
+        tabName = self.notebook.select()
+        if tabName in self.tabs and tabName not in self.analyzers:
+            self.buildTab(tabName)
+        else:
+            self.refreshStaleTab(tabName)
 
+    def buildTab(self, tabName):
+        tab, (title, moduleName, className, kwargs) = self.tabs[tabName]
+        with phase(f"CSVApp.buildTab.{title}"):
+            analyzerClass = getattr(importlib.import_module(moduleName), className)
+            self.analyzers[tabName] = analyzerClass(tab, dataset=self.dataset, **kwargs)
+        instrumentCanvases(self.analyzers[tabName], className)
 
+    def toggleDebugTab(self, event=None):
+        if self.notebook is None:
+            return
+        if self.debugTab is None:
+            from profilerPanel import ProfilerPanel
+            self.debugTab = ttk.Frame(self.notebook)
+            ProfilerPanel(self.debugTab, memoryReport=self.memoryReport)
+            self.notebook.add(self.debugTab, text="Debug")
+            self.notebook.select(self.debugTab)
+        elif self.notebook.tab(self.debugTab, "state") == "hidden":
+            self.notebook.add(self.debugTab)
+            self.notebook.select(self.debugTab)
+        else:
+            self.notebook.hide(self.debugTab)
 
 
-root = tk.Tk()
-app = CSVApp(root)
-root.mainloop()
+if __name__ == "__main__":
+    root = tk.Tk()
+    # Optional CSV files, directories or glob patterns to load right away
+    app = CSVApp(root, sys.argv[1:])
+    root.mainloop()
@@ -0,0 +1,190 @@
+import atexit
+import collections
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import nullcontext
+
+# Per-phase timing and memory instrumentation. Phases are marked with the
+# @profiled decorator or `with phase(name):`. While disabled both cost one
+# attribute check, so they stay in place in normal runs. Set
+# CSV_ANALYZER_PROFILE=1 to enable at startup and CSV_ANALYZER_TRACE=<path>
+# to write a Chrome trace (chrome://tracing, Perfetto) on exit.
+
+_NULL_PHASE = nullcontext()
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def currentRss():
+    # Resident set size in bytes, or None where /proc is not available
+    try:
+        with open("/proc/self/statm", "rb") as fh:
+            return int(fh.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class PhaseRecord:
+    __slots__ = ("name", "start", "duration", "rssDelta", "allocPeak", "threadId", "threadName")
+
+    def __init__(self, name, start, duration, rssDelta, allocPeak, threadId, threadName):
+        self.name = name
+        self.start = start
+        self.duration = duration
+        self.rssDelta = rssDelta
+        self.allocPeak = allocPeak
+        self.threadId = threadId
+        self.threadName = threadName
+
+    def asDict(self):
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+
+class Profiler:
+    def __init__(self, maxRecords=100_000):
+        self.enabled = False
+        self.allocations = False
+        self.maxRecords = maxRecords
+        # The oldest records are dropped beyond maxRecords; added keeps
+        # counting so viewers can tell new records arrived
+        self.records = collections.deque(maxlen=maxRecords)
+        self.added = 0
+        self.origin = time.perf_counter()
+        self.lock = threading.Lock()
+
+    def enable(self, allocations=False):
+        # allocations=True also records the peak traced Python allocation of
+        # each phase (tracemalloc), which slows allocation-heavy code
+        self.allocations = allocations
+        if allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+        if self.allocations and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self.allocations = False
+
+    def clear(self):
+        with self.lock:
+            self.records.clear()
+
+    def phase(self, name):
+        if not self.enabled:
+            return _NULL_PHASE
+        return _Phase(self, name)
+
+    def add(self, record):
+        with self.lock:
+            self.records.append(record)
+            self.added += 1
+
+    def snapshot(self):
+        with self.lock:
+            return list(self.records)
+
+    def summary(self):
+        # {name: {"count", "total", "mean", "max", "last", "rssDelta"}}, seconds and bytes
+        result = {}
+        for record in self.snapshot():
+            entry = result.setdefault(record.name, {"count": 0, "total": 0.0, "max": 0.0, "last": 0.0, "rssDelta": 0})
+            entry["count"] += 1
+            entry["total"] += record.duration
+            entry["max"] = max(entry["max"], record.duration)
+            entry["last"] = record.duration
+            entry["rssDelta"] += record.rssDelta or 0
+        for entry in result.values():
+            entry["mean"] = entry["total"] / entry["count"]
+        return result
+
+    def writeJson(self, path):
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump({"phases": [r.asDict() for r in self.snapshot()], "summary": self.summary()}, fh, indent=2)
+
+    def writeChromeTrace(self, path):
+        # Complete ("X") events in microseconds, one track per thread
+        pid = os.getpid()
+        events = []
+        threads = {}
+        for record in self.snapshot():
+            threads[record.threadId] = record.threadName
+            args = {"rssDelta": record.rssDelta}
+            if record.allocPeak is not None:
+                args["allocPeak"] = record.allocPeak
+            events.append({
+                "name": record.name, "cat": record.name.split(".")[0], "ph": "X",
+                "ts": record.start * 1e6, "dur": record.duration * 1e6,
+                "pid": pid, "tid": record.threadId, "args": args,
+            })
+        for threadId, threadName in threads.items():
+            events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": threadId, "args": {"name": threadName}})
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, fh)
+
+
+class _Phase:
+    __slots__ = ("profiler", "name", "start", "rss")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        if self.profiler.allocations:
+            tracemalloc.reset_peak()
+        self.rss = currentRss()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter()
+        rss = currentRss()
+        allocPeak = None
+        if self.profiler.allocations and tracemalloc.is_tracing():
+            allocPeak = tracemalloc.get_traced_memory()[1]
+        thread = threading.current_thread()
+        self.profiler.add(PhaseRecord(
+            self.name, self.start - self.profiler.origin, end - self.start,
+            None if rss is None or self.rss is None else rss - self.rss,
+            allocPeak, thread.ident, thread.name,
+        ))
+        return False
+
+
+profiler = Profiler()
+
+
+def phase(name):
+    return profiler.phase(name)
+
+
+def profiled(fn=None, name=None):
+    # Method/function decorator; the phase name defaults to the qualified name
+    if fn is None:
+        return lambda f: profiled(f, name)
+    label = name or fn.__qualname__
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if not profiler.enabled:
+            return fn(*args, **kwargs)
+        with _Phase(profiler, label):
+            return fn(*args, **kwargs)
+    return wrapper
+
+
+def instrumentCanvases(owner, prefix):
+    # Times the actual renders of owner's Tk canvases (draw_idle ends in draw)
+    for attr, value in vars(owner).items():
+        if hasattr(value, "draw") and hasattr(value, "get_tk_widget"):
+            value.draw = profiled(value.draw, name=f"{prefix}.{attr}.draw")
+
+
+if os.environ.get("CSV_ANALYZER_PROFILE") == "1":
+    profiler.enable()
+if os.environ.get("CSV_ANALYZER_TRACE"):
+    atexit.register(lambda: profiler.writeChromeTrace(os.environ["CSV_ANALYZER_TRACE"]))
@@ -0,0 +1,105 @@
+import tkinter as tk
+from tkinter import ttk, filedialog
+from profiler import profiler, currentRss
+from viewCache import viewCache
+
+class ProfilerPanel:
+    # Debug tab: per-phase timing table fed by profiler.profiler, refreshed
+    # once a second while the tab exists, with JSON / Chrome-trace export.
+    # memoryReport (compaction.compactFrame) adds a per-column memory table.
+    def __init__(self, parent, refreshMs=1000, memoryReport=None):
+        self.parent = parent
+        self.refreshMs = refreshMs
+        self.lastCount = -1
+
+        self.frame = tk.Frame(parent)
+        self.frame.pack(expand=True, fill="both")
+
+        controls = tk.Frame(self.frame)
+        controls.pack(fill="x", padx=10, pady=5)
+        self.enabledVar = tk.BooleanVar(value=profiler.enabled)
+        tk.Checkbutton(controls, text="Profiling enabled", variable=self.enabledVar, command=self.onToggle).pack(side="left")
+        self.allocationsVar = tk.BooleanVar(value=profiler.allocations)
+        tk.Checkbutton(controls, text="Track allocations (slower)", variable=self.allocationsVar, command=self.onToggle).pack(side="left", padx=10)
+        tk.Button(controls, text="Clear", command=self.onClear).pack(side="left", padx=5)
+        tk.Button(controls, text="Export JSON...", command=self.exportJson).pack(side="left", padx=5)
+        tk.Button(controls, text="Export Chrome trace...", command=self.exportTrace).pack(side="left", padx=5)
+        self.statusLabel = tk.Label(controls, text="", font=("Arial", 10))
+        self.statusLabel.pack(side="right")
+
+        columns = ["phase", "calls", "total", "mean", "max", "last", "rss"]
+        headings = ["Phase", "Calls", "Total (ms)", "Mean (ms)", "Max (ms)", "Last (ms)", "RSS delta (MB)"]
+        tableFrame = tk.Frame(self.frame)
+        tableFrame.pack(expand=True, fill="both", padx=10, pady=5)
+        self.tree = ttk.Treeview(tableFrame, columns=columns, show="headings")
+        for col, heading in zip(columns, headings):
+            self.tree.heading(col, text=heading)
+            self.tree.column(col, width=300 if col == "phase" else 100, anchor="w" if col == "phase" else "e")
+        self.tree.pack(side="left", expand=True, fill="both")
+        scrollY = ttk.Scrollbar(tableFrame, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollY.set)
+        scrollY.pack(side="right", fill="y")
+
+        if memoryReport:
+            self.showMemoryReport(memoryReport)
+        self.refresh()
+
+    def showMemoryReport(self, report):
+        tk.Label(self.frame, text="Memory by column (load -> compacted)", font=("Arial", 10, "bold")).pack(anchor="w", padx=10)
+        columns = ["column", "before", "after", "mbBefore", "mbAfter"]
+        headings = ["Column", "Loaded as", "Stored as", "Before (MB)", "After (MB)"]
+        tree = ttk.Treeview(self.frame, columns=columns, show="headings", height=min(len(report) + 1, 14))
+        for col, heading in zip(columns, headings):
+            tree.heading(col, text=heading)
+            tree.column(col, width=200 if col in ("column", "before", "after") else 100, anchor="w" if col in ("column", "before", "after") else "e")
+        for entry in report:
+            tree.insert("", "end", values=[
+                entry["column"], entry["dtypeBefore"], entry["dtypeAfter"],
+                f"{entry['bytesBefore'] / 1e6:.2f}", f"{entry['bytesAfter'] / 1e6:.2f}",
+            ])
+        before = sum(e["bytesBefore"] for e in report)
+        after = sum(e["bytesAfter"] for e in report)
+        tree.insert("", "end", values=["Total", "", "", f"{before / 1e6:.2f}", f"{after / 1e6:.2f}"])
+        tree.pack(fill="x", padx=10, pady=5)
+
+    def onToggle(self):
+        profiler.disable()
+        if self.enabledVar.get():
+            profiler.enable(allocations=self.allocationsVar.get())
+        self.refresh(reschedule=False)
+
+    def onClear(self):
+        profiler.clear()
+        self.lastCount = -1
+        self.refresh(reschedule=False)
+
+    def exportJson(self):
+        path = filedialog.asksaveasfilename(defaultextension=".json", filetypes=[("JSON", "*.json")])
+        if path:
+            profiler.writeJson(path)
+
+    def exportTrace(self):
+        path = filedialog.asksaveasfilename(defaultextension=".json", filetypes=[("Chrome trace", "*.json")])
+        if path:
+            profiler.writeChromeTrace(path)
+
+    def refresh(self, reschedule=True):
+        if not self.frame.winfo_exists():
+            return
+        added = profiler.added
+        if added != self.lastCount:
+            self.lastCount = added
+            self.tree.delete(*self.tree.get_children())
+            summary = profiler.summary()
+            for name, entry in sorted(summary.items(), key=lambda item: -item[1]["total"]):
+                self.tree.insert("", "end", values=[
+                    name, entry["count"], f"{entry['total'] * 1000:.1f}", f"{entry['mean'] * 1000:.2f}",
+                    f"{entry['max'] * 1000:.2f}", f"{entry['last'] * 1000:.2f}", f"{entry['rssDelta'] / 1e6:+.1f}",
+                ])
+        rss = currentRss()
+        state = "on" if profiler.enabled else "off"
+        rssText = f"   RSS: {rss / 1e6:.0f} MB" if rss is not None else ""
+        cacheText = f"   View cache: {len(viewCache.entries)} views, {viewCache.totalBytes / 1e6:.0f} MB, {viewCache.hits} hits"
+        self.statusLabel.config(text=f"Profiling {state}   {len(profiler.records):,} phases{rssText}{cacheText}")
+        if reschedule:
+            self.frame.after(self.refreshMs, self.refresh)
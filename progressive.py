@@ -0,0 +1,144 @@
+import numpy as np
+from dataset import Dataset
+from profiler import phase
+from scheduler import scheduler
+from viewCache import viewCache
+
+# Progressive rendering for the summary tabs. A chart's compute step runs on
+# growing random samples of the rows before the full dataset: the first
+# sample is drawn within a fraction of a second even on 10^7 rows, with 95%
+# confidence intervals in the stats, and background jobs refine it to the
+# exact result.
+
+# Sample sizes computed before the exact result
+STAGES = (20_000, 200_000)
+# Datasets with fewer rows are computed exactly right away
+MIN_ROWS = 200_000
+# Normal quantile of the 95% intervals
+Z = 1.96
+
+
+class SampledDataset(Dataset):
+    # Uniform random rows (with replacement) of a dataset, or of a filtered
+    # view's selected rows. Counts, sums and histogram heights are scaled up
+    # to the full row count; intervals() and corrInterval() give their 95%
+    # confidence intervals.
+    isEstimate = True
+
+    def __init__(self, source, size, seed=None):
+        rng = np.random.default_rng(seed)
+        rows = np.flatnonzero(source.rowMask) if source.rowMask is not None else None
+        self.total = len(rows) if rows is not None else len(source.df)
+        positions = np.sort(rng.integers(0, self.total, size))
+        if rows is not None:
+            positions = rows[positions]
+        with phase("SampledDataset.take"):
+            super().__init__(source.df.iloc[positions].reset_index(drop=True))
+        self.size = size
+        self.scale = self.total / size
+        self.viewKey = None
+
+    def __len__(self):
+        return self.total
+
+    def count(self, column):
+        return int(round(super().count(column) * self.scale))
+
+    def valueCounts(self, column):
+        return (super().valueCounts(column) * self.scale).round().astype(np.int64)
+
+    def describe(self, column, fillValue=None, valueRange=None):
+        stats = super().describe(column, fillValue, valueRange)
+        stats["count"] = int(round(stats["count"] * self.scale))
+        if "sum" in stats:
+            stats["sum"] *= self.scale
+        return stats
+
+    def histogram(self, column, bins, valueRange=None, fillValue=None):
+        counts, edges = super().histogram(column, bins, valueRange, fillValue)
+        return counts * self.scale, edges
+
+    def intervals(self, column, fillValue=None, valueRange=None):
+        # 95% intervals of describe()'s estimates: half-widths, or (low, high)
+        # for the median, whose sampling distribution need not be symmetric
+        data = np.sort(self.values(column, fillValue, valueRange).to_numpy())
+        n = len(data)
+        if n < 2:
+            return {}
+        # Share of sampled rows that are valid (and in range) -> count, sum
+        share = n / self.size
+        total = data.sum()
+        spread = np.sqrt(max((data @ data) / self.size - (total / self.size) ** 2, 0.0))
+        std = data.std(ddof=1)
+        # Median: order statistics around n/2 (binomial normal approximation)
+        k = Z * np.sqrt(n) / 2
+        lo = data[max(int(np.floor(n / 2 - k)), 0)]
+        hi = data[min(int(np.ceil(n / 2 + k)), n - 1)]
+        return {
+            "count": self.total * Z * np.sqrt(share * (1 - share) / self.size),
+            "sum": self.total * Z * spread / np.sqrt(self.size),
+            "mean": Z * std / np.sqrt(n),
+            "median": (lo, hi),
+            "std": Z * std / np.sqrt(2 * (n - 1)),
+        }
+
+    def corrInterval(self, columnX, columnY, fillValue=None):
+        # 95% (low, high) of corr() (Fisher z), or None when undefined
+        x, y = self.numeric(columnX), self.numeric(columnY)
+        if fillValue is not None:
+            x, y = x.fillna(fillValue), y.fillna(fillValue)
+        n = int((x.notna() & y.notna()).sum())
+        r = x.corr(y)
+        if n < 4 or not np.isfinite(r):
+            return None
+        z = np.arctanh(np.clip(r, -0.999999, 0.999999))
+        se = 1 / np.sqrt(n - 3)
+        return np.tanh(z - Z * se), np.tanh(z + Z * se)
+
+    def note(self):
+        return f"95% intervals from a {self.size:,}-row sample of {self.total:,}, refining..."
+
+
+class ProgressiveRefresh:
+    # Renders a chart (compute(dataset) -> result, plot(result)) from STAGES
+    # samples and then the full dataset. The first sample is computed on the
+    # Tk thread so a chart appears at once; each later stage is a scheduler
+    # job submitted when the previous one is plotted. Every stage uses the
+    # chart's scheduler key, so a new start() supersedes the whole chain.
+    def __init__(self, chart, stages=STAGES, minRows=MIN_ROWS):
+        self.chart = chart
+        self.stages = stages
+        self.minRows = minRows
+        self.key = (chart, "refresh")
+
+    def start(self, dataset):
+        scheduler.cancel(self.key)
+        # Exact results of views already shown come from viewCache
+        key = self.chart.cacheKey(dataset)
+        cached = viewCache.get(key)
+        if cached is not None:
+            self.chart.plotView(key, cached)
+            return
+        sizes = [size for size in self.stages if size * 2 <= len(dataset)]
+        if not dataset.hasRows or len(dataset) < self.minRows or not sizes:
+            self.submit(dataset, [])
+            return
+        self.chart.plotView(None, self.chart.compute(SampledDataset(dataset, sizes[0])))
+        self.submit(dataset, sizes[1:])
+
+    def submit(self, dataset, sizes):
+        # Next stage: a sample of sizes[0] rows, or the exact result
+        key = self.chart.cacheKey(dataset)
+
+        def compute():
+            return self.chart.compute(SampledDataset(dataset, sizes[0]) if sizes else dataset)
+
+        def onResult(result):
+            if sizes:
+                self.chart.plotView(None, result)
+                self.submit(dataset, sizes[1:])
+            else:
+                viewCache.put(key, result)
+                self.chart.plotView(key, result)
+
+        scheduler.submit(self.key, compute, onResult, self.chart.showError, name=f"{type(self.chart).__name__}.stage")
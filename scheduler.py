@@ -0,0 +1,176 @@
+import itertools
+import os
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from profiler import phase
+from viewCache import viewCache
+
+# Background execution of the analyzers' work. Tk callbacks submit a job
+# under a key naming what it computes (one analyzer's table, one chart's
+# stats); the job runs on a thread pool and its result is handed back on the
+# Tk thread from root.after. Per key at most one job runs and one waits: a
+# newer submit replaces the waiting job and makes the running one stale, so
+# a burst of clicks computes the first and the last state only, and results
+# of superseded jobs are never applied. Threads rather than processes: the
+# jobs are numpy/pandas passes (which release the GIL) over data the Tk side
+# already holds.
+
+POLL_MS = 15
+
+
+class Job:
+    __slots__ = ("key", "token", "fn", "onResult", "onError", "name")
+
+    def __init__(self, key, token, fn, onResult, onError, name):
+        self.key = key
+        self.token = token
+        self.fn = fn
+        self.onResult = onResult
+        self.onError = onError
+        self.name = name
+
+
+class Scheduler:
+    def __init__(self, workers=None):
+        self.workers = workers or min(4, os.cpu_count() or 1)
+        self.root = None
+        self.executor = None
+        self.tokens = itertools.count(1)
+        self.latest = {}
+        self.running = {}
+        self.waiting = {}
+        self.timers = {}
+        self.finished = queue.Queue()
+        self.polling = False
+
+    def attach(self, root):
+        # Until a Tk root is attached (batch reports, scripts) jobs run inline
+        self.root = root
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(self.workers, thread_name_prefix="compute")
+
+    def detach(self):
+        for timer, _ in self.timers.values():
+            self.root.after_cancel(timer)
+        self.root = None
+        self.latest.clear()
+        self.waiting.clear()
+        self.timers.clear()
+        self.running.clear()
+        self.polling = False
+
+    def submit(self, key, fn, onResult, onError=None, delayMs=0, name=None):
+        # fn() runs on a worker; onResult(result) or onError(exception) then
+        # runs on the Tk thread, unless a newer job was submitted under key.
+        # delayMs debounces: the job only starts once no newer submit came
+        # for that long.
+        job = Job(key, next(self.tokens), fn, onResult, onError, name or "Scheduler.job")
+        self.latest[key] = job.token
+        self.waiting.pop(key, None)
+        self.cancelTimer(key)
+        if self.root is None:
+            self.deliver(job, *self.execute(job))
+        elif delayMs:
+            self.timers[key] = (self.root.after(delayMs, self.enqueue, job), job)
+        else:
+            self.enqueue(job)
+
+    def refreshChart(self, chart):
+        # Chart.refresh in the background: compute on a worker, plot on the
+        # Tk thread. Views already computed are plotted from viewCache.
+        dataset = chart.dataset
+        key = chart.cacheKey(dataset)
+        cached = viewCache.get(key)
+        if cached is not None:
+            self.cancel((chart, "refresh"))
+            chart.plotView(key, cached)
+            return
+
+        def onResult(result):
+            viewCache.put(key, result)
+            chart.plotView(key, result)
+
+        self.submit((chart, "refresh"), lambda: chart.compute(dataset), onResult, chart.showError,
+                    name=f"{type(chart).__name__}.refresh")
+
+    def cancel(self, key):
+        # Drops the waiting job under key and the result of the running one
+        self.latest.pop(key, None)
+        self.waiting.pop(key, None)
+        self.cancelTimer(key)
+
+    def cancelTimer(self, key):
+        timer = self.timers.pop(key, None)
+        if timer is not None:
+            self.root.after_cancel(timer[0])
+
+    def enqueue(self, job):
+        self.timers.pop(job.key, None)
+        if job.key in self.running:
+            self.waiting[job.key] = job
+        else:
+            self.start(job)
+
+    def start(self, job):
+        self.running[job.key] = job
+        future = self.executor.submit(self.execute, job)
+        future.add_done_callback(lambda f: self.finished.put((job, *f.result())))
+        if not self.polling:
+            self.polling = True
+            self.root.after(POLL_MS, self.poll)
+
+    def execute(self, job):
+        # (result, None) or (None, exception)
+        try:
+            with phase(job.name):
+                return job.fn(), None
+        except Exception as e:
+            return None, e
+
+    def poll(self):
+        if self.root is None:
+            return
+        self.polling = False
+        try:
+            while True:
+                try:
+                    self.finish(*self.finished.get_nowait())
+                except queue.Empty:
+                    break
+        finally:
+            # Delivered results may have started new jobs (and polling)
+            if self.running and not self.polling:
+                self.polling = True
+                self.root.after(POLL_MS, self.poll)
+
+    def finish(self, job, result, error):
+        if self.running.get(job.key) is job:
+            del self.running[job.key]
+            waiting = self.waiting.pop(job.key, None)
+            if waiting is not None:
+                self.start(waiting)
+        self.deliver(job, result, error)
+
+    def deliver(self, job, result, error):
+        if self.latest.get(job.key) != job.token:
+            return
+        del self.latest[job.key]
+        if error is None:
+            job.onResult(result)
+        elif job.onError is not None:
+            job.onError(error)
+        else:
+            raise error
+
+    def flush(self):
+        # Blocks until every submitted job has run and been delivered, for
+        # benchmarks timing a UI action end to end
+        while self.running or self.waiting or self.timers:
+            for timer, job in list(self.timers.values()):
+                self.root.after_cancel(timer)
+                self.enqueue(job)
+            if self.running:
+                self.finish(*self.finished.get())
+
+
+scheduler = Scheduler()
@@ -0,0 +1,282 @@
+import re
+import shlex
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from compaction import PatternedIdDtype
+from profiler import phase, profiled
+
+# Free-text search over the service table. A query is a list of terms, all
+# of which must match (AND):
+#
+#   S00012            any text/date column contains it, or a numeric column equals it
+#   langue:arabe      the column contains the text
+#   device=mobile     the column equals the value (whole day for dates)
+#   duree_minutes>30  range on a numeric or date column (>, >=, <, <=, =, !=)
+#
+# Text is matched case-insensitively against each column's distinct values,
+# then mapped to rows through the category codes. Columns with many distinct
+# values (session ids) get a trigram index for substrings and a sorted array
+# for prefixes; past TRIGRAM_LIMIT distinct values only the sorted array is
+# built and text matches prefixes. Ranges use each column's sort permutation
+# from TableIndex.
+
+TERM_PATTERN = re.compile(r"^(?P<column>[^\s:<>=!]+)\s*(?P<op>>=|<=|!=|==|=|>|<|:)\s*(?P<value>.*)$")
+# Distinct values above which a text column is indexed instead of scanned
+SCAN_LIMIT = 10_000
+# Distinct values above which a text column is only prefix-indexed: the
+# trigram index of 2M ids takes seconds and hundreds of MB to build
+TRIGRAM_LIMIT = 200_000
+# Longest value for which trigrams are indexed; longer columns are scanned
+MAX_INDEXED_WIDTH = 64
+# Trigram candidates checked by direct substring search below this count
+VERIFY_LIMIT = 2_000
+TOP_CODEPOINT = "\U0010ffff"
+
+
+def trigramKeys(chars):
+    # chars: uint64 codepoints (..., width); each trigram packed in 63 bits
+    return (chars[..., :-2] << 42) | (chars[..., 1:-1] << 21) | chars[..., 2:]
+
+
+class TextIndex:
+    # Case-insensitive lookups over the distinct values of one column;
+    # results are boolean arrays over those values
+    def __init__(self, values, lowered=False):
+        # lowered: values is already a lower-case numpy str array
+        self.values = values if lowered else np.asarray(pd.Index(values).astype(str).str.lower(), dtype=str)
+        width = self.values.dtype.itemsize // 4
+        self.indexed = len(self.values) > SCAN_LIMIT and 3 <= width <= MAX_INDEXED_WIDTH
+        if not self.indexed:
+            return
+        # Prefix index: the values in sorted order (padded ids already are)
+        if (self.values[1:] >= self.values[:-1]).all():
+            self.order = np.arange(len(self.values))
+            self.sortedValues = self.values
+        else:
+            self.order = np.argsort(self.values, kind="stable")
+            self.sortedValues = self.values[self.order]
+        self.trigrams = None
+        if len(self.values) > TRIGRAM_LIMIT:
+            return
+        # Trigram index: (trigram key, value id) pairs sorted by key
+        chars = self.values.view(np.uint32).reshape(len(self.values), width).astype(np.uint64)
+        keys = trigramKeys(chars)
+        valid = chars[:, 2:] != 0
+        ids = np.broadcast_to(np.arange(len(self.values), dtype=np.int32)[:, None], keys.shape)[valid]
+        keys = keys[valid]
+        # Sorted by key then id, repeats within a value dropped: each key's
+        # posting list is a sorted run of distinct ids
+        order = np.lexsort((ids, keys))
+        keys, ids = keys[order], ids[order]
+        distinct = np.ones(len(keys), dtype=bool)
+        distinct[1:] = (keys[1:] != keys[:-1]) | (ids[1:] != ids[:-1])
+        self.trigrams = keys[distinct]
+        self.trigramIds = ids[distinct]
+
+    def contains(self, text):
+        # Substring match; on indexed columns, terms shorter than a trigram
+        # match prefixes instead (a 1-2 character substring hits nearly every
+        # id), as do all terms on columns without trigrams
+        if not self.indexed:
+            return np.char.find(self.values, text) >= 0
+        if len(text) < 3 or self.trigrams is None:
+            return self.prefix(text)
+        keys = np.unique(trigramKeys(np.array([ord(c) for c in text], dtype=np.uint64)))
+        lo = np.searchsorted(self.trigrams, keys, side="left")
+        hi = np.searchsorted(self.trigrams, keys, side="right")
+        # Shortest posting lists first; once few candidates remain they are
+        # checked directly instead of intersected with the long lists
+        candidates = None
+        for i in np.argsort(hi - lo, kind="stable"):
+            ids = self.trigramIds[lo[i]:hi[i]]
+            candidates = ids if candidates is None else np.intersect1d(candidates, ids, assume_unique=True)
+            if len(candidates) <= VERIFY_LIMIT:
+                break
+        # Trigrams do not record their order: confirm the actual substring
+        if len(text) > 3 and len(candidates):
+            candidates = candidates[np.char.find(self.values[candidates], text) >= 0]
+        return self.hits(candidates)
+
+    def prefix(self, text):
+        if not self.indexed:
+            return np.char.startswith(self.values, text)
+        lo = np.searchsorted(self.sortedValues, text, side="left")
+        hi = np.searchsorted(self.sortedValues, text + TOP_CODEPOINT, side="left")
+        return self.hits(self.order[lo:hi])
+
+    def equals(self, text):
+        if not self.indexed:
+            return self.values == text
+        lo = np.searchsorted(self.sortedValues, text, side="left")
+        hi = np.searchsorted(self.sortedValues, text, side="right")
+        return self.hits(self.order[lo:hi])
+
+    def hits(self, ids):
+        result = np.zeros(len(self.values), dtype=bool)
+        result[ids] = True
+        return result
+
+
+class SearchIndex:
+    # Row masks for search queries over every column of the table's frame.
+    # Indexes are built per column on first use and kept; the masks of the
+    # last few terms are cached, so typing only evaluates the changed term.
+    def __init__(self, tableIndex, cacheSize=32):
+        self.tableIndex = tableIndex
+        self.dataset = tableIndex.dataset
+        self.df = tableIndex.df
+        self.columns = list(self.df.columns)
+        self.kinds = {col: self.columnKind(col) for col in self.columns}
+        self.textIndexes = {}
+        self.sortedValues = {}
+        self.termMasks = OrderedDict()
+        self.cacheSize = cacheSize
+
+    def columnKind(self, column):
+        dtype = self.df[column].dtype
+        if pd.api.types.is_datetime64_any_dtype(dtype):
+            return "date"
+        if pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype):
+            return "numeric"
+        return "text"
+
+    def resolve(self, name):
+        # Exact column name (case-insensitive), else a unique prefix of one
+        name = name.lower()
+        for col in self.columns:
+            if col.lower() == name:
+                return col
+        matches = [col for col in self.columns if col.lower().startswith(name)]
+        if len(matches) == 1:
+            return matches[0]
+        if not matches:
+            raise ValueError(f"Unknown column: {name}")
+        raise ValueError(f"Ambiguous column: {name} ({', '.join(matches)})")
+
+    @profiled
+    def search(self, query):
+        # Boolean mask over the frame's rows, or None for an empty query.
+        # Raises ValueError for malformed terms.
+        try:
+            terms = shlex.split(query)
+        except ValueError:
+            terms = query.split()
+        mask = None
+        for term in terms:
+            termMask = self.termMask(term)
+            mask = termMask if mask is None else mask & termMask
+        return mask
+
+    def termMask(self, term):
+        if term in self.termMasks:
+            self.termMasks.move_to_end(term)
+            return self.termMasks[term]
+        match = TERM_PATTERN.match(term)
+        if match and match.group("value"):
+            mask = self.columnMask(self.resolve(match.group("column")), match.group("op"), match.group("value"))
+        else:
+            mask = self.anyColumnMask(term)
+        self.termMasks[term] = mask
+        if len(self.termMasks) > self.cacheSize:
+            self.termMasks.popitem(last=False)
+        return mask
+
+    def anyColumnMask(self, text):
+        mask = np.zeros(len(self.df), dtype=bool)
+        number = self.parseNumber(text, required=False)
+        for col, kind in self.kinds.items():
+            if kind == "numeric":
+                if number is not None:
+                    mask |= self.rangeMask(col, "=", number)
+            else:
+                mask |= self.rowsOf(col, self.textIndex(col).contains(text.lower()))
+        return mask
+
+    def columnMask(self, column, op, value):
+        kind = self.kinds[column]
+        if op == "==":
+            op = "="
+        if kind == "text" or (kind == "date" and op == ":"):
+            if op == ":":
+                return self.rowsOf(column, self.textIndex(column).contains(value.lower()))
+            if op in ("=", "!="):
+                mask = self.rowsOf(column, self.textIndex(column).equals(value.lower()))
+                return ~mask if op == "!=" else mask
+            raise ValueError(f"{column} is a text column: use {column}:text or {column}=value")
+        if op == ":":
+            op = "="
+        if kind == "numeric":
+            return self.rangeMask(column, op, self.parseNumber(value))
+        return self.rangeMask(column, op, self.parseDate(value))
+
+    def parseNumber(self, text, required=True):
+        try:
+            return float(text)
+        except ValueError:
+            if required:
+                raise ValueError(f"Not a number: {text}") from None
+            return None
+
+    def parseDate(self, text):
+        date = pd.to_datetime(text, errors="coerce")
+        if pd.isna(date):
+            raise ValueError(f"Invalid date: {text}")
+        return date
+
+    def textIndex(self, column):
+        # Over the column's sorted distinct values (Dataset.codes), dates as
+        # they are displayed
+        if column not in self.textIndexes:
+            with phase(f"SearchIndex.build.{column}"):
+                categories = self.dataset.codes(column)[1]
+                if self.kinds[column] == "date":
+                    times = categories.normalize() != categories
+                    categories = categories.strftime("%Y-%m-%d %H:%M:%S" if times.any() else "%Y-%m-%d")
+                if isinstance(categories.dtype, PatternedIdDtype):
+                    # Formatted straight to a lower-case numpy str array:
+                    # astype(str) goes through Python objects
+                    ids = categories.array
+                    index = TextIndex(ids.formatted(ids.numbers, ids.dtype.prefix.lower()), lowered=True)
+                else:
+                    index = TextIndex(categories)
+                self.textIndexes[column] = index
+        return self.textIndexes[column]
+
+    def rowsOf(self, column, hits):
+        # Value hits -> row mask; missing values (code -1) never match
+        codes = self.dataset.codes(column)[0]
+        return np.append(hits, False)[codes]
+
+    def sortedColumn(self, column):
+        # (ascending non-missing values, their row positions)
+        if column not in self.sortedValues:
+            perm, valid = self.tableIndex.sortPermutation(column)
+            if self.kinds[column] == "numeric":
+                values = self.dataset.numeric(column).to_numpy()
+            else:
+                values = self.df[column].to_numpy()
+            self.sortedValues[column] = (values[perm[:valid]], perm[:valid])
+        return self.sortedValues[column]
+
+    def rangeMask(self, column, op, value):
+        values, positions = self.sortedColumn(column)
+        if isinstance(value, pd.Timestamp):
+            # A bare day stands for the whole day: = matches all of it,
+            # > starts after it and <= includes it
+            end = value + pd.Timedelta(days=1) if value == value.normalize() else None
+            lo = np.searchsorted(values, value.to_datetime64(), side="left")
+            if end is None:
+                hi = np.searchsorted(values, value.to_datetime64(), side="right")
+            else:
+                hi = np.searchsorted(values, end.to_datetime64(), side="left")
+        else:
+            lo = np.searchsorted(values, value, side="left")
+            hi = np.searchsorted(values, value, side="right")
+        # positions[lo:hi] are the rows equal to the value
+        n = len(values)
+        ranges = {">": [(hi, n)], ">=": [(lo, n)], "<": [(0, lo)], "<=": [(0, hi)], "=": [(lo, hi)], "!=": [(0, lo), (hi, n)]}
+        mask = np.zeros(len(self.df), dtype=bool)
+        for start, stop in ranges[op]:
+            mask[positions[start:stop]] = True
+        return mask
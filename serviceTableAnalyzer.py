@@ -1,17 +1,36 @@
+import os
 import tkinter as tk
-from tkinter import ttk
-import pandas as pd
+from tkinter import ttk, filedialog, messagebox
+from virtualTable import VirtualTable
+from tableIndex import TableIndex
+from searchIndex import SearchIndex
+from profiler import profiled
+from scheduler import scheduler
+from viewCache import viewCache
+from tableExport import TableExporter
+
+# Delay after the last keystroke before the search box filters the table
+SEARCH_DELAY_MS = 150
 
 class ServiceTableAnalyzer:
-    def __init__(self, parent, df, filterColumn="service"):
-        self.df = df
+    def __init__(self, parent, dataset, filterColumn="service"):
+        self.dataset = dataset
         self.filterColumn = filterColumn
         self.parent = parent
         self.frame = tk.Frame(parent)
         self.frame.pack(expand=True, fill="both")
-        self.currentData = df
+        if not dataset.hasRows:
+            tk.Label(self.frame, text="The service table needs the rows loaded.\nReopen the file without streaming to browse sessions.", font=("Arial", 12)).pack(pady=40)
+            return
+        self.df = dataset.df
+        self.rowMask = dataset.rowMask
+        self.currentPositions = None
+        self.searchMask = None
+        self.searchQuery = ""
+        self.filterCode = None
         self.sortColumn = None
         self.sortReverse = False
+        self.exporter = None
         
         # Mapping of original column names to display names
         self.columnNames = {
@@ -29,43 +48,118 @@ class ServiceTableAnalyzer:
             "device": "Device"
         }
 
+        # Per-service row positions and per-column sort permutations, built once
+        # over every row; filtered views only contribute a row mask
+        self.index = TableIndex(dataset.base if dataset.rowMask is not None else dataset, self.filterColumn)
+        # Text/range search over every column, sharing the index's sort permutations
+        self.searchIndex = SearchIndex(self.index)
+
+        controls = tk.Frame(self.frame)
+        controls.pack(fill="x", padx=10, pady=5)
         self.filterVar = tk.StringVar()
-        services = ["All"] + sorted(df[self.filterColumn].dropna().unique())
-        self.dropdown = ttk.Combobox(self.frame, textvariable=self.filterVar, values=services, state="readonly")
+        services = ["All"] + list(self.index.categories)
+        self.dropdown = ttk.Combobox(controls, textvariable=self.filterVar, values=services, state="readonly")
         self.dropdown.current(0)
-        self.dropdown.pack(padx=10, pady=5, anchor="w")
+        self.dropdown.pack(side="left")
         self.dropdown.bind("<<ComboboxSelected>>", self.updateTable)
 
-        self.tree = ttk.Treeview(self.frame, show="headings")
-        self.tree.pack(expand=True, fill="both")
+        tk.Label(controls, text="Search:").pack(side="left", padx=(15, 2))
+        self.searchVar = tk.StringVar()
+        self.searchEntry = tk.Entry(controls, textvariable=self.searchVar, width=40)
+        self.searchEntry.pack(side="left")
+        self.searchVar.trace_add("write", self.onSearchChanged)
+        self.statusLabel = tk.Label(controls, text="", font=("Arial", 10))
+        self.statusLabel.pack(side="left", padx=10)
+        self.exportButton = tk.Button(controls, text="Export...", command=self.exportView)
+        self.exportButton.pack(side="right")
+        self.exportProgress = ttk.Progressbar(controls, length=150, mode="determinate", maximum=1.0)
+        self.exportLabel = tk.Label(controls, text="", font=("Arial", 10))
+        self.exportLabel.pack(side="right", padx=5)
 
-        self.scrollY = ttk.Scrollbar(self.tree, orient="vertical", command=self.tree.yview)
-        self.tree.configure(yscrollcommand=self.scrollY.set)
-        self.scrollY.pack(side="right", fill="y")
+        # Only the rows inside the visible scroll window are materialized
+        self.table = VirtualTable(self.frame)
+        self.tree = self.table.tree
+        self.scrollY = self.table.scrollY
 
         self.setupTable()
-        self.populateTable(df)
+        self.refresh()
 
     def setupTable(self):
-        self.tree["columns"] = list(self.df.columns)
-        for col in self.df.columns:
-            displayName = self.columnNames.get(col, col)
-            self.tree.heading(col, text=displayName, command=lambda c=col: self.sortBy(c))
-            self.tree.column(col, width=100, anchor="center")
+        self.table.setColumns(self.df.columns, headings=self.columnNames, command=self.sortBy)
+
+    @profiled
+    def populateTable(self, positions):
+        # positions: row positions into self.df in display order (None = all rows)
+        self.table.setData(self.df, positions)
+
+    def refresh(self):
+        # Positions are computed on a worker; of several quick filter/sort
+        # changes only the last one is shown. Views already shown (same
+        # filters, search and sort) come from viewCache.
+        key = None
+        if self.dataset.viewKey is not None:
+            key = ("ServiceTableAnalyzer", self.filterColumn, self.filterCode, self.sortColumn, self.sortReverse,
+                   self.searchQuery, self.dataset.viewKey)
+        cached = viewCache.get(key)
+        if cached is not None:
+            scheduler.cancel((self, "table"))
+            self.showPositions(cached)
+            return
+        rowMask = self.rowMask
+        if self.searchMask is not None:
+            rowMask = self.searchMask if rowMask is None else rowMask & self.searchMask
+        args = (self.filterCode, self.sortColumn, self.sortReverse, rowMask)
+
+        def onResult(positions):
+            viewCache.put(key, positions)
+            self.showPositions(positions)
+
+        scheduler.submit((self, "table"), lambda: self.index.positions(*args), onResult,
+                         name="ServiceTableAnalyzer.positions")
+
+    def showPositions(self, positions):
+        self.currentPositions = positions
+        self.populateTable(self.currentPositions)
+        shown = len(self.df) if self.currentPositions is None else len(self.currentPositions)
+        self.statusLabel.config(text=f"{shown:,} rows")
 
-    def populateTable(self, data):
-        self.tree.delete(*self.tree.get_children())
-        for _, row in data.iterrows():
-            self.tree.insert("", "end", values=list(row))
+    def onSearchChanged(self, *args):
+        # Filters as the user types, once typing pauses
+        query = self.searchVar.get()
+        scheduler.submit((self, "search"), lambda: self.searchIndex.search(query),
+                         lambda mask: self.applySearch(query, mask), self.showSearchError,
+                         delayMs=SEARCH_DELAY_MS, name="ServiceTableAnalyzer.search")
 
+    def applySearch(self, query, mask):
+        self.searchQuery = query.strip() if mask is not None else ""
+        self.searchMask = mask
+        self.refresh()
+
+    def showSearchError(self, error):
+        if not isinstance(error, ValueError):
+            raise error
+        # Incomplete or invalid term: keep the current rows
+        self.statusLabel.config(text=str(error))
+
+    def setDataset(self, dataset):
+        # Views from the cross-tab filter share the base rows and index
+        if not hasattr(self, "index"):
+            return
+        self.dataset = dataset
+        self.rowMask = dataset.rowMask
+        self.refresh()
+
+    @profiled
     def updateTable(self, event=None):
         selected = self.filterVar.get()
         if selected == "All":
-            self.currentData = self.df
+            self.filterCode = None
         else:
-            self.currentData = self.df[self.df[self.filterColumn] == selected]
-        self.populateTable(self.currentData)
+            # Dropdown entry i (after "All") is category code i - 1
+            self.filterCode = self.dropdown.current() - 1
+        self.refresh()
     
+    @profiled
     def sortBy(self, col):
         if self.sortColumn == col:
             self.sortReverse = not self.sortReverse
@@ -73,5 +167,56 @@ class ServiceTableAnalyzer:
             self.sortColumn = col
             self.sortReverse = False
         
-        sortedData = self.currentData.sort_values(by=col, ascending=not self.sortReverse)
-        self.populateTable(sortedData)
+        self.refresh()
+
+    def exportView(self):
+        # Writes the rows currently shown, in display order, on a worker
+        # thread; the button cancels a running export
+        if self.exporter is not None:
+            self.exporter.cancel()
+            self.exportLabel.config(text="Cancelling...")
+            return
+        path = filedialog.asksaveasfilename(defaultextension=".csv",
+                                            filetypes=[("CSV", "*.csv"), ("Parquet", "*.parquet")])
+        if not path:
+            return
+        try:
+            self.exporter = TableExporter(self.df, self.currentPositions, path)
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
+            return
+        self.exportButton.config(text="Cancel export")
+        self.exportProgress["value"] = 0
+        self.exportProgress.pack(side="right", before=self.exportLabel)
+        self.exportLabel.config(text="Exporting...")
+        self.exporter.start()
+        self.frame.after(100, self.pollExport)
+
+    def pollExport(self):
+        exporter = self.exporter
+        if exporter is None:
+            return
+        for message in exporter.drain():
+            kind = message[0]
+            if kind == "progress":
+                _, rows, totalRows, elapsed = message
+                self.exportProgress["value"] = rows / totalRows
+                rate = rows / elapsed if elapsed > 0 else 0
+                self.exportLabel.config(text=f"{rows:,} / {totalRows:,} rows   {rate:,.0f} rows/s")
+            elif kind == "done":
+                self.finishExport(f"Exported {exporter.totalRows:,} rows to {os.path.basename(message[1])}")
+                return
+            elif kind == "error":
+                self.finishExport("")
+                messagebox.showerror("Error", f"Failed to export:\n{message[1]}")
+                return
+            elif kind == "cancelled":
+                self.finishExport("Export cancelled")
+                return
+        self.frame.after(100, self.pollExport)
+
+    def finishExport(self, text):
+        self.exporter = None
+        self.exportProgress.pack_forget()
+        self.exportButton.config(text="Export...")
+        self.exportLabel.config(text=text)
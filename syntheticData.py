@@ -0,0 +1,75 @@
+import argparse
+import numpy as np
+import pandas as pd
+
+# Seeded generator of session exports with the schema of data.csv. Category
+# weights are the frequencies observed in data.csv, and the numeric columns
+# follow its ranges and correlations (interactions and unrecognized segments
+# grow with duration, quality drops with unrecognized segments).
+
+SERVICES = {
+    "Urgences": 64, "Pédiatrie": 49, "Cardiologie": 40, "Oncologie": 35, "Gériatrie": 34,
+    "ORL": 31, "Maternité": 31, "Neurologie": 20, "Psychiatrie": 16,
+}
+LANGUES = {
+    "Arabe": 68, "Espagnol": 42, "Anglais": 33, "Roumain": 32, "Portugais": 29, "Soninké": 25,
+    "Somali": 21, "Russe": 15, "Ourdou": 13, "Allemand": 12, "Créole_haïtien": 12,
+    "Ukrainien": 10, "Tamoul": 8,
+}
+DEVICES = {"webapp": 175, "mobile": 145}
+COLUMNS = [
+    "session_id", "date", "service", "langue", "duree_minutes", "interactions_patient",
+    "interactions_praticien", "interactions_totales", "note_praticien", "qualite_score",
+    "segments_non_reconnus", "device",
+]
+
+
+def sample(rng, weights, size):
+    values = np.array(list(weights))
+    p = np.array(list(weights.values()), dtype=float)
+    return values[rng.choice(len(values), size=size, p=p / p.sum())]
+
+
+def generateSessions(rows, seed=0, firstRow=0, idWidth=None, start="2025-01-01", days=90):
+    rng = np.random.default_rng([seed, firstRow])
+    duration = np.clip(np.rint(rng.normal(12, 6, rows)), 2, 45).astype(np.int64)
+    patient = np.maximum(np.rint(duration * rng.normal(1.08, 0.4, rows)), 1).astype(np.int64)
+    professional = np.maximum(np.rint(patient * rng.lognormal(0.18, 0.35, rows)), 1).astype(np.int64)
+    segments = rng.poisson(duration * 0.18)
+    quality = np.clip(np.round(0.98 - 0.02 * segments + rng.normal(0, 0.04, rows), 2), 0.5, 1.0)
+    grade = np.clip(np.round(rng.normal(4.45, 0.5, rows), 1), 3.0, 5.0)
+    dates = np.datetime64(start, "D") + rng.integers(0, days, rows)
+    width = idWidth or max(4, len(str(firstRow + rows)))
+    ids = pd.Series(np.arange(firstRow + 1, firstRow + rows + 1)).map(lambda i: f"S{i:0{width}d}")
+    return pd.DataFrame({
+        "session_id": ids,
+        "date": pd.to_datetime(dates).strftime("%Y-%m-%d"),
+        "service": sample(rng, SERVICES, rows),
+        "langue": sample(rng, LANGUES, rows),
+        "duree_minutes": duration,
+        "interactions_patient": patient,
+        "interactions_praticien": professional,
+        "interactions_totales": patient + professional,
+        "note_praticien": grade,
+        "qualite_score": quality,
+        "segments_non_reconnus": segments,
+        "device": sample(rng, DEVICES, rows),
+    }, columns=COLUMNS)
+
+
+def writeSessionsCsv(path, rows, seed=0, chunkRows=1_000_000):
+    # Written in chunks so 10^7-row files do not need to fit in memory. The
+    # output depends only on (rows, seed, chunkRows).
+    idWidth = max(4, len(str(rows)))
+    for firstRow in range(0, max(rows, 1), chunkRows):
+        chunk = generateSessions(min(chunkRows, rows - firstRow), seed, firstRow, idWidth)
+        chunk.to_csv(path, mode="w" if firstRow == 0 else "a", header=firstRow == 0, index=False)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write a synthetic session CSV with the schema of data.csv.")
+    parser.add_argument("path")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    writeSessionsCsv(args.path, args.rows, args.seed)
@@ -0,0 +1,127 @@
+import os
+import time
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_object_dtype
+from backgroundJob import BackgroundJob
+from compaction import PatternedIdDtype
+from profiler import profiled
+
+# Export of the service table's current view (filter, search, sort) to CSV
+# or Parquet. Rows are taken from the frame chunk by chunk in display order,
+# through the view's row positions, so memory stays bounded by one chunk
+# whatever the size of the view. Parquet needs pyarrow, imported on use.
+
+EXPORT_CHUNK_ROWS = 100_000
+EXPORT_FORMATS = {".csv": "csv", ".parquet": "parquet"}
+
+
+def exportFormat(path):
+    # "csv" or "parquet" from the file extension
+    fmt = EXPORT_FORMATS.get(os.path.splitext(path)[1].lower())
+    if fmt is None:
+        raise ValueError(f"Unsupported export format: {os.path.basename(path)} (use .csv or .parquet)")
+    return fmt
+
+
+class TableExporter(BackgroundJob):
+    # Writes df's rows at positions (None = every row, frame order) on a
+    # worker thread, to a temporary file moved into place once complete.
+    def __init__(self, df, positions, path, chunkRows=EXPORT_CHUNK_ROWS):
+        super().__init__()
+        self.df = df
+        self.positions = positions
+        self.path = path
+        self.format = exportFormat(path)
+        self.chunkRows = chunkRows
+        self.totalRows = len(df) if positions is None else len(positions)
+
+    def run(self):
+        return self.path if self.export() else None
+
+    @profiled(name="TableExporter.export")
+    def export(self):
+        # Synchronous version of start(); False when cancelled
+        tempPath = self.path + ".part"
+        writer = CsvWriter(tempPath) if self.format == "csv" else ParquetWriter(tempPath, self.df)
+        startTime = time.perf_counter()
+        try:
+            with writer:
+                if self.totalRows == 0:
+                    # An empty view still writes the header / schema
+                    writer.write(self.df.iloc[:0])
+                for start in range(0, self.totalRows, self.chunkRows):
+                    if self.cancelEvent.is_set():
+                        return False
+                    stop = min(start + self.chunkRows, self.totalRows)
+                    writer.write(self.chunk(start, stop))
+                    self.messages.put(("progress", stop, self.totalRows, time.perf_counter() - startTime))
+            os.replace(tempPath, self.path)
+            return True
+        finally:
+            if os.path.exists(tempPath):
+                os.remove(tempPath)
+
+    def chunk(self, start, stop):
+        if self.positions is None:
+            return self.df.iloc[start:stop]
+        return self.df.take(np.asarray(self.positions[start:stop]))
+
+
+class CsvWriter:
+    def __init__(self, path):
+        self.path = path
+        self.header = True
+        self.file = None
+
+    def __enter__(self):
+        self.file = open(self.path, "w", newline="", encoding="utf-8")
+        return self
+
+    def __exit__(self, *exc):
+        self.file.close()
+
+    def write(self, part):
+        part.to_csv(self.file, header=self.header, index=False)
+        self.header = False
+
+
+class ParquetWriter:
+    # One row group per chunk. The schema comes from the frame's dtypes, not
+    # its values, so every chunk is written with the same types; patterned
+    # ids and object columns are written as strings.
+    def __init__(self, path, df):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ValueError("Parquet export needs pyarrow (pip install pyarrow)") from None
+        self.pa = pa
+        self.pq = pq
+        self.path = path
+        self.schema = pa.Schema.from_pandas(asStrings(df.iloc[:0]), preserve_index=False)
+        self.writer = None
+
+    def __enter__(self):
+        self.writer = self.pq.ParquetWriter(self.path, self.schema)
+        return self
+
+    def __exit__(self, *exc):
+        self.writer.close()
+
+    def write(self, part):
+        table = self.pa.Table.from_pandas(asStrings(part), schema=self.schema, preserve_index=False)
+        self.writer.write_table(table)
+
+
+def asStrings(part):
+    # Patterned ids and object columns (whose values may be of any type) as
+    # nullable strings
+    columns = {}
+    for col in part.columns:
+        dtype = part[col].dtype
+        if isinstance(dtype, PatternedIdDtype):
+            columns[col] = pd.array(part[col].array.strings(), dtype="string")
+        elif is_object_dtype(dtype):
+            columns[col] = part[col].astype("string")
+    return part.assign(**columns) if columns else part
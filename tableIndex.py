@@ -0,0 +1,88 @@
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from profiler import phase
+
+
+class TableIndex:
+    # Row-position index for the service table: the rows of each filter value
+    # are grouped once, and each column's sort permutation is computed once.
+    # Filtering and sorting then only slice or subset cached arrays.
+    def __init__(self, dataset, filterColumn, cacheSize=8):
+        self.dataset = dataset
+        self.df = dataset.df
+        self.filterColumn = filterColumn
+        self.codes, self.categories = dataset.codes(filterColumn)
+        self.positionDtype = np.int32 if len(self.df) < 2 ** 31 else np.int64
+
+        # Stable sort by code: each value's rows form a contiguous run
+        order = np.argsort(self.codes, kind="stable").astype(self.positionDtype)
+        counts = np.bincount(self.codes[self.codes >= 0], minlength=len(self.categories))
+        bounds = np.concatenate([[0], np.cumsum(counts)]) + int((self.codes < 0).sum())
+        self.groups = [order[bounds[i]:bounds[i + 1]] for i in range(len(self.categories))]
+
+        self.permutations = {}
+        self.filteredPermutations = OrderedDict()
+        self.cacheSize = cacheSize
+
+    def groupPositions(self, code):
+        return self.groups[code]
+
+    def sortPermutation(self, column, descending=False):
+        # (positions in sort order with missing values last, number of
+        # non-missing values), same order as sort_values(kind="stable")
+        key = (column, descending)
+        if key not in self.permutations:
+            if descending:
+                self.permutations[key] = self.descendingPermutation(column)
+            else:
+                with phase("TableIndex.sortPermutation"):
+                    values = self.df[column].reset_index(drop=True)
+                    perm = values.sort_values(kind="stable", na_position="last").index.to_numpy()
+                    self.permutations[key] = (perm.astype(self.positionDtype), int(values.notna().sum()))
+        return self.permutations[key]
+
+    def descendingPermutation(self, column):
+        # The ascending permutation with its runs of equal values in reverse
+        # order, each run keeping frame order like a stable descending sort
+        perm, valid = self.sortPermutation(column)
+        with phase("TableIndex.descendingPermutation"):
+            codes = pd.factorize(self.df[column].reset_index(drop=True))[0][perm[:valid]]
+            starts = np.flatnonzero(np.concatenate([[True], codes[1:] != codes[:-1]])) if valid else np.zeros(0, dtype=np.int64)
+            ends = np.append(starts[1:], valid)
+            # Reversing the whole array reverses the runs' order and each run;
+            # every element then moves back to its mirror place in its run
+            runs = np.repeat(np.arange(len(starts)), ends - starts)[::-1]
+            mirrored = valid - 1 - np.arange(valid)
+            order = starts[runs] + ends[runs] - 1 - mirrored
+            return np.concatenate([perm[order], perm[valid:]]), valid
+
+    def filteredPermutation(self, code, column, descending=False):
+        key = (code, column, descending)
+        if key in self.filteredPermutations:
+            self.filteredPermutations.move_to_end(key)
+            return self.filteredPermutations[key]
+        perm, valid = self.sortPermutation(column, descending)
+        inGroup = self.codes[perm] == code
+        result = (perm[inGroup], int(inGroup[:valid].sum()))
+        self.filteredPermutations[key] = result
+        if len(self.filteredPermutations) > self.cacheSize:
+            self.filteredPermutations.popitem(last=False)
+        return result
+
+    def positions(self, code=None, sortColumn=None, descending=False, rowMask=None):
+        # Row positions to display; None means every row in frame order.
+        # rowMask (bool per row) further restricts them, keeping the order.
+        result = self.orderedPositions(code, sortColumn, descending)
+        if rowMask is None:
+            return result
+        if result is None:
+            return np.flatnonzero(rowMask).astype(self.positionDtype)
+        return result[rowMask[result]]
+
+    def orderedPositions(self, code, sortColumn, descending):
+        if sortColumn is None:
+            return None if code is None else self.groupPositions(code)
+        if code is None:
+            return self.sortPermutation(sortColumn, descending)[0]
+        return self.filteredPermutation(code, sortColumn, descending)[0]
@@ -0,0 +1,131 @@
+import numpy as np
+import pandas as pd
+import pytest
+from aggregates import CoMoments, Moments, SessionAggregates
+from syntheticData import generateSessions
+
+NUMERIC = [
+    ("duree_minutes", {}),
+    ("qualite_score", {}),
+    ("note_praticien", {"valueRange": (0, 5)}),
+    ("interactions_patient", {"fillValue": 0}),
+]
+
+
+@pytest.fixture(scope="module")
+def frame():
+    df = generateSessions(30_000, seed=5)
+    rng = np.random.default_rng(5)
+    for col in ["duree_minutes", "qualite_score", "interactions_patient"]:
+        df[col] = df[col].astype(float).mask(rng.random(len(df)) < 0.05)
+    return df
+
+
+def aggregate(frame, chunkRows):
+    aggregates = SessionAggregates(frame.columns)
+    for start in range(0, len(frame), chunkRows):
+        aggregates.update(frame.iloc[start:start + chunkRows])
+    return aggregates
+
+
+@pytest.fixture(scope="module", params=["single", "merged"])
+def aggregates(request, frame):
+    # One pass over the frame, or per-part aggregates merged like the
+    # multi-file loader and the live tail do
+    if request.param == "single":
+        return aggregate(frame, 4_000)
+    bounds = [0, 1_000, 1_001, 12_345, len(frame)]
+    parts = [aggregate(frame.iloc[lo:hi], 3_000) for lo, hi in zip(bounds, bounds[1:])]
+    merged = parts[0]
+    for part in parts[1:]:
+        merged.merge(part)
+    return merged
+
+
+def columnValues(frame, column, options):
+    values = frame[column]
+    if "fillValue" in options:
+        values = values.fillna(options["fillValue"])
+    values = values.dropna()
+    if "valueRange" in options:
+        lo, hi = options["valueRange"]
+        values = values[(values >= lo) & (values <= hi)]
+    return values
+
+
+def test_counts(aggregates, frame):
+    assert len(aggregates) == len(frame)
+    for column in ["langue", "service", "device"]:
+        assert aggregates.valueCounts(column).to_dict() == frame[column].value_counts().to_dict()
+    assert aggregates.count("duree_minutes") == frame["duree_minutes"].notna().sum()
+
+
+@pytest.mark.parametrize("column, options", NUMERIC)
+def test_describe(aggregates, frame, column, options):
+    values = columnValues(frame, column, options)
+    stats = aggregates.describe(column, **options)
+    assert stats["count"] == len(values)
+    assert stats["sum"] == pytest.approx(values.sum())
+    assert stats["mean"] == pytest.approx(values.mean())
+    assert stats["std"] == pytest.approx(values.std())
+    assert stats["median"] == values.median()
+    assert (stats["min"], stats["max"]) == (values.min(), values.max())
+
+
+@pytest.mark.parametrize("column, options", NUMERIC)
+@pytest.mark.parametrize("bins", [5, 10])
+def test_histogram(aggregates, frame, column, options, bins):
+    values = columnValues(frame, column, options)
+    valueRange = options.get("valueRange", (values.min(), values.max()))
+    counts, edges = aggregates.histogram(column, bins, **options)
+    expectedCounts, expectedEdges = np.histogram(values, bins=bins, range=valueRange)
+    np.testing.assert_array_equal(counts, expectedCounts)
+    np.testing.assert_allclose(edges, expectedEdges)
+
+
+def test_corr(aggregates, frame):
+    x, y = frame["interactions_patient"].fillna(0), frame["interactions_praticien"].fillna(0)
+    assert aggregates.corr("interactions_patient", "interactions_praticien", 0) == pytest.approx(x.corr(y))
+
+
+def test_daily_totals(aggregates, frame):
+    days, counts, sums, n = aggregates.dailyTotals("date", "duree_minutes")
+    grouped = frame.groupby(pd.to_datetime(frame["date"]).dt.floor("D"))["duree_minutes"]
+    expectedDays = grouped.size().index.to_numpy().astype("datetime64[D]").astype(np.int64)
+    np.testing.assert_array_equal(days, expectedDays)
+    np.testing.assert_array_equal(counts, grouped.size().to_numpy())
+    np.testing.assert_allclose(sums, grouped.sum().to_numpy())
+    np.testing.assert_array_equal(n, grouped.count().to_numpy())
+
+
+def test_aggregated_options_must_match(aggregates):
+    with pytest.raises(ValueError):
+        aggregates.describe("note_praticien")
+    with pytest.raises(KeyError):
+        aggregates.describe("segments_non_reconnus")
+
+
+def test_moments_merge_is_stable_far_from_zero():
+    # Values with a large offset: merged sums of squares would cancel
+    rng = np.random.default_rng(7)
+    values = 1e9 + rng.normal(0, 1, 10_000)
+    merged = Moments()
+    for part in np.array_split(values, 7):
+        moments = Moments()
+        moments.update(part)
+        merged.merge(moments)
+    assert merged.n == len(values)
+    assert merged.mean == pytest.approx(values.mean(), rel=1e-12)
+    assert merged.std() == pytest.approx(values.std(ddof=1), rel=1e-6)
+
+
+def test_comoments_merge():
+    rng = np.random.default_rng(8)
+    x = 1e6 + rng.normal(0, 3, 5_000)
+    y = 2 * x + rng.normal(0, 5, 5_000)
+    merged = CoMoments()
+    for xs, ys in zip(np.array_split(x, 5), np.array_split(y, 5)):
+        part = CoMoments()
+        part.update(xs, ys)
+        merged.merge(part)
+    assert merged.corr() == pytest.approx(np.corrcoef(x, y)[0, 1], rel=1e-9)
@@ -0,0 +1,129 @@
+import numpy as np
+import pandas as pd
+import pytest
+from compaction import PatternedIdArray, PatternedIdDtype, compactColumn, compactFrame, encodeIds
+
+PADDED = ["S0012", "S0003", None, "S0120", "S0003"]
+UNPADDED = ["S9", "S10", None, "S100", "S2"]
+
+
+def idSeries(values):
+    series = compactColumn(pd.Series(values, dtype=object, name="session_id"))
+    assert isinstance(series.dtype, PatternedIdDtype)
+    return series
+
+
+def strings(series):
+    # The same values as a plain object column, missing as NaN
+    return pd.Series(series.array.strings(), index=series.index, name=series.name, dtype=object)
+
+
+def test_encoding_keeps_the_strings():
+    padded, unpadded = idSeries(PADDED), idSeries(UNPADDED)
+    assert padded.dtype == PatternedIdDtype("S", 4)
+    assert unpadded.dtype == PatternedIdDtype("S", 0)
+    assert strings(padded).tolist()[:2] == ["S0012", "S0003"]
+    assert strings(unpadded).tolist()[:2] == ["S9", "S10"]
+    assert padded.isna().tolist() == [False, False, True, False, False]
+
+
+def test_mixed_prefixes_are_not_encoded():
+    assert encodeIds(pd.Series(["S01", "T02"], dtype=object)) is None
+    assert encodeIds(pd.Series(["S01", "S002"], dtype=object)) is None
+    assert not isinstance(compactColumn(pd.Series(["S1", "S01", "S2"], dtype=object)).dtype, PatternedIdDtype)
+
+
+@pytest.mark.parametrize("values", [PADDED, UNPADDED])
+@pytest.mark.parametrize("ascending", [True, False])
+def test_sort_matches_strings(values, ascending):
+    ids = idSeries(values)
+    expected = strings(ids).sort_values(ascending=ascending, kind="stable")
+    result = ids.sort_values(ascending=ascending, kind="stable")
+    assert result.index.tolist() == expected.index.tolist()
+    assert strings(result).tolist() == expected.tolist()
+
+
+def test_isin():
+    ids = idSeries(PADDED)
+    assert ids.isin(["S0003", "S0120", "S9999"]).tolist() == [False, True, False, True, True]
+    assert not ids.isin([]).any()
+
+
+@pytest.mark.parametrize("values", [PADDED, UNPADDED])
+@pytest.mark.parametrize("method", [
+    lambda s: s.str.startswith("S00"),
+    lambda s: s.str.startswith("S00", na=False),
+    lambda s: s.str.startswith(("S1", "S2")),
+    lambda s: s.str.endswith("3"),
+    lambda s: s.str.contains("12"),
+    lambda s: s.str.contains("s01", case=False, regex=False),
+    lambda s: s.str.contains(r"0\d$"),
+    lambda s: s.str.match("s1", case=False),
+    lambda s: s.str.fullmatch(r"S0*3"),
+    lambda s: s.str.lower(),
+    lambda s: s.str.upper(),
+    lambda s: s.str.len(),
+])
+def test_str_methods_match_object_column(values, method):
+    ids = idSeries(values)
+    for series in (ids, ids.dropna()):
+        result, expected = method(series), method(strings(series))
+        assert result.dtype == expected.dtype
+        pd.testing.assert_series_equal(result, expected)
+
+
+def test_concat_same_and_different_formats():
+    first, second = idSeries(PADDED), idSeries(["S0007", "S1000"])
+    combined = pd.concat([first, second], ignore_index=True)
+    assert combined.dtype == PatternedIdDtype("S", 4)
+    assert strings(combined).tolist()[-2:] == ["S0007", "S1000"]
+    # A different width falls back to objects, with the same strings
+    mixed = pd.concat([first, idSeries(["S07"])], ignore_index=True)
+    assert not isinstance(mixed.dtype, PatternedIdDtype)
+    assert mixed.tolist()[-1] == "S07"
+
+
+def test_take():
+    ids = idSeries(PADDED)
+    assert strings(ids.take([3, 0])).tolist() == ["S0120", "S0012"]
+    filled = ids.array.take([1, -1], allow_fill=True)
+    assert isinstance(filled, PatternedIdArray)
+    assert filled.isna().tolist() == [False, True]
+    assert ids.array.take([0, -1], allow_fill=True, fill_value="S0001")[1] == "S0001"
+
+
+def test_fillna():
+    ids = idSeries(PADDED)
+    filled = ids.fillna("S0000")
+    assert filled.dtype == ids.dtype
+    assert not filled.isna().any()
+    assert filled[2] == "S0000"
+    with pytest.raises(ValueError):
+        ids.fillna("unknown")
+
+
+def test_empty_and_all_missing():
+    ids = idSeries(PADDED)
+    empty = ids.iloc[:0]
+    assert strings(empty).tolist() == []
+    assert empty.str.startswith("S").tolist() == []
+    missing = ids.iloc[[2]]
+    assert missing.str.len().isna().all()
+
+
+def test_compact_frame_report():
+    df = pd.DataFrame({
+        "session_id": [f"S{i:05d}" for i in range(1000)],
+        "service": ["Urgences", "Cardiologie"] * 500,
+        "interactions_patient": np.arange(1000, dtype=np.int64) % 40,
+        "qualite_score": np.full(1000, 0.5),
+    })
+    compacted, report = compactFrame(df)
+    assert isinstance(compacted["session_id"].dtype, PatternedIdDtype)
+    assert isinstance(compacted["service"].dtype, pd.CategoricalDtype)
+    assert compacted["interactions_patient"].dtype == np.int8
+    assert compacted["qualite_score"].dtype == np.float32
+    for column in df.columns:
+        assert compacted[column].astype(object).tolist() == df[column].astype(object).tolist()
+    assert {row["column"] for row in report} == set(df.columns)
+    assert all(row["bytesAfter"] <= row["bytesBefore"] for row in report)
@@ -0,0 +1,125 @@
+import numpy as np
+import pandas as pd
+import pytest
+from dataset import Dataset
+from filterCube import FilterCube
+from syntheticData import generateSessions
+
+SELECTIONS = [
+    ({"service": "Urgences"}, None),
+    ({"service": "Cardiologie", "device": "mobile"}, None),
+    ({}, ("2025-02-01", "2025-02-14")),
+    ({"langue": "Anglais"}, ("2025-01-10", None)),
+    ({"service": "Urgences"}, ("2030-01-01", None)),
+]
+
+
+@pytest.fixture(scope="module")
+def frame():
+    df = generateSessions(20_000, seed=3)
+    rng = np.random.default_rng(3)
+    # Missing values in the measures, a dimension and the dates
+    for col in ["duree_minutes", "qualite_score", "interactions_patient", "note_praticien"]:
+        df[col] = df[col].astype(float).mask(rng.random(len(df)) < 0.05)
+    df["langue"] = df["langue"].mask(rng.random(len(df)) < 0.02)
+    df["date"] = df["date"].mask(rng.random(len(df)) < 0.01)
+    return df
+
+
+@pytest.fixture(scope="module")
+def cube(frame):
+    return FilterCube(Dataset(frame))
+
+
+def select(cube, frame, codes, dateRange):
+    # (cube view, the same rows of frame selected with pandas)
+    mask = pd.Series(True, index=frame.index)
+    for dim, value in codes.items():
+        mask &= frame[dim] == value
+    if dateRange is not None:
+        dates = pd.to_datetime(frame["date"])
+        mask &= dates.notna()
+        if dateRange[0] is not None:
+            mask &= dates >= dateRange[0]
+        if dateRange[1] is not None:
+            mask &= dates <= dateRange[1]
+    cellCodes = {dim: cube.categories[dim].get_loc(value) for dim, value in codes.items()}
+    return cube.select(cellCodes, dateRange), frame[mask]
+
+
+@pytest.fixture(params=SELECTIONS, ids=lambda s: str(s))
+def selection(request, cube, frame):
+    return select(cube, frame, *request.param)
+
+
+def test_unfiltered_selection_is_the_dataset(cube):
+    assert cube.select() is cube.dataset
+    assert cube.select({"service": None}, (None, None)) is cube.dataset
+
+
+def test_counts(selection):
+    view, rows = selection
+    assert len(view) == len(rows)
+    assert view.valueCounts("langue").to_dict() == rows["langue"].value_counts().to_dict()
+    assert view.count("duree_minutes") == rows["duree_minutes"].notna().sum()
+
+
+@pytest.mark.parametrize("column, options", [
+    ("duree_minutes", {}),
+    ("qualite_score", {}),
+    ("note_praticien", {"valueRange": (0, 5)}),
+    ("interactions_patient", {"fillValue": 0}),
+])
+def test_describe(selection, column, options):
+    view, rows = selection
+    values = rows[column]
+    if "fillValue" in options:
+        values = values.fillna(options["fillValue"])
+    values = values.dropna()
+    stats = view.describe(column, **options)
+    assert stats["count"] == len(values)
+    if values.empty:
+        return
+    assert stats["sum"] == pytest.approx(values.sum())
+    assert stats["mean"] == pytest.approx(values.mean())
+    assert stats["std"] == pytest.approx(values.std())
+    assert stats["median"] == values.median()
+    assert (stats["min"], stats["max"]) == (values.min(), values.max())
+
+
+@pytest.mark.parametrize("column, options", [
+    ("qualite_score", {}),
+    ("note_praticien", {"valueRange": (0, 5)}),
+])
+@pytest.mark.parametrize("bins", [7, 10])
+def test_histogram(selection, column, options, bins):
+    view, rows = selection
+    values = rows[column].dropna()
+    valueRange = options.get("valueRange")
+    if valueRange is None and not values.empty:
+        valueRange = (values.min(), values.max())
+    counts, edges = view.histogram(column, bins, **options)
+    expectedCounts, expectedEdges = np.histogram(values, bins=bins, range=valueRange)
+    np.testing.assert_array_equal(counts, expectedCounts)
+    np.testing.assert_allclose(edges, expectedEdges)
+
+
+def test_corr(selection):
+    view, rows = selection
+    x, y = rows["interactions_patient"].fillna(0), rows["interactions_praticien"].fillna(0)
+    expected = x.corr(y)
+    result = view.corr("interactions_patient", "interactions_praticien", 0)
+    if np.isnan(expected):
+        assert np.isnan(result)
+    else:
+        assert result == pytest.approx(expected)
+
+
+def test_uncovered_queries_fall_back_to_rows(selection):
+    view, rows = selection
+    values = rows["segments_non_reconnus"].dropna()
+    stats = view.describe("segments_non_reconnus")
+    assert stats["count"] == len(values)
+    if len(values):
+        assert stats["mean"] == pytest.approx(values.mean())
+        assert stats["median"] == values.median()
@@ -0,0 +1,133 @@
+import matplotlib.dates as mdates
+import numpy as np
+import pandas as pd
+
+RESOLUTIONS = ["day", "week", "month", "quarter"]
+# Most points a PyramidLine plots in its visible range before switching to
+# the next coarser resolution
+MAX_POINTS = 200
+
+
+def periodStarts(days, resolution):
+    # int64 day numbers (days since 1970-01-01) -> first day of their period
+    days = np.asarray(days, dtype=np.int64)
+    if resolution == "day":
+        return days
+    if resolution == "week":
+        # Monday of the week (1970-01-01 was a Thursday)
+        return days - (days + 3) % 7
+    months = days.astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+    if resolution == "quarter":
+        months -= months % 3
+    elif resolution != "month":
+        raise ValueError(f"Unknown resolution: {resolution}")
+    return months.astype("datetime64[M]").astype("datetime64[D]").astype(np.int64)
+
+
+class TimeLevel:
+    # Entries and mean duration per period at one resolution
+    def __init__(self, resolution, keys, counts, sums, durationCounts):
+        self.resolution = resolution
+        self.keys = keys
+        self.counts = counts.astype(np.int64)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            self.avgDurations = sums / durationCounts
+        self.dates = pd.DatetimeIndex(keys.astype("datetime64[D]"))
+        # Matplotlib date numbers (days since its epoch)
+        self.nums = mdates.date2num(keys.astype("datetime64[D]"))
+
+    def __len__(self):
+        return len(self.keys)
+
+    def pointsIn(self, lo, hi):
+        # Number of periods starting inside [lo, hi] (date numbers)
+        return int(np.searchsorted(self.nums, hi, side="right") - np.searchsorted(self.nums, lo, side="left"))
+
+    def window(self, lo, hi):
+        # Slice of periods covering [lo, hi], plus one on each side so the
+        # line runs to the plot edges
+        start = max(int(np.searchsorted(self.nums, lo, side="left")) - 1, 0)
+        end = min(int(np.searchsorted(self.nums, hi, side="right")) + 1, len(self.nums))
+        return slice(start, end)
+
+
+class TimePyramid:
+    # Day, week, month and quarter levels of the same per-day totals. Coarser
+    # levels are summed from the days, so building them costs one bincount per
+    # level over the distinct days, not over the rows.
+    def __init__(self, days, counts, sums, durationCounts):
+        days = np.asarray(days, dtype=np.int64)
+        self.levels = {}
+        for resolution in RESOLUTIONS:
+            keys, inverse = np.unique(periodStarts(days, resolution), return_inverse=True)
+            inverse = inverse.ravel()
+            self.levels[resolution] = TimeLevel(
+                resolution, keys,
+                np.bincount(inverse, weights=counts, minlength=len(keys)),
+                np.bincount(inverse, weights=sums, minlength=len(keys)),
+                np.bincount(inverse, weights=durationCounts, minlength=len(keys)),
+            )
+
+    def level(self, resolution):
+        return self.levels[resolution]
+
+    def span(self):
+        # (first, last) day as date numbers, or None when there are no dates
+        days = self.levels["day"].nums
+        return (days[0], days[-1]) if len(days) else None
+
+    def resolutionFor(self, lo, hi, maxPoints=MAX_POINTS):
+        # Finest resolution with at most maxPoints periods in [lo, hi]
+        for resolution in RESOLUTIONS:
+            if self.levels[resolution].pointsIn(lo, hi) <= maxPoints:
+                return resolution
+        return RESOLUTIONS[-1]
+
+
+class PyramidLine:
+    # Line2D over a TimePyramid that re-picks its level and visible window on
+    # zoom/pan (xlim_changed). resolution="auto" follows the zoom; a fixed
+    # resolution only re-slices its window. onLevelChange(level) is called
+    # when the plotted resolution changes.
+    def __init__(self, ax, onLevelChange=None, maxPoints=MAX_POINTS, **lineKwargs):
+        self.ax = ax
+        self.onLevelChange = onLevelChange
+        self.maxPoints = maxPoints
+        self.pyramid = None
+        self.resolution = "auto"
+        self.current = None
+        self.lastWindow = None
+        self.line, = ax.plot([], [], **lineKwargs)
+        ax.callbacks.connect("xlim_changed", lambda axes: self.refresh())
+
+    def setPyramid(self, pyramid):
+        self.pyramid = pyramid
+        self.current = None
+        self.lastWindow = None
+
+    def setResolution(self, resolution):
+        self.resolution = resolution
+        self.lastWindow = None
+        self.refresh()
+
+    def refresh(self):
+        if self.pyramid is None or self.pyramid.span() is None:
+            self.line.set_data([], [])
+            return
+        lo, hi = self.ax.get_xlim()
+        resolution = self.resolution
+        if resolution == "auto":
+            resolution = self.pyramid.resolutionFor(lo, hi, self.maxPoints)
+        level = self.pyramid.level(resolution)
+        window = level.window(lo, hi)
+        if (resolution, window.start, window.stop) == self.lastWindow:
+            return
+        self.lastWindow = (resolution, window.start, window.stop)
+        self.line.set_data(level.nums[window], level.counts[window])
+        # Counts per period depend on the resolution: rescale y to the window
+        top = level.counts[window].max() if window.stop > window.start else 0
+        self.ax.set_ylim(0, max(top, 1) * 1.05)
+        if level is not self.current:
+            self.current = level
+            if self.onLevelChange is not None:
+                self.onLevelChange(level)
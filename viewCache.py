@@ -0,0 +1,102 @@
+import os
+import sys
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+
+# Results and rendered images of views already shown. Keys describe the view
+# state: the chart or table, its settings (column, bins, sort...), the
+# dataset view (Dataset.viewKey: which rows, which filters) and, for images,
+# the canvas size. Revisiting a view plots the stored result and blits the
+# stored Agg buffer instead of recomputing and re-rendering it. Entries are
+# evicted least-recently-used beyond a memory budget
+# (CSV_ANALYZER_VIEW_CACHE_MB, default 256).
+
+DEFAULT_BUDGET_BYTES = 256 * 1024 ** 2
+
+
+def sizeOf(value):
+    # Approximate bytes held by a cached value
+    if value is None:
+        return 0
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (pd.Series, pd.Index)):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, dict):
+        return sum(sizeOf(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(sizeOf(v) for v in value)
+    try:
+        # Agg buffer regions and other buffer-protocol objects
+        return memoryview(value).nbytes
+    except TypeError:
+        pass
+    if hasattr(value, "__dict__"):
+        return sizeOf(vars(value))
+    return sys.getsizeof(value)
+
+
+class ViewCache:
+    def __init__(self, budgetBytes=None):
+        if budgetBytes is None:
+            megabytes = os.environ.get("CSV_ANALYZER_VIEW_CACHE_MB")
+            budgetBytes = int(float(megabytes) * 1024 ** 2) if megabytes else DEFAULT_BUDGET_BYTES
+        self.budgetBytes = budgetBytes
+        self.entries = OrderedDict()
+        self.totalBytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        # Cached value, or None (also for key None: views that are not cached)
+        if key is None or key not in self.entries:
+            if key is not None:
+                self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return self.entries[key][0]
+
+    def put(self, key, value):
+        if key is None:
+            return
+        self.discard(key)
+        nbytes = sizeOf(value)
+        if nbytes > self.budgetBytes:
+            return
+        self.entries[key] = (value, nbytes)
+        self.totalBytes += nbytes
+        while self.totalBytes > self.budgetBytes:
+            _, (_, evicted) = self.entries.popitem(last=False)
+            self.totalBytes -= evicted
+
+    def discard(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.totalBytes -= entry[1]
+
+    def clear(self):
+        self.entries.clear()
+        self.totalBytes = 0
+
+
+viewCache = ViewCache()
+
+
+def drawCached(canvas, key):
+    # Renders canvas, or blits its stored image when the view (key) was
+    # already drawn at this size. key None draws when idle, uncached.
+    if key is None:
+        canvas.draw_idle()
+        return
+    imageKey = ("image", key, canvas.get_width_height(), canvas.figure.dpi)
+    region = viewCache.get(imageKey)
+    if region is not None:
+        canvas.restore_region(region)
+        canvas.blit()
+        return
+    canvas.draw()
+    viewCache.put(imageKey, canvas.copy_from_bbox(canvas.figure.bbox))
@@ -0,0 +1,205 @@
+import tkinter as tk
+from tkinter import ttk
+import numpy as np
+import pandas as pd
+from profiler import profiled
+
+
+class VirtualTable:
+    # Treeview that only materializes the rows inside the visible scroll
+    # window (plus an overscan margin). Rows are read from a DataFrame by
+    # position, so the cost of a refresh does not depend on the row count.
+    def __init__(self, parent, overscan=20, rowHeight=None):
+        self.parent = parent
+        self.overscan = overscan
+        self.df = None
+        self.positions = None
+        self.columns = []
+        self.first = 0
+        # Selected row in display order (None = no selection). Treeview items
+        # are reused across windows, so the selection is kept here and
+        # reapplied to whichever item shows that row.
+        self.cursor = None
+        self.windowStart = 0
+        self.windowEnd = 0
+
+        self.frame = tk.Frame(parent)
+        self.frame.pack(expand=True, fill="both")
+
+        self.tree = ttk.Treeview(self.frame, show="headings")
+        self.tree.pack(side="left", expand=True, fill="both")
+
+        self.scrollY = ttk.Scrollbar(self.frame, orient="vertical", command=self.yview)
+        self.scrollY.pack(side="right", fill="y")
+
+        self.rowHeight = rowHeight or self._lookupRowHeight()
+
+        self.tree.bind("<Configure>", lambda e: self.render())
+        self.tree.bind("<MouseWheel>", self._onMouseWheel)
+        self.tree.bind("<Button-4>", lambda e: self._scrollBy(-3))
+        self.tree.bind("<Button-5>", lambda e: self._scrollBy(3))
+        self.tree.bind("<Prior>", lambda e: self._scrollBy(-self.visibleRows()))
+        self.tree.bind("<Next>", lambda e: self._scrollBy(self.visibleRows()))
+        # Keyboard navigation moves the logical cursor; the window follows it
+        self.tree.bind("<Up>", lambda e: self._moveCursor(-1))
+        self.tree.bind("<Down>", lambda e: self._moveCursor(1))
+        self.tree.bind("<Home>", lambda e: self._moveCursorTo(0))
+        self.tree.bind("<End>", lambda e: self._moveCursorTo(self.rowCount() - 1))
+        self.tree.bind("<<TreeviewSelect>>", self._onSelect)
+
+    def _lookupRowHeight(self):
+        try:
+            value = ttk.Style().lookup("Treeview", "rowheight")
+            return int(value) if value else 20
+        except (tk.TclError, ValueError):
+            return 20
+
+    def setColumns(self, columns, headings=None, command=None):
+        headings = headings or {}
+        self.columns = list(columns)
+        self.tree["columns"] = self.columns
+        for col in self.columns:
+            kwargs = {"text": headings.get(col, col)}
+            if command is not None:
+                kwargs["command"] = lambda c=col: command(c)
+            self.tree.heading(col, **kwargs)
+            self.tree.column(col, width=100, anchor="center")
+
+    def setData(self, df, positions=None, resetScroll=True):
+        # positions: integer row positions into df, in display order.
+        # None means every row in frame order (no index array is allocated).
+        self.df = df
+        self.positions = positions
+        if resetScroll:
+            self.first = 0
+            self.cursor = None
+        elif self.cursor is not None and self.cursor >= self.rowCount():
+            self.cursor = None
+        self.windowStart = self.windowEnd = 0
+        self.render(force=True)
+
+    def rowCount(self):
+        if self.df is None:
+            return 0
+        if self.positions is None:
+            return len(self.df)
+        return len(self.positions)
+
+    def visibleRows(self):
+        height = self.tree.winfo_height()
+        if height <= 1:
+            height = int(self.tree.cget("height")) * self.rowHeight + self.rowHeight
+        # One row worth of pixels is taken by the headings
+        return max(1, height // self.rowHeight - 1)
+
+    def _rowPositions(self, start, end):
+        if self.positions is None:
+            return np.arange(start, end)
+        return np.asarray(self.positions[start:end])
+
+    def _windowValues(self, start, end):
+        window = self.df.iloc[self._rowPositions(start, end)]
+        window = window[[c for c in self.columns if c in window.columns]]
+        for col in window.columns:
+            if pd.api.types.is_datetime64_any_dtype(window[col]):
+                window = window.assign(**{col: self._formatDates(window[col])})
+        return window.astype(object).where(window.notna(), "").values.tolist()
+
+    def _formatDates(self, col):
+        if (col.dropna().dt.normalize() == col.dropna()).all():
+            return col.dt.strftime("%Y-%m-%d")
+        return col.dt.strftime("%Y-%m-%d %H:%M:%S")
+
+    @profiled
+    def render(self, force=False):
+        total = self.rowCount()
+        visible = self.visibleRows()
+        self.first = max(0, min(self.first, total - visible))
+        last = min(total, self.first + visible)
+
+        # Rows already materialized: just move the tree's own view
+        if not force and self.windowStart <= self.first and last <= self.windowEnd:
+            self._showWindow(total, visible)
+            return
+
+        start = max(0, self.first - self.overscan)
+        end = min(total, last + self.overscan)
+        values = self._windowValues(start, end) if end > start else []
+
+        # Reuse existing items instead of deleting and re-inserting them
+        items = self.tree.get_children()
+        for i, rowValues in enumerate(values):
+            if i < len(items):
+                self.tree.item(items[i], values=rowValues)
+            else:
+                self.tree.insert("", "end", values=rowValues)
+        if len(items) > len(values):
+            self.tree.delete(*items[len(values):])
+
+        self.windowStart = start
+        self.windowEnd = end
+        self._showWindow(total, visible)
+
+    def _showWindow(self, total, visible):
+        size = self.windowEnd - self.windowStart
+        if size > 0:
+            self.tree.yview_moveto((self.first - self.windowStart) / size)
+        self._showCursor()
+        if total == 0:
+            self.scrollY.set(0, 1)
+        else:
+            self.scrollY.set(self.first / total, min(1.0, (self.first + visible) / total))
+
+    def yview(self, *args):
+        if not args:
+            return
+        total = self.rowCount()
+        if args[0] == "moveto":
+            self.first = int(float(args[1]) * total)
+        elif args[0] == "scroll":
+            step = int(args[1])
+            if args[2] == "pages":
+                step *= self.visibleRows()
+            self.first += step
+        self.render()
+
+    def _scrollBy(self, rows):
+        self.first += rows
+        self.render()
+        return "break"
+
+    def _onMouseWheel(self, event):
+        return self._scrollBy(-3 if event.delta > 0 else 3)
+
+    def _moveCursor(self, rows):
+        start = self.cursor if self.cursor is not None else self.first - rows
+        return self._moveCursorTo(start + rows)
+
+    def _moveCursorTo(self, row):
+        total = self.rowCount()
+        if total == 0:
+            return "break"
+        self.cursor = max(0, min(row, total - 1))
+        # Scroll just enough to keep the cursor row visible
+        visible = self.visibleRows()
+        if self.cursor < self.first:
+            self.first = self.cursor
+        elif self.cursor >= self.first + visible:
+            self.first = self.cursor - visible + 1
+        self.render()
+        return "break"
+
+    def _showCursor(self):
+        items = self.tree.get_children()
+        index = self.cursor - self.windowStart if self.cursor is not None else -1
+        if 0 <= index < len(items):
+            self.tree.selection_set(items[index])
+            self.tree.focus(items[index])
+        else:
+            self.tree.selection_set(())
+
+    def _onSelect(self, event=None):
+        # Clicks select an item of the window: remember which row it shows
+        selected = self.tree.selection()
+        if selected:
+            self.cursor = self.windowStart + self.tree.index(selected[0])